@@ -0,0 +1,136 @@
+"""
+Async access to the crud.py functions for the `async def` endpoints in main.py.
+
+Reads run concurrently on a dedicated pool of reader threads, each borrowing a pooled
+connection. Writes are queued onto a single writer thread, so they never contend with
+each other for the SQLite write lock, and a burst of blocked writers can no longer
+occupy the threads the reads need. The threads are created on first use and stopped by
+shutdown() from the app's lifespan; the next call after shutdown starts them again.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import crud
+import db
+
+# Leave one pooled connection free for the writer thread
+READER_THREADS = int(os.environ.get("DB_READER_THREADS", str(max(1, db.POOL_SIZE - 1))))
+
+# Executor name -> max_workers
+EXECUTORS = {"db-reader": READER_THREADS, "db-writer": 1}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    """Returns the named executor, creating it on first use."""
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = _executors[name] = ThreadPoolExecutor(max_workers=EXECUTORS[name], thread_name_prefix=name)
+    return executor
+
+def _on(executor_name: str, fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Wraps a blocking crud function into a coroutine function that runs it on the named executor."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor(executor_name), functools.partial(fn, *args, **kwargs))
+    return wrapper
+
+def read(fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Runs `fn` on the reader pool."""
+    return _on("db-reader", fn)
+
+def write(fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Runs `fn` on the single writer thread, after every write queued before it."""
+    return _on("db-writer", fn)
+
+def shutdown() -> None:
+    """Stops the reader and writer threads once their queued work has finished."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+# --- Engine lifecycle (see storage.py) ---
+async def startup() -> None:
+    """Migrates and seeds the database as configured by db.init_db, before the first request."""
+    db.init_db()
+
+async def close() -> None:
+    """Stops the threads and closes the pooled connections."""
+    shutdown()
+    db.close_pool()
+
+migrate = write(db.migrate)
+
+# --- 1. Dashboard ---
+get_dashboard_data = read(crud.get_dashboard_data)
+find_rollup_drift = read(crud.find_rollup_drift)
+rebuild_rollups = write(crud.rebuild_rollups)
+
+async def reconcile_rollups() -> List[Dict[str, Any]]:
+    """
+    Finds rollup drift on a reader, without taking the write lock, then recomputes each
+    drifted month on the writer, one short transaction per month. Returns the drift found.
+    """
+    drift = await find_rollup_drift()
+    for rollup_table, month in sorted({(row["table"], row["month"]) for row in drift}):
+        await write(crud.refresh_rollup_month)(rollup_table, month)
+    return drift
+
+# --- 2. POA Requests ---
+get_poa_requests = read(crud.get_poa_requests)
+get_poa_request_facets = read(crud.get_poa_request_facets)
+get_poa_request_details = read(crud.get_poa_request_details)
+get_poa_request_details_batch = read(crud.get_poa_request_details_batch)
+create_poa_request = write(crud.create_poa_request)
+create_poa_requests = write(crud.create_poa_requests)
+
+async def iter_poa_request_batches(category: Optional[str], status: Optional[str],
+                                   batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Iterates crud.iter_poa_request_batches, fetching each batch on the reader pool. A reader
+    thread and connection are only taken while a batch is read, never while the client
+    consumes it, so exports leave the writer its connection.
+    """
+    batches = crud.iter_poa_request_batches(category, status, batch_size)
+    loop = asyncio.get_running_loop()
+    while True:
+        rows = await loop.run_in_executor(_executor("db-reader"), next, batches, None)
+        if rows is None:
+            return
+        yield rows
+
+update_poa_request = write(crud.update_poa_request)
+transition_poa_requests = write(crud.transition_poa_requests)
+expire_poa_requests = write(crud.expire_poa_requests)
+delete_poa_request = write(crud.delete_poa_request)
+poa_request_exists = read(crud.poa_request_exists)
+add_poa_request_file = write(crud.add_poa_request_file)
+get_poa_request_file = read(crud.get_poa_request_file)
+
+# --- 3. External Document Verification ---
+get_external_doc_verifications = read(crud.get_external_doc_verifications)
+get_external_doc_facets = read(crud.get_external_doc_facets)
+get_external_doc_verification_details = read(crud.get_external_doc_verification_details)
+get_external_doc_verification_details_batch = read(crud.get_external_doc_verification_details_batch)
+update_external_doc_verification = write(crud.update_external_doc_verification)
+transition_external_doc_verifications = write(crud.transition_external_doc_verifications)
+delete_external_doc_verification = write(crud.delete_external_doc_verification)
+external_doc_exists = read(crud.external_doc_exists)
+add_external_doc_file = write(crud.add_external_doc_file)
+get_external_doc_file = read(crud.get_external_doc_file)
+
+# --- 4. Change Log ---
+get_changes = read(crud.get_changes)
+get_change_bounds = read(crud.get_change_bounds)
+prune_change_log = write(crud.prune_change_log)
@@ -0,0 +1,412 @@
+"""
+Benchmark suite for every route in main.py.
+
+Each route is driven by --concurrency clients until it has served its share of --requests.
+Results include throughput and p50/p95/p99 latency. Two modes are supported:
+
+  inprocess  requests go straight to the ASGI app through httpx, no network or server
+  http       requests go over a real socket to a uvicorn server started for the run
+
+Every mode runs against its own copy of --db, so the PATCH and DELETE routes never alter
+the source database and reruns start from the same data. Generate one first:
+
+    cd Backend
+    python benchmarks/generate_data.py --db /tmp/bench.db --rows 1000000 --end-date 2026-01-01
+    python benchmarks/bench_api.py --db /tmp/bench.db --output baseline.json
+    # ...change something, then:
+    python benchmarks/bench_api.py --db /tmp/bench.db --output after.json --baseline baseline.json
+
+With --baseline, routes whose p95 rose or whose throughput fell by more than --tolerance
+are reported, and the script exits with status 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import common
+
+import httpx
+
+CATEGORIES = ("Property", "Vehicle", "Business", "Medical", "Financial")
+POA_STATUSES = ("Active", "Pending", "Rejected", "Expired")
+EXTERNAL_STATUSES = ("Verified", "Pending", "Rejected")
+REGIONS = ("Addis Ababa, Ethiopia", "Oromia, Ethiopia", "Amhara, Ethiopia", "Sidama, Ethiopia")
+DOCUMENT_BYTES = 256 * 1024
+SEARCH_TERMS = ("Bikila", "Megersa", "Oromia", "vehicles", "+25191", "Tesfaye")
+
+
+class Scenario:
+    """How to build one request for a route; `share` scales --requests for expensive routes."""
+
+    def __init__(self, method: str, route: str, build: Callable[["Context"], Tuple[str, Dict[str, Any]]],
+                 share: float = 1.0):
+        self.method = method
+        self.route = route
+        self.build = build
+        self.share = share
+
+
+class Context:
+    """Random source and sampled ids shared by the scenario builders."""
+
+    def __init__(self, db_path: str, seed: int, sample: int):
+        self.rng = random.Random(seed)
+        self.db_path = db_path
+        self._file_links: Dict[str, List[str]] = {}
+        conn = sqlite3.connect(db_path)
+        try:
+            self.poa_ids = self._sample(conn, "poa_requests", sample)
+            self.external_ids = self._sample(conn, "external_doc_verifications", sample)
+        finally:
+            conn.close()
+        # Deletes consume ids, so each one is deleted once
+        self.poa_deletable = list(self.poa_ids)
+        self.external_deletable = list(self.external_ids)
+        self.rng.shuffle(self.poa_deletable)
+        self.rng.shuffle(self.external_deletable)
+
+    def _sample(self, conn: sqlite3.Connection, table: str, size: int) -> List[str]:
+        """Up to `size` random request_ids, without sorting the whole table."""
+        max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        ids = self.rng.sample(range(1, max_id + 1), min(size, max_id))
+        rows = conn.execute(
+            f"SELECT request_id FROM {table} WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),)
+        )
+        return sorted(row[0] for row in rows)
+
+    def poa_id(self) -> str:
+        return self.rng.choice(self.poa_ids)
+
+    def external_id(self) -> str:
+        return self.rng.choice(self.external_ids)
+
+    def pick(self, ids: List[str], count: int) -> List[str]:
+        """Up to `count` distinct ids, fewer on a small database."""
+        return self.rng.sample(ids, min(count, len(ids)))
+
+    def file_link(self, files_table: str) -> str:
+        """Download link of a random uploaded file; the upload scenarios run first and provide them."""
+        if files_table not in self._file_links:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                rows = conn.execute(f"SELECT file_link FROM {files_table} WHERE sha256 IS NOT NULL").fetchall()
+            finally:
+                conn.close()
+            if not rows:
+                raise RuntimeError(f"No uploaded files in {files_table} to download")
+            self._file_links[files_table] = [row[0] for row in rows]
+        return self.rng.choice(self._file_links[files_table])
+
+    def document(self) -> bytes:
+        """A document body; a few distinct bodies repeat so uploads exercise deduplication."""
+        return bytes([self.rng.randrange(8)]) * DOCUMENT_BYTES
+
+    def new_poa_request(self) -> Dict[str, Any]:
+        category = self.rng.choice(CATEGORIES)
+        return {
+            "full_name": f"Bench Principal {self.rng.randrange(10 ** 6)}",
+            "contact_info": f"+2519{self.rng.randrange(10 ** 8):08d}",
+            "address": "Addis Ababa, Ethiopia",
+            "category": category,
+            "expiration_date": "2030-01-01",
+            "description_of_power": f"Benchmark {category.lower()} authority.",
+            "checklist_items": ["ID verified", "Signature witnessed"],
+        }
+
+
+def _poa_list_params(ctx: Context) -> Dict[str, Any]:
+    """One of the list queries the admin portal issues."""
+    return ctx.rng.choice((
+        {},
+        {"category": ctx.rng.choice(CATEGORIES)},
+        {"category": ctx.rng.choice(CATEGORIES), "status": ctx.rng.choice(POA_STATUSES)},
+        {"search": ctx.rng.choice(SEARCH_TERMS)},
+        {"sort_by": "oldest", "limit": 100},
+        {"fields": "request_id,principal,status"},
+    ))
+
+
+def _import_body(ctx: Context, rows: int = 100) -> bytes:
+    """An NDJSON import of `rows` new requests."""
+    return "".join(json.dumps(ctx.new_poa_request()) + "\n" for _ in range(rows)).encode("utf-8")
+
+
+def _pop(ids: List[str]) -> str:
+    """Takes an id nobody has deleted yet."""
+    if not ids:
+        raise RuntimeError("Ran out of ids to delete; raise --sample or lower --requests")
+    return ids.pop()
+
+
+SCENARIOS = [
+    Scenario("GET", "/", lambda ctx: ("/", {})),
+    Scenario("GET", "/dashboard", lambda ctx: ("/dashboard", {})),
+    Scenario("GET", "/poa-requests", lambda ctx: ("/poa-requests", {"params": _poa_list_params(ctx)})),
+    Scenario("GET", "/poa-requests/facets",
+             lambda ctx: ("/poa-requests/facets", {"params": {k: v for k, v in _poa_list_params(ctx).items()
+                                                              if k in ("category", "status", "search")}})),
+    Scenario("POST", "/poa-requests/import",
+             lambda ctx: ("/poa-requests/import", {"content": _import_body(ctx)}),
+             share=0.1),
+    Scenario("GET", "/poa-requests/export",
+             lambda ctx: ("/poa-requests/export", {"params": {"category": "Financial", "status": "Expired",
+                                                              "format": ctx.rng.choice(("ndjson", "csv"))}}),
+             share=0.02),
+    Scenario("GET", "/poa-requests:batch",
+             lambda ctx: ("/poa-requests:batch", {"params": {"ids": ",".join(ctx.pick(ctx.poa_ids, 20))}})),
+    Scenario("GET", "/poa-requests/{request_id}", lambda ctx: (f"/poa-requests/{ctx.poa_id()}", {})),
+    Scenario("POST", "/poa-requests", lambda ctx: ("/poa-requests", {"json": ctx.new_poa_request()})),
+    Scenario("PATCH", "/poa-requests/{request_id}",
+             lambda ctx: (f"/poa-requests/{ctx.poa_id()}", {"json": {"address": ctx.rng.choice(REGIONS)}})),
+    Scenario("POST", "/poa-requests:transition",
+             lambda ctx: ("/poa-requests:transition", {"json": {"request_ids": ctx.pick(ctx.poa_ids, 1000),
+                                                                "status": ctx.rng.choice(POA_STATUSES)}}),
+             share=0.05),
+    Scenario("POST", "/poa-requests/{request_id}/files",
+             lambda ctx: (f"/poa-requests/{ctx.poa_id()}/files",
+                          {"params": {"document_type": "ID Front"}, "content": ctx.document(),
+                           "headers": {"Content-Type": "application/pdf"}}),
+             share=0.2),
+    Scenario("GET", "/poa-requests/{request_id}/files/{file_id}",
+             lambda ctx: (ctx.file_link("poa_request_files"), {})),
+    Scenario("DELETE", "/poa-requests/{request_id}", lambda ctx: (f"/poa-requests/{_pop(ctx.poa_deletable)}", {}),
+             share=0.2),
+    Scenario("GET", "/external-doc-verification",
+             lambda ctx: ("/external-doc-verification",
+                          {"params": ctx.rng.choice(({}, {"status": ctx.rng.choice(EXTERNAL_STATUSES)}))})),
+    Scenario("GET", "/external-doc-verification/facets",
+             lambda ctx: ("/external-doc-verification/facets",
+                          {"params": ctx.rng.choice(({}, {"category": ctx.rng.choice(CATEGORIES)},
+                                                     {"status": ctx.rng.choice(EXTERNAL_STATUSES)}))})),
+    Scenario("GET", "/external-doc-verification:batch",
+             lambda ctx: ("/external-doc-verification:batch",
+                          {"params": {"ids": ",".join(ctx.pick(ctx.external_ids, 20))}})),
+    Scenario("GET", "/external-doc-verification/{request_id}",
+             lambda ctx: (f"/external-doc-verification/{ctx.external_id()}", {})),
+    Scenario("PATCH", "/external-doc-verification/{request_id}",
+             lambda ctx: (f"/external-doc-verification/{ctx.external_id()}",
+                          {"json": {"status": ctx.rng.choice(EXTERNAL_STATUSES)}})),
+    Scenario("POST", "/external-doc-verification:transition",
+             lambda ctx: ("/external-doc-verification:transition",
+                          {"json": {"request_ids": ctx.pick(ctx.external_ids, 1000),
+                                    "status": ctx.rng.choice(EXTERNAL_STATUSES)}}),
+             share=0.05),
+    Scenario("POST", "/external-doc-verification/{request_id}/files",
+             lambda ctx: (f"/external-doc-verification/{ctx.external_id()}/files",
+                          {"params": {"document_type": "Title Deed"}, "content": ctx.document(),
+                           "headers": {"Content-Type": "application/pdf"}}),
+             share=0.2),
+    Scenario("GET", "/external-doc-verification/{request_id}/files/{file_id}",
+             lambda ctx: (ctx.file_link("external_doc_files"), {})),
+    Scenario("DELETE", "/external-doc-verification/{request_id}",
+             lambda ctx: (f"/external-doc-verification/{_pop(ctx.external_deletable)}", {}), share=0.2),
+    Scenario("GET", "/cache/stats", lambda ctx: ("/cache/stats", {})),
+    Scenario("GET", "/metrics", lambda ctx: ("/metrics", {})),
+    Scenario("GET", "/debug/slow-queries", lambda ctx: ("/debug/slow-queries", {})),
+]
+
+# Long-lived streams never complete a request, so they have their own benchmark
+BENCHMARKED_ELSEWHERE = {("GET", "/changes")}  # bench_changes.py
+
+
+def check_coverage(app) -> None:
+    """Warns about routes in main.py that no scenario drives."""
+    from fastapi.routing import APIRoute
+
+    covered = {(s.method, s.route) for s in SCENARIOS} | BENCHMARKED_ELSEWHERE
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods:
+                if (method, route.path) not in covered:
+                    print(f"warning: no benchmark scenario for {method} {route.path}")
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context,
+                       requests: int, concurrency: int) -> Dict[str, Any]:
+    """Sends `requests` requests for one route from `concurrency` clients; returns its summary row."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            url, kwargs = scenario.build(ctx)
+            start = time.perf_counter()
+            response = await client.request(scenario.method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+    return {"method": scenario.method, "route": scenario.route, **common.summarize(latencies, elapsed), "errors": errors}
+
+
+async def run_suite(client: httpx.AsyncClient, ctx: Context, mode: str, args) -> List[Dict[str, Any]]:
+    """Runs every scenario in order, warming the read routes up first."""
+    results = []
+    for scenario in SCENARIOS:
+        requests = max(1, int(args.requests * scenario.share))
+        warmup = max(1, int(args.warmup * scenario.share))
+        if scenario.method == "GET":
+            await run_scenario(client, scenario, ctx, warmup, args.concurrency)
+        row = await run_scenario(client, scenario, ctx, requests, args.concurrency)
+        results.append({"mode": mode, **row})
+        print(f"  {mode:9} {scenario.method:6} {scenario.route:42} {row['rps']:>9} req/s  p95 {row['p95_ms']} ms")
+    return results
+
+
+def copy_database(source: str) -> str:
+    """Copies `source` (including any WAL content) into a fresh temporary file."""
+    target = os.path.join(tempfile.mkdtemp(prefix="legatora-bench-"), os.path.basename(source))
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return target
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_inprocess(db_path: str, args) -> List[Dict[str, Any]]:
+    common.use_database(db_path)
+    import main as api
+
+    check_coverage(api.app)
+    ctx = Context(db_path, args.seed, args.sample)
+    transport = httpx.ASGITransport(app=api.app)
+    # ASGITransport does not send lifespan events, so run the app's startup and shutdown here
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run_suite(client, ctx, "inprocess", args)
+
+
+async def run_http(db_path: str, args) -> List[Dict[str, Any]]:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_PATH": db_path, "BLOB_STORAGE_PATH": common.blob_dir(db_path)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=common.BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None,
+                                     limits=httpx.Limits(max_connections=args.concurrency)) as client:
+            deadline = time.perf_counter() + 30
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError("uvicorn did not start") from None
+                    await asyncio.sleep(0.1)
+            ctx = Context(db_path, args.seed, args.sample)
+            return await run_suite(client, ctx, "http", args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Lines up results with a baseline run; returns the comparison rows, flagging regressions."""
+    previous = {(r["mode"], r["method"], r["route"]): r for r in baseline["results"]}
+    rows = []
+    for r in results:
+        before = previous.get((r["mode"], r["method"], r["route"]))
+        if before is None:
+            continue
+        rps_change = (r["rps"] - before["rps"]) / before["rps"] if before["rps"] else 0.0
+        p95_change = (r["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        rows.append({
+            "mode": r["mode"],
+            "route": f"{r['method']} {r['route']}",
+            "rps": f"{before['rps']} -> {r['rps']} ({rps_change:+.0%})",
+            "p95_ms": f"{before['p95_ms']} -> {r['p95_ms']} ({p95_change:+.0%})",
+            "regression": "YES" if rps_change < -tolerance or p95_change > tolerance else "",
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="Source database (see generate_data.py); it is copied, never modified")
+    parser.add_argument("--mode", choices=("inprocess", "http", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route (scaled down for heavy routes)")
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed requests per read route before measuring")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample", type=int, default=5000, help="Request ids sampled for detail, update and delete routes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache (RESPONSE_CACHE_TTL=0)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p95/throughput change before flagging")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+    results = []
+    for mode in (("inprocess", "http") if args.mode == "both" else (args.mode,)):
+        db_path = copy_database(args.db)
+        try:
+            runner = run_inprocess if mode == "inprocess" else run_http
+            results += asyncio.run(runner(db_path, args))
+        finally:
+            shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    common.print_table(results)
+    conn = sqlite3.connect(args.db)
+    poa_requests = conn.execute("SELECT COUNT(*) FROM poa_requests").fetchone()[0]
+    conn.close()
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database": os.path.abspath(args.db),
+            "poa_requests": poa_requests,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cache": not args.no_cache,
+            **{k: getattr(args, k) for k in ("requests", "warmup", "concurrency", "sample", "seed")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f), args.tolerance)
+        print()
+        common.print_table(rows)
+        regressions = [r for r in rows if r["regression"]]
+        if regressions:
+            print(f"{len(regressions)} route(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Fan-out benchmark for the change feed behind GET /changes.
+
+Connects --subscribers idle subscribers to changes.change_feed in-process, then issues
+--writes PATCHes one after another. Reports how long each change took to reach every
+subscriber after its write committed, the memory held per idle subscriber, and how many
+change_log queries the shared tail loop ran. With per-client polling, every subscriber
+would run its own query each interval instead.
+
+    cd Backend
+    python benchmarks/bench_changes.py --subscribers 5000 --writes 200
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Dict, List
+
+import common
+
+
+async def run(subscribers: int, writes: int, interval: float, poll_interval: float) -> Dict[str, object]:
+    import async_crud
+    import changes
+    import crud
+    import db
+    import storage
+
+    db.init_db()
+    feed = changes.ChangeFeed(poll_interval=poll_interval)
+    queries = 0
+    get_changes = storage.engine.get_changes
+
+    async def counted_get_changes(*args):
+        nonlocal queries
+        queries += 1
+        return await get_changes(*args)
+
+    storage.engine.get_changes = counted_get_changes
+    _, head = crud.get_change_bounds()
+    committed_at: Dict[int, float] = {}
+    latencies: List[float] = []
+    received = [0] * subscribers
+
+    async def subscriber(n: int) -> None:
+        async for frame in feed.stream(head):
+            now = time.perf_counter()
+            for line in frame.split(b"\n"):
+                if line.startswith(b"id: "):
+                    seq = int(line[4:])
+                    if seq in committed_at:
+                        latencies.append(now - committed_at[seq])
+                        received[n] += 1
+            if received[n] == writes:
+                return
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [asyncio.ensure_future(subscriber(n)) for n in range(subscribers)]
+    await asyncio.sleep(0.5)  # Let every subscriber reach its idle wait
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    idle_bytes = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    request_ids = crud.get_poa_requests(None, None, "newest", None, limit=writes)[0]
+    started = time.perf_counter()
+    queries = 0
+    for n in range(writes):
+        request_id = request_ids[n % len(request_ids)]["request_id"]
+        await async_crud.update_poa_request(request_id, {"address": f"Bench address {n}"})
+        committed_at[head + n + 1] = time.perf_counter()
+        await asyncio.sleep(interval)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+    elapsed = time.perf_counter() - started
+    storage.engine.get_changes = get_changes
+
+    return {
+        "subscribers": subscribers,
+        "writes": writes,
+        "delivered": len(latencies),
+        **{k: v for k, v in common.summarize(latencies, elapsed).items() if k.endswith("_ms")},
+        "idle_kb_per_subscriber": round(idle_bytes / max(1, subscribers) / 1024, 2),
+        "feed_queries": queries,
+        "polling_queries": int(subscribers * elapsed / poll_interval),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Database to test against (default: a fresh seeded copy)")
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between writes")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Tail loop poll interval")
+    args = parser.parse_args()
+
+    common.use_database(args.db)
+    result = asyncio.run(run(args.subscribers, args.writes, args.interval, args.poll_interval))
+    common.print_table([result])
+
+
+if __name__ == "__main__":
+    main()
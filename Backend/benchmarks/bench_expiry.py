@@ -0,0 +1,112 @@
+"""
+API write latency during the POA expiration sweep (jobs.expire_poa_requests).
+
+Generates --rows POA requests, many of them Active past their expiration date, then for each
+--batch-sizes value runs the sweep while a writer PATCHes Pending requests every --interval
+seconds through the same storage engine. Writes queue behind the batch holding the SQLite
+write lock, so the writer's worst latency grows with the batch size while the sweep's total
+time barely changes. The first row is the writer alone. Between runs the swept requests are
+made Active again from the change log, so every run expires the same rows.
+
+    cd Backend
+    python benchmarks/bench_expiry.py --rows 200000 --batch-sizes 100,500,5000,100000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import common
+
+# Undoes a sweep: every request it expired after change log entry `seq` becomes Active again
+RESTORE_SQL = """
+    UPDATE poa_requests SET status = 'Active'
+    WHERE status = 'Expired' AND request_id IN (SELECT request_id FROM change_log WHERE seq > ?)
+"""
+
+
+async def run(batch_size: int, targets: List[str], interval: float, idle_seconds: float) -> Dict[str, object]:
+    """Sweeps with `batch_size` (0: no sweep, just `idle_seconds` of writes) while PATCHing `targets`."""
+    import crud
+    import db
+    import jobs
+    import storage
+
+    _, head = crud.get_change_bounds()
+    jobs.EXPIRY_BATCH_SIZE = batch_size
+    latencies: List[float] = []
+    done = asyncio.Event()
+
+    async def writer() -> None:
+        for n in itertools.count():
+            started = time.perf_counter()
+            await storage.engine.update_poa_request(targets[n % len(targets)], {"address": f"Address {n}"})
+            latencies.append(time.perf_counter() - started)
+            if done.is_set():
+                return
+            await asyncio.sleep(interval)
+
+    task = asyncio.ensure_future(writer())
+    started = time.perf_counter()
+    if batch_size:
+        expired = await jobs.expire_poa_requests()
+    else:
+        expired = 0
+        await asyncio.sleep(idle_seconds)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+
+    with db.connection() as conn:
+        conn.execute(RESTORE_SQL, (head,))
+    return {
+        "batch_size": batch_size or "-",
+        "expired": expired,
+        "sweep_s": round(elapsed, 2) if batch_size else "-",
+        "writes": len(latencies),
+        **{f"write_{k}": v for k, v in common.summarize(latencies, elapsed).items() if k.endswith("_ms")},
+    }
+
+
+async def run_all(batch_sizes: List[int], interval: float, idle_seconds: float) -> List[Dict[str, object]]:
+    import db
+    import storage
+
+    await storage.startup()
+    try:
+        with db.connection() as conn:
+            targets = [row[0] for row in conn.execute(
+                "SELECT request_id FROM poa_requests WHERE status = 'Pending' ORDER BY id DESC LIMIT 100")]
+        return [await run(batch_size, targets, interval, idle_seconds) for batch_size in [0] + batch_sizes]
+    finally:
+        await storage.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Generated database to reuse (default: generate --rows into a temporary file)")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-sizes", default="100,500,5000,100000", help="Comma-separated EXPIRY_BATCH_SIZE values")
+    parser.add_argument("--interval", type=float, default=0.002, help="Seconds between writes")
+    parser.add_argument("--idle-seconds", type=float, default=1.0, help="Length of the writer-only baseline")
+    args = parser.parse_args()
+
+    path = args.db
+    if path is None:
+        import generate_data
+
+        path = os.path.join(tempfile.mkdtemp(prefix="legatora-bench-"), "bench.db")
+        generate_data.generate(path, args.rows)
+        import db
+
+        db.close_pool()  # generate() leaves its pool closed; start the runs on a fresh one
+    common.use_database(path)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    common.print_table(asyncio.run(run_all(batch_sizes, args.interval, args.idle_seconds)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares requests/sec on the list and detail endpoints with one connection per call
+(DB_POOL_SIZE=0, the old behaviour) against the pooled connection layer.
+
+    cd Backend
+    python benchmarks/bench_pool.py --threads 8 --duration 5
+"""
+import argparse
+import threading
+import time
+
+import common
+
+
+def run_endpoint(app, path: str, threads: int, duration: float):
+    """Hammers one endpoint from `threads` worker threads for `duration` seconds."""
+    from fastapi.testclient import TestClient
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = TestClient(app)
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.get(path)
+            local.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return common.summarize(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Database to benchmark against (default: a fresh seeded copy)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per endpoint and mode")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--detail-id", default="POA-84622")
+    args = parser.parse_args()
+
+    common.use_database(args.db)
+    import db
+    import main as api
+
+    db.init_db()
+    results = []
+    for mode, size in (("per-call connect", 0), (f"pool({args.pool_size})", args.pool_size)):
+        db.configure_pool(size)
+        for path in ("/poa-requests", f"/poa-requests/{args.detail_id}"):
+            stats = run_endpoint(api.app, path, args.threads, args.duration)
+            results.append({"mode": mode, "endpoint": path, **stats})
+    db.get_pool().close()
+    common.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
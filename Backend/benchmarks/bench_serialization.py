@@ -0,0 +1,125 @@
+"""
+Serialization benchmark and parity check for the detail/batch/list responses.
+
+  pydantic  the old path: build response models from the rows, jsonable_encoder, json.dumps
+  orjson    the new path: serialization.dumps on the trusted rows crud.py returns
+
+First checks that FastAPI's own response_model rendering and serialization.dumps produce
+identical bytes for rows with awkward values (control characters, U+2028, non-ASCII, quotes,
+empty file lists), then times both paths at each --rows size.
+
+    cd Backend
+    python benchmarks/bench_serialization.py --rows 1000 10000 100000
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import common
+
+common.use_database()
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+import crud
+import serialization
+from models import POARequest, POARequestBase, POARequestBatch
+
+EDGE_STRINGS = ["plain", "é ü 漢字 🙂", 'quote " backslash \\ slash /', "ctrl \x00\x01\x1f\t\n", "sep   ", ""]
+
+
+def make_row(i: int, files: int = 2) -> Dict[str, Any]:
+    """A trusted POA request row, shaped like crud.get_poa_request_details_batch() returns it."""
+    text = EDGE_STRINGS[i % len(EDGE_STRINGS)]
+    row: Dict[str, Any] = {field: f"{field} {i} {text}" for field in crud.POA_DETAIL_FIELDS}
+    row["request_id"] = f"POA-{i:07d}"
+    row["submitted_date"] = "2024-05-01"
+    row["version"] = i % 7 + 1
+    row["checklist_items"] = [f"Check {n} {text}" for n in range(i % 3)]
+    row["files"] = [
+        {**dict.fromkeys(crud.POA_FILE_FIELDS), "file_id": i * files + n, "document_type": f"Scan {text}",
+         "file_link": f"/files/{i}/{n}", "submitted_date": "2024-05-01",
+         **({"sha256": "ab" * 32, "size_bytes": 1024 * n, "content_type": "application/pdf"} if n % 2 else {})}
+        for n in range(i % (files + 1))
+    ]
+    return row
+
+
+def check_parity(rows: List[Dict[str, Any]]) -> None:
+    """Asserts the fast path matches FastAPI's response_model output byte for byte."""
+    app = FastAPI()
+    batch = {"items": rows, "missing": ["POA-missing"]}
+    list_rows = [{k: v for k, v in row.items() if k in POARequestBase.model_fields} for row in rows]
+
+    @app.get("/detail", response_model=POARequest)
+    def detail():
+        return rows[0]
+
+    @app.get("/batch", response_model=POARequestBatch)
+    def batch_view():
+        return batch
+
+    @app.get("/list", response_model=List[POARequestBase])
+    def list_view():
+        return list_rows
+
+    client = TestClient(app)
+    for path, content in (("/detail", rows[0]), ("/batch", batch), ("/list", list_rows)):
+        expected = client.get(path).content
+        actual = serialization.dumps(content)
+        if expected != actual:
+            raise AssertionError(f"{path}: serialization.dumps differs from the response_model output")
+    print(f"parity ok: detail, batch and list over {len(rows)} rows")
+
+
+def pydantic_path(rows: List[Dict[str, Any]]) -> bytes:
+    """What the endpoints did before: validate into models, then encode."""
+    batch = POARequestBatch(items=[POARequest(**row) for row in rows], missing=[])
+    return json.dumps(
+        jsonable_encoder(batch), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def orjson_path(rows: List[Dict[str, Any]]) -> bytes:
+    """What the endpoints do now."""
+    return serialization.dumps({"items": rows, "missing": []})
+
+
+def time_path(fn, rows: List[Dict[str, Any]], repeat: int) -> float:
+    """Best wall time in milliseconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    check_parity([make_row(i) for i in range(len(EDGE_STRINGS) * 2)])
+
+    results = []
+    for count in args.rows:
+        rows = [make_row(i) for i in range(count)]
+        slow = time_path(pydantic_path, rows, args.repeat)
+        fast = time_path(orjson_path, rows, args.repeat)
+        results.append({
+            "rows": count,
+            "pydantic_ms": slow,
+            "orjson_ms": fast,
+            "speedup": f"{slow / fast:.1f}x" if fast else "-",
+            "bytes": len(orjson_path(rows)),
+        })
+    common.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
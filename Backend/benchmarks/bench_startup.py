@@ -0,0 +1,142 @@
+"""
+Cold-start benchmark: import cost of main.py and time to the first /poa-requests response.
+
+  import   runs `python -X importtime -c "import main"` and reports the cumulative import
+           time of main and the slowest Backend modules. Importing must not touch the
+           database, so the run fails if the database file appears.
+  startup  starts uvicorn and polls GET /poa-requests until it answers 200, timing from
+           process start. It covers a new database (migrations and mock data), an
+           existing one, and an existing one with DB_AUTO_MIGRATE=0 DB_SEED_MOCK_DATA=0
+           as in production.
+
+Exits with status 1 if importing touches the database or main takes longer than
+--max-import-ms to import.
+
+    cd Backend
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+import common
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def profile_import(db_path: str) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+    """Imports main in a fresh interpreter; returns its cumulative ms and (self, cumulative) ms per module."""
+    env = {**os.environ, "DATABASE_PATH": db_path}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=common.BACKEND_DIR,
+                            env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)) / 1000, int(match.group(2)) / 1000)
+    return modules["main"][1], modules
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(db_path: str, extra_env: Optional[Dict[str, str]] = None, timeout: float = 60) -> float:
+    """Starts uvicorn and returns the seconds until GET /poa-requests first answers 200."""
+    port = _free_port()
+    env = {**os.environ, "DATABASE_PATH": db_path, "BLOB_STORAGE_PATH": common.blob_dir(db_path), **(extra_env or {})}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=common.BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get("/poa-requests").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before answering")
+                time.sleep(0.005)
+        raise RuntimeError(f"No 200 from /poa-requests within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(values),
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Existing database for the warm runs (default: one created by the first cold run)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Backend modules to list by import time")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if importing main takes longer (median)")
+    args = parser.parse_args()
+    work_dir = tempfile.mkdtemp(prefix="legatora-startup-")
+    failed = False
+
+    try:
+        import_ms, modules = [], {}
+        for n in range(args.runs):
+            db_path = os.path.join(work_dir, f"import-{n}.db")
+            total, modules = profile_import(db_path)
+            import_ms.append(total / 1000)
+            if os.path.exists(db_path):
+                print("FAIL: importing main created the database; database work belongs in the lifespan")
+                failed = True
+        backend = {name[:-3] for name in os.listdir(common.BACKEND_DIR) if name.endswith(".py")}
+        print("Import time")
+        common.print_table([{"module": "main", **_stats(import_ms)}])
+        print()
+        slowest = sorted((m for m in modules.items() if m[0] in backend), key=lambda m: m[1][1], reverse=True)
+        common.print_table([{"module": name, "self_ms": round(own, 1), "cumulative_ms": round(total, 1)}
+                            for name, (own, total) in slowest[:args.top]])
+        if args.max_import_ms is not None and statistics.median(import_ms) * 1000 > args.max_import_ms:
+            print(f"FAIL: importing main takes {statistics.median(import_ms) * 1000:.1f} ms (budget {args.max_import_ms} ms)")
+            failed = True
+
+        cold = []
+        for n in range(args.runs):
+            cold.append(time_to_first_response(os.path.join(work_dir, f"cold-{n}.db")))
+        warm_db = args.db or os.path.join(work_dir, "cold-0.db")
+        warm = [time_to_first_response(warm_db) for _ in range(args.runs)]
+        production = [time_to_first_response(warm_db, {"DB_AUTO_MIGRATE": "0", "DB_SEED_MOCK_DATA": "0"})
+                      for _ in range(args.runs)]
+        print()
+        print("Time to first 200 from GET /poa-requests")
+        common.print_table([
+            {"database": "new (migrate + seed)", **_stats(cold)},
+            {"database": "existing", **_stats(warm)},
+            {"database": "existing, bootstrap off", **_stats(production)},
+        ])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Shared helpers for the Backend benchmark scripts."""
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+# Benchmarks live in Backend/benchmarks but import the Backend modules directly
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def use_database(path: Optional[str] = None) -> str:
+    """
+    Points the Backend at `path` (a fresh temporary database by default), with uploaded blobs
+    stored next to it. Must be called before `db` is imported, since the paths are read at import time.
+    The background jobs stay off unless SCHEDULER_ENABLED is set, so they do not write mid-measurement.
+    """
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="legatora-bench-"), "bench.db")
+    os.environ["DATABASE_PATH"] = path
+    os.environ["BLOB_STORAGE_PATH"] = blob_dir(path)
+    os.environ.setdefault("SCHEDULER_ENABLED", "0")
+    return path
+
+def blob_dir(db_path: str) -> str:
+    """Blob store directory used alongside a benchmark database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "blobs")
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Turns per-request latencies (seconds) into throughput and latency percentiles (ms)."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+def print_table(rows: List[Dict[str, object]]) -> None:
+    """Prints a list of flat dicts as an aligned text table."""
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = {h: max(len(h), *(len(str(r[h])) for r in rows)) for h in headers}
+    print("  ".join(h.ljust(widths[h]) for h in headers))
+    for r in rows:
+        print("  ".join(str(r[h]).ljust(widths[h]) for h in headers))
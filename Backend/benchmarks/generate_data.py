@@ -0,0 +1,238 @@
+"""
+Seeded synthetic data generator for benchmarking at realistic scale.
+
+Fills poa_requests, poa_request_files, external_doc_verifications and external_doc_files
+with --rows POA requests (1e4 to 1e7). About --external-ratio of them also get an external
+document verification under the same request_id, as in data.sql. Rows are generated in
+submitted_date order, so ids grow with time as they would in production. Request volume
+grows towards --end-date, categories and statuses follow fixed weights, and requests carry
+0-5 files.
+
+The same --seed, --rows and --end-date always produce the same database.
+
+    cd Backend
+    python benchmarks/generate_data.py --db /tmp/bench.db --rows 100000
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import common
+
+CATEGORY_WEIGHTS = {"Property": 35, "Vehicle": 20, "Business": 20, "Medical": 15, "Financial": 10}
+POA_STATUS_WEIGHTS = {"Active": 55, "Pending": 25, "Rejected": 12, "Expired": 8}
+EXTERNAL_STATUS_WEIGHTS = {"Verified": 60, "Pending": 28, "Rejected": 12}
+FILE_COUNT_WEIGHTS = {0: 8, 1: 17, 2: 30, 3: 25, 4: 13, 5: 7}
+
+FIRST_NAMES = ("Abebe", "Megersa", "Binlam", "Ketema", "Nati", "Sintayewu", "Badesa", "Almaz", "Tigist",
+               "Hana", "Dawit", "Selam", "Yonas", "Meron", "Eyerusalem", "Kebede", "Lensa", "Chala")
+LAST_NAMES = ("Bikila", "Illicha", "Alela", "Megersa", "Geleta", "Amele", "Alex", "Alem", "Tesfaye",
+              "Haile", "Gebre", "Tadesse", "Wolde", "Negash", "Bekele", "Ayana", "Desta", "Girma")
+REGIONS = ("Addis Ababa", "Oromia", "Tigray", "Amhara", "Sidama", "Afar", "Somali", "Harari", "Dire Dawa")
+AGENTS = tuple(f"{f} {l}" for f, l in zip(FIRST_NAMES[::2], LAST_NAMES[1::2]))
+POWERS = {
+    "Property": ("To sell, lease, or otherwise dispose of real property.", "General property management."),
+    "Vehicle": ("To buy and sell vehicles on behalf of the principal.", "To register and insure vehicles."),
+    "Business": ("To manage all business operations and finances.", "To sign contracts for the business."),
+    "Medical": ("To make all healthcare decisions.", "To consent to or refuse medical treatments."),
+    "Financial": ("To operate bank accounts and investments.", "To file taxes and manage payments."),
+}
+POA_DOCUMENTS = ("POWER OF ATTORNEY", "ID Front", "ID Back", "Proof of Address", "Supporting Letter")
+EXTERNAL_DOCUMENTS = ("Title Deed", "Applicant's Passport", "Utility Bill (Proof of Address)",
+                      "Business License", "Medical History Form", "Consent Form")
+REJECTIONS = (("Scanned copy is blurry and unreadable.", "Please re-upload a clear, high-resolution scan."),
+              ("License is expired.", "Please submit an active and renewed document."),
+              ("Name does not match the application.", "Please upload a document issued to the applicant."))
+
+POA_SQL = """
+    INSERT INTO poa_requests (request_id, principal, category, submitted_date, assigned_agent, status,
+                              contact_info, address, expiration_date, description_of_power)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+POA_FILE_SQL = "INSERT INTO poa_request_files (request_id, document_type, file_link, submitted_date) VALUES (?, ?, ?, ?)"
+EXTERNAL_SQL = """
+    INSERT INTO external_doc_verifications (request_id, applicant, category, submitted_date, status, contact_info, address)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+EXTERNAL_FILE_SQL = """
+    INSERT INTO external_doc_files (request_id, document_type, file_link, submitted_date, rejection_reason, comment)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def _chooser(rng: random.Random, weights: Dict[Any, int]) -> Callable[[], Any]:
+    """Returns a function drawing one key of `weights` with probability proportional to its weight."""
+    keys = list(weights)
+    cumulative = list(itertools.accumulate(weights.values()))
+    return lambda: keys[bisect.bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+
+def requests_per_day(rows: int, start: date, end: date, growth: float) -> Iterator[Tuple[date, int]]:
+    """
+    Spreads `rows` over the days from `start` to `end`, with daily volume growing linearly
+    so the last day sees `growth` times the first. Weekends get a third of a weekday's volume.
+    """
+    days = (end - start).days + 1
+    weights = []
+    for d in range(days):
+        day = start + timedelta(days=d)
+        weight = 1 + (growth - 1) * d / max(1, days - 1)
+        weights.append(weight / 3 if day.weekday() >= 5 else weight)
+    total = sum(weights)
+    assigned, carry = 0, 0.0
+    for d, weight in enumerate(weights):
+        # Carry the fractional part forward so the counts add up to exactly `rows`
+        exact = rows * weight / total + carry
+        count = int(exact)
+        carry = exact - count
+        if d == days - 1:
+            count = rows - assigned
+        assigned += count
+        yield start + timedelta(days=d), count
+
+
+def generate_rows(rows: int, seed: int, end: date, years: float, growth: float,
+                  external_ratio: float) -> Iterator[Tuple[str, tuple]]:
+    """Yields (insert SQL, parameters) for every generated row, in submitted_date order."""
+    rng = random.Random(seed)
+    category = _chooser(rng, CATEGORY_WEIGHTS)
+    poa_status = _chooser(rng, POA_STATUS_WEIGHTS)
+    external_status = _chooser(rng, EXTERNAL_STATUS_WEIGHTS)
+    file_count = _chooser(rng, FILE_COUNT_WEIGHTS)
+    start = end - timedelta(days=int(365 * years))
+
+    n = 0
+    for day, count in requests_per_day(rows, start, end, growth):
+        submitted = day.isoformat()
+        for _ in range(count):
+            n += 1
+            request_id = f"POA-{n:08d}"
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            cat = category()
+            status = poa_status()
+            phone = f"+2519{rng.randrange(10 ** 8):08d}"
+            address = f"{rng.choice(REGIONS)}, Ethiopia"
+            agent = "Unassigned" if status == "Pending" and rng.random() < 0.6 else rng.choice(AGENTS)
+            expiration = (day + timedelta(days=rng.choice((365, 730, 1095)))).isoformat()
+            yield POA_SQL, (request_id, name, cat, submitted, agent, status, phone, address, expiration,
+                            rng.choice(POWERS[cat]))
+
+            for f in range(file_count()):
+                uploaded = (day - timedelta(days=rng.randrange(3))).isoformat()
+                yield POA_FILE_SQL, (request_id, POA_DOCUMENTS[f % len(POA_DOCUMENTS)],
+                                     f"/files/{request_id.lower()}/poa-{f}.pdf", uploaded)
+
+            if rng.random() < external_ratio:
+                doc_status = external_status()
+                yield EXTERNAL_SQL, (request_id, name, cat, submitted, doc_status, phone, address)
+                for f in range(max(1, file_count())):
+                    uploaded = (day - timedelta(days=rng.randrange(7))).isoformat()
+                    reason, comment = (None, None)
+                    if doc_status != "Verified" and rng.random() < 0.5:
+                        reason, comment = rng.choice(REJECTIONS)
+                    yield EXTERNAL_FILE_SQL, (request_id, rng.choice(EXTERNAL_DOCUMENTS),
+                                              f"/files/{request_id.lower()}/doc-{f}.pdf", uploaded, reason, comment)
+
+
+def load(conn: sqlite3.Connection, rows: Iterator[Tuple[str, tuple]], batch_size: int, total: int) -> Dict[str, int]:
+    """Inserts generated rows with executemany, one transaction per `batch_size` POA requests."""
+    counts: Dict[str, int] = {}
+    pending: Dict[str, List[tuple]] = {}
+    requests = 0
+    started = time.perf_counter()
+
+    def flush():
+        for sql in (POA_SQL, POA_FILE_SQL, EXTERNAL_SQL, EXTERNAL_FILE_SQL):
+            if pending.get(sql):
+                conn.executemany(sql, pending[sql])
+        conn.commit()
+        pending.clear()
+        elapsed = time.perf_counter() - started
+        print(f"  {requests}/{total} requests ({requests / elapsed:,.0f}/s)", flush=True)
+
+    for sql, params in rows:
+        if sql is POA_SQL:
+            # Flush before starting a new request, so its files land in the same transaction
+            if requests and requests % batch_size == 0:
+                flush()
+            requests += 1
+        pending.setdefault(sql, []).append(params)
+        counts[sql] = counts.get(sql, 0) + 1
+    flush()
+    return {
+        "poa_requests": counts.get(POA_SQL, 0),
+        "poa_request_files": counts.get(POA_FILE_SQL, 0),
+        "external_doc_verifications": counts.get(EXTERNAL_SQL, 0),
+        "external_doc_files": counts.get(EXTERNAL_FILE_SQL, 0),
+    }
+
+
+def generate(path: str, rows: int, seed: int = 42, end: Optional[date] = None, years: float = 3.0, growth: float = 3.0,
+             external_ratio: float = 0.5, batch_size: int = 10000) -> Dict[str, int]:
+    """
+    Creates a fresh database at `path`, brings it to the current schema and fills it.
+    Triggers are dropped during the load: maintaining the FTS index and the rollups row by row
+    dominates the load time, so both are rebuilt once at the end instead.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists; generate into a new file")
+    common.use_database(path)
+    import crud
+    import db
+
+    db.migrate()
+    conn = sqlite3.connect(path)
+    try:
+        # Nothing to protect until the load finishes; the file is discarded on failure
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.commit()
+
+        counts = load(conn, generate_rows(rows, seed, end or date.today(), years, growth, external_ratio),
+                      batch_size, rows)
+
+        for _, sql in triggers:
+            conn.execute(sql)
+        conn.execute("INSERT INTO poa_requests_fts (poa_requests_fts) VALUES ('rebuild')")
+        conn.commit()
+    finally:
+        conn.close()
+    crud.rebuild_rollups()
+    with db.connection() as conn:
+        conn.execute("ANALYZE")
+    db.get_pool().close()
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="Path of the database to create")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of POA requests")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Latest submitted_date (YYYY-MM-DD); pin it for byte-identical reruns")
+    parser.add_argument("--years", type=float, default=3.0, help="How far back submitted dates go")
+    parser.add_argument("--growth", type=float, default=3.0, help="Daily volume on the last day relative to the first")
+    parser.add_argument("--external-ratio", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=10000, help="POA requests per transaction")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = generate(args.db, args.rows, args.seed, args.end_date, args.years, args.growth,
+                      args.external_ratio, args.batch_size)
+    common.print_table([{"table": table, "rows": n} for table, n in counts.items()])
+    print(f"Generated {args.db} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
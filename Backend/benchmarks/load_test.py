@@ -0,0 +1,94 @@
+"""
+Load test for the data-access paths behind the endpoints at high concurrency.
+
+  threadpool  the old path: sync crud functions through FastAPI's default threadpool
+  async       the new path: async_crud (reader pool + single writer thread)
+
+Each of --concurrency clients runs --requests operations, a mix of list and detail
+reads with --write-ratio creates. Reports throughput and p50/p99 latency per path.
+
+    cd Backend
+    python benchmarks/load_test.py --concurrency 500 --requests 20
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import common
+
+
+async def run_path(name: str, ops, concurrency: int, requests: int, write_ratio: float, seed: int):
+    """Runs the workload against one set of operations; returns summary rows per operation kind."""
+    rng = random.Random(seed)
+    latencies = {"read": [], "write": []}
+
+    async def client():
+        for _ in range(requests):
+            kind = "write" if rng.random() < write_ratio else "read"
+            op = ops[kind] if kind == "write" else rng.choice(ops["read"])
+            start = time.perf_counter()
+            await op()
+            latencies[kind].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return [
+        {"path": name, "kind": kind, **common.summarize(values, elapsed)}
+        for kind, values in latencies.items() if values
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Database to test against (default: a fresh seeded copy)")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="Operations per client")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    common.use_database(args.db)
+    from starlette.concurrency import run_in_threadpool
+
+    import async_crud
+    import crud
+    import db
+    from models import NewPOARequest
+
+    new_request = NewPOARequest(
+        full_name="Load Test", contact_info="+251900000000", address="Addis Ababa, Ethiopia",
+        category="Property", description_of_power="Load test request.", checklist_items=[]
+    )
+    db.init_db()
+    detail_id = crud.get_poa_requests(None, None, "newest", None, 1)[0][0]["request_id"]
+
+    def threadpool(fn, *fn_args):
+        return lambda: run_in_threadpool(fn, *fn_args)
+
+    def direct(fn, *fn_args):
+        return lambda: fn(*fn_args)
+
+    paths = {
+        "threadpool": {
+            "read": [threadpool(crud.get_poa_requests, None, None, "newest", None),
+                     threadpool(crud.get_poa_request_details, detail_id)],
+            "write": threadpool(crud.create_poa_request, new_request),
+        },
+        "async": {
+            "read": [direct(async_crud.get_poa_requests, None, None, "newest", None),
+                     direct(async_crud.get_poa_request_details, detail_id)],
+            "write": direct(async_crud.create_poa_request, new_request),
+        },
+    }
+
+    results = []
+    for name, ops in paths.items():
+        results += asyncio.run(run_path(name, ops, args.concurrency, args.requests, args.write_ratio, args.seed))
+    async_crud.shutdown()
+    common.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Conformance checks and a latency comparison for the storage engines (see storage.py).
+
+Each engine runs in its own interpreter against a fresh database seeded with data.sql, with
+the response cache off, and goes through the same steps via the ASGI app:
+
+  parity   GET responses over the mock data, before any write; they must be byte-identical
+           across engines (relevance-sorted search is compared as a set of ids)
+  checks   list paging, filters, projection, search, facets, details, batches, create, PATCH
+           with If-Match, transitions, uploads and downloads, import, export, delete cascade,
+           the change log, the dashboard and the background jobs (run directly; the scheduler is off)
+  timing   p50/p95 of the main read and write operations over --iterations calls
+
+PostgreSQL runs in a scratch database created on --postgres-dsn (e.g. a local container:
+`docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=pg postgres:16` then
+--postgres-dsn postgresql://postgres:pg@localhost/postgres), or on an embedded server with
+--embedded-postgres (needs `pip install pgserver`). Without either, only SQLite runs.
+
+    cd Backend
+    python benchmarks/storage_conformance.py --embedded-postgres
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+import common
+
+PARITY_GETS = (
+    "/poa-requests",
+    "/poa-requests?limit=2",
+    "/poa-requests?sort_by=oldest&fields=request_id,status",
+    "/poa-requests?category=Medical&status=Active",
+    "/poa-requests?search=megersa",
+    "/poa-requests?search=Addis%20Ababa",
+    "/poa-requests?search=megersa%202",
+    "/poa-requests/facets",
+    "/poa-requests/facets?category=Medical",
+    "/poa-requests/facets?search=megersa&status=Active",
+    "/poa-requests/POA-84622",
+    "/poa-requests:batch?ids=POA-84621,POA-84622,missing",
+    "/external-doc-verification",
+    "/external-doc-verification?status=Verified&sort_by=oldest",
+    "/external-doc-verification/facets?status=Verified",
+    "/external-doc-verification/POA-84621",
+    "/external-doc-verification:batch?ids=POA-84620,POA-84613",
+    "/poa-requests/export",
+)
+RELEVANCE_GET = "/poa-requests?search=megersa&sort_by=relevance"
+
+NEW_REQUEST = {"full_name": "Conformance Check", "contact_info": "+251900000000", "address": "Dire Dawa, Ethiopia",
+               "category": "Financial", "description_of_power": "To operate bank accounts.",
+               "checklist_items": ["ID copy", "Bank letter"]}
+
+
+class Checks:
+    """Collects named pass/fail results instead of stopping at the first failure."""
+
+    def __init__(self):
+        self.results: Dict[str, str] = {}
+
+    def check(self, name: str, ok: bool, detail: Any = "") -> None:
+        self.results[name] = "ok" if ok else f"FAIL {detail}"[:200]
+
+
+async def parity(client: httpx.AsyncClient) -> Dict[str, str]:
+    """Response bodies of PARITY_GETS by path; the relevance search as its sorted ids."""
+    bodies = {path: (await client.get(path)).text for path in PARITY_GETS}
+    rows = (await client.get(RELEVANCE_GET)).json()
+    bodies[RELEVANCE_GET] = json.dumps(sorted(r["request_id"] for r in rows))
+    return bodies
+
+
+async def run_checks(client: httpx.AsyncClient, engine) -> Dict[str, str]:
+    import jobs
+
+    c = Checks()
+
+    # Paging, filters and projection
+    seen, cursor = [], None
+    while True:
+        r = await client.get("/poa-requests", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += [row["request_id"] for row in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    everything = [row["request_id"] for row in (await client.get("/poa-requests?limit=500")).json()]
+    c.check("paging covers every row once", seen == everything and len(set(seen)) == len(seen), seen)
+    oldest = [row["submitted_date"] for row in (await client.get("/poa-requests?sort_by=oldest")).json()]
+    c.check("oldest first", oldest == sorted(oldest), oldest)
+    newest = (await client.get("/poa-requests?limit=1")).headers.get("x-next-cursor")
+    c.check("newest cursor with oldest is 400",
+            (await client.get(f"/poa-requests?sort_by=oldest&cursor={newest}")).status_code == 400)
+    rows = (await client.get("/poa-requests?category=Medical")).json()
+    c.check("category filter", rows and all(row["category"] == "Medical" for row in rows), rows)
+    rows = (await client.get("/poa-requests?fields=request_id,status")).json()
+    c.check("field projection", all(list(row) == ["request_id", "status"] for row in rows), rows[:1])
+    c.check("unknown field is 400", (await client.get("/poa-requests?fields=nope")).status_code == 400)
+    rows, blank = (await client.get("/poa-requests")).json(), (await client.get("/poa-requests?fields=,,")).json()
+    c.check("blank projection returns every field", blank == rows, blank[:1])
+    c.check("unknown sort is rejected", (await client.get("/poa-requests?sort_by=bogus")).status_code == 422)
+    c.check("bad cursor is 400", (await client.get("/poa-requests?cursor=!!")).status_code == 400)
+
+    # Search and facets
+    rows = (await client.get("/poa-requests?search=megersa")).json()
+    c.check("search matches any column", {row["request_id"] for row in rows} == {"POA-84621", "POA-84619", "POA-84613"}, rows)
+    relevance = (await client.get(RELEVANCE_GET + "&limit=1")).headers.get("x-next-cursor")
+    page_two = await client.get(f"{RELEVANCE_GET}&limit=1&cursor={relevance}")
+    c.check("relevance paging", page_two.status_code == 200 and len(page_two.json()) == 1, page_two.text)
+    c.check("cursor of another sort is 400", (await client.get(f"/poa-requests?cursor={relevance}")).status_code == 400)
+    facets = (await client.get("/poa-requests/facets?category=Medical")).json()
+    listed = len((await client.get("/poa-requests?category=Medical&limit=500")).json())
+    c.check("facet total matches the list", facets["total"] == listed, (facets, listed))
+    facets = (await client.get("/poa-requests/facets?search=megersa")).json()
+    c.check("search facets", facets["total"] == 3, facets)
+
+    # Details
+    detail = await client.get("/poa-requests/POA-84622")
+    c.check("detail with files", detail.status_code == 200 and len(detail.json()["files"]) == 3, detail.text)
+    c.check("detail ETag", detail.headers.get("etag") == '"v1"', detail.headers.get("etag"))
+    c.check("unknown detail is 404", (await client.get("/poa-requests/POA-NOPE")).status_code == 404)
+    batch = (await client.get("/external-doc-verification:batch?ids=POA-84621,missing,POA-84621")).json()
+    c.check("batch dedupes and reports missing", len(batch["items"]) == 1 and batch["missing"] == ["missing"], batch)
+
+    # Writes
+    _, head = await engine.get_change_bounds()
+    created = await client.post("/poa-requests", json=NEW_REQUEST)
+    request_id = created.json().get("request_id")
+    detail = (await client.get(f"/poa-requests/{request_id}")).json()
+    c.check("create", created.status_code == 201 and detail["checklist_items"] == NEW_REQUEST["checklist_items"]
+            and detail["status"] == "Pending" and detail["version"] == 1, detail)
+    patched = await client.patch(f"/poa-requests/{request_id}", json={"address": "Harari, Ethiopia", "checklist_items": ["Only"]},
+                                 headers={"If-Match": '"v1"'})
+    c.check("conditional PATCH", patched.status_code == 200 and patched.json()["version"] == 2, patched.text)
+    stale = await client.patch(f"/poa-requests/{request_id}", json={"address": "Afar"}, headers={"If-Match": '"v1"'})
+    c.check("stale If-Match is 409", stale.status_code == 409 and stale.headers.get("etag") == '"v2"', stale.text)
+    c.check("null required field is 400",
+            (await client.patch(f"/poa-requests/{request_id}", json={"full_name": None})).status_code == 400)
+    detail = (await client.get(f"/poa-requests/{request_id}")).json()
+    c.check("PATCH applied", detail["address"] == "Harari, Ethiopia" and detail["checklist_items"] == ["Only"], detail)
+    outcome = (await client.post("/poa-requests:transition",
+                                 json={"request_ids": [request_id, "POA-84622", "missing", request_id], "status": "Active"})).json()
+    c.check("transition outcomes", outcome == {"updated": [request_id], "unchanged": ["POA-84622"], "not_found": ["missing"]}, outcome)
+    facets = (await client.get("/poa-requests/facets?category=Financial")).json()
+    c.check("rollups follow writes", facets["status"] == {"Active": 1}, facets)
+
+    body = os.urandom(50_000)
+    uploaded = await client.post(f"/poa-requests/{request_id}/files?document_type=ID%20Front", content=body,
+                                 headers={"Content-Type": "application/pdf"})
+    file = uploaded.json()
+    c.check("upload", uploaded.status_code == 201 and file["size_bytes"] == len(body), uploaded.text)
+    download = await client.get(file["file_link"])
+    c.check("download", download.content == body and download.headers["content-type"] == "application/pdf")
+    ranged = await client.get(file["file_link"], headers={"Range": "bytes=10-19"})
+    c.check("download range", ranged.status_code == 206 and ranged.content == body[10:20], ranged.status_code)
+    c.check("download 304", (await client.get(file["file_link"], headers={"If-None-Match": download.headers["etag"]})).status_code == 304)
+    c.check("upload to unknown request is 404",
+            (await client.post("/poa-requests/POA-NOPE/files?document_type=x", content=b"x")).status_code == 404)
+
+    imported = (await client.post("/poa-requests/import?batch_size=2", content=(
+        json.dumps({**NEW_REQUEST, "full_name": "Imported One"}) + "\n{\"full_name\": 1}\n"
+        + json.dumps({**NEW_REQUEST, "full_name": "Imported Two"}) + "\n"
+    ).encode())).json()
+    c.check("import", imported["inserted"] == 2 and [e["line"] for e in imported["errors"]] == [2], imported)
+    export = (await client.get("/poa-requests/export")).text.splitlines()
+    total = (await client.get("/poa-requests/facets")).json()["total"]
+    c.check("export every row", len(export) == total, (len(export), total))
+    csv_export = (await client.get("/poa-requests/export?format=csv&category=Financial")).text.splitlines()
+    c.check("CSV export", csv_export[0].startswith("request_id,") and len(csv_export) == 4, csv_export[:2])
+
+    deleted = await client.delete(f"/poa-requests/{request_id}")
+    c.check("delete", deleted.status_code == 200 and (await client.get(f"/poa-requests/{request_id}")).status_code == 404)
+    c.check("files go with the request", (await client.get(file["file_link"])).status_code == 404)
+    c.check("second delete is 404", (await client.delete(f"/poa-requests/{request_id}")).status_code == 404)
+
+    changes = [(ch["request_id"], ch["op"], ch["version"]) for ch in await engine.get_changes(head, 100)
+               if ch["request_id"] == request_id]
+    c.check("change log", changes == [(request_id, "insert", 1), (request_id, "update", 2), (request_id, "update", 3),
+                                      (request_id, "update", 4), (request_id, "delete", None)], changes)
+    oldest, new_head = await engine.get_change_bounds()
+    c.check("change bounds", oldest <= head + 1 and new_head == head + 7, (oldest, head, new_head))
+
+    dashboard = (await client.get("/dashboard")).json()
+    c.check("dashboard", dashboard["annual_total"] == sum(m["count"] for m in dashboard["monthly_activity"])
+            and dashboard["total_poa_requests"]["current_month"] >= 2, dashboard["total_poa_requests"])
+
+    expired = await jobs.scheduler.run_job("expire_poa_requests")
+    status = (await client.get("/poa-requests/POA-84622")).json()["status"]
+    c.check("expiry sweep", expired >= 1 and status == "Expired", (expired, status))
+    c.check("second sweep expires nothing", await jobs.scheduler.run_job("expire_poa_requests") == 0)
+    c.check("rollups have no drift", await jobs.scheduler.run_job("reconcile_rollups") == 0)
+    return c.results
+
+
+async def timings(client: httpx.AsyncClient, iterations: int) -> Dict[str, Dict[str, float]]:
+    """p50/p95 in ms of each operation over `iterations` sequential calls."""
+    request_id = (await client.post("/poa-requests", json=NEW_REQUEST)).json()["request_id"]
+    counter = iter(range(10 ** 9))
+    operations: Dict[str, Callable[[], Any]] = {
+        "list page": lambda: client.get("/poa-requests?limit=50"),
+        "list filtered": lambda: client.get("/poa-requests?category=Medical&status=Active"),
+        "search": lambda: client.get("/poa-requests?search=megersa"),
+        "facets": lambda: client.get("/poa-requests/facets"),
+        "detail": lambda: client.get("/poa-requests/POA-84622"),
+        "batch": lambda: client.get("/poa-requests:batch?ids=POA-84621,POA-84622,POA-84620"),
+        "dashboard": lambda: client.get("/dashboard"),
+        "create": lambda: client.post("/poa-requests", json=NEW_REQUEST),
+        "patch": lambda: client.patch(f"/poa-requests/{request_id}", json={"address": f"Address {next(counter)}"}),
+        "transition": lambda: client.post("/poa-requests:transition",
+                                          json={"request_ids": [request_id], "assigned_agent": f"Agent {next(counter)}"}),
+    }
+    results = {}
+    for name, operation in operations.items():
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = await operation()
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+        latencies.sort()
+        results[name] = {"p50_ms": round(statistics.median(latencies) * 1000, 2),
+                         "p95_ms": round(common.percentile(latencies, 95) * 1000, 2)}
+    return results
+
+
+async def run_engine(iterations: int) -> Dict[str, Any]:
+    """Runs parity, checks and timings against the engine configured in the environment."""
+    import main as api
+    import storage
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://conformance", timeout=None) as client:
+            return {
+                "parity": await parity(client),
+                "checks": await run_checks(client, storage.engine),
+                "timings": await timings(client, iterations),
+            }
+
+
+def _scratch_dsn(dsn: str, database: str) -> str:
+    """The DSN with its database name replaced."""
+    parts = urlsplit(dsn)
+    return urlunsplit(parts._replace(path="/" + database))
+
+
+async def _admin(dsn: str, statement: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(statement)
+    finally:
+        await conn.close()
+
+
+def run_child(engine: str, env: Dict[str, str], iterations: int) -> Dict[str, Any]:
+    """Runs one engine in a fresh interpreter, since the engine and paths are read at import time."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    try:
+        subprocess.run([sys.executable, __file__, "--child", output, "--iterations", str(iterations)],
+                       cwd=common.BACKEND_DIR, env={**os.environ, **env, "STORAGE_ENGINE": engine}, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postgres-dsn", default=os.environ.get("POSTGRES_DSN"),
+                        help="Server to create the scratch database on (default: $POSTGRES_DSN)")
+    parser.add_argument("--embedded-postgres", action="store_true", help="Start a throwaway server with pgserver")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per timed operation")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = asyncio.run(run_engine(args.iterations))
+        with open(args.child, "w") as f:
+            json.dump(result, f)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="legatora-conformance-")
+    server = None
+    try:
+        if args.embedded_postgres:
+            import pgserver
+
+            server = pgserver.get_server(os.path.join(work_dir, "pgdata"), cleanup_mode="stop")
+            args.postgres_dsn = server.get_uri()
+        base_env = {"RESPONSE_CACHE_TTL": "0", "DB_AUTO_MIGRATE": "1", "DB_SEED_MOCK_DATA": "1", "SCHEDULER_ENABLED": "0"}
+        results = {"sqlite": run_child("sqlite", {**base_env, "DATABASE_PATH": os.path.join(work_dir, "sqlite.db"),
+                                                  "BLOB_STORAGE_PATH": os.path.join(work_dir, "sqlite-blobs")},
+                                       args.iterations)}
+        if args.postgres_dsn:
+            database = f"legatora_conformance_{uuid.uuid4().hex[:8]}"
+            asyncio.run(_admin(args.postgres_dsn, f"CREATE DATABASE {database}"))
+            try:
+                results["postgres"] = run_child("postgres", {
+                    **base_env, "POSTGRES_DSN": _scratch_dsn(args.postgres_dsn, database),
+                    "BLOB_STORAGE_PATH": os.path.join(work_dir, "postgres-blobs"),
+                }, args.iterations)
+            finally:
+                asyncio.run(_admin(args.postgres_dsn, f"DROP DATABASE IF EXISTS {database}"))
+        else:
+            print("No --postgres-dsn or --embedded-postgres: checking SQLite only")
+    finally:
+        if server is not None:
+            server.cleanup()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    engines = list(results)
+    failed = False
+    print("Checks")
+    rows = []
+    for name in results["sqlite"]["checks"]:
+        row = {"check": name, **{e: results[e]["checks"].get(name, "missing") for e in engines}}
+        failed = failed or any(row[e] != "ok" for e in engines)
+        rows.append(row)
+    common.print_table(rows)
+
+    if len(engines) > 1:
+        print()
+        print("Parity (GET responses over the mock data)")
+        rows = []
+        for path, body in results["sqlite"]["parity"].items():
+            same = all(results[e]["parity"][path] == body for e in engines)
+            failed = failed or not same
+            rows.append({"request": path, "identical": "yes" if same else "NO"})
+        common.print_table(rows)
+
+    print()
+    print("Latency")
+    common.print_table([
+        {"operation": op, **{f"{e}_{k}": results[e]["timings"][op][k] for e in engines for k in ("p50_ms", "p95_ms")}}
+        for op in results["sqlite"]["timings"]
+    ])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Content-addressed storage for uploaded document bodies.
+
+Each blob is stored once, as blobs/<first two hex digits>/<sha256>, however many file rows
+point at it. Uploads are hashed while they stream to a temporary file, which is then renamed
+into place. A body is never held in memory, and readers never see a partial blob.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOB_DIR = os.environ.get("BLOB_STORAGE_PATH", os.path.join(BASE_DIR, "blobs"))
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+# Content types kept as uploaded. Anything else (HTML, SVG, scripts...) is stored and served as
+# an opaque download, so an uploaded body can never run as a page on the API's origin
+ALLOWED_CONTENT_TYPES = frozenset((
+    "application/pdf", "image/jpeg", "image/png", "image/gif", "image/webp", "image/tiff", "image/heic",
+))
+FALLBACK_CONTENT_TYPE = "application/octet-stream"
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES; nothing is stored."""
+
+
+def blob_path(sha256: str) -> str:
+    """Where the blob with this hash lives (whether or not it exists)."""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256)
+
+def safe_content_type(content_type: Optional[str]) -> str:
+    """The media type of a Content-Type header if it is in ALLOWED_CONTENT_TYPES, else application/octet-stream."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return media_type if media_type in ALLOWED_CONTENT_TYPES else FALLBACK_CONTENT_TYPE
+
+async def store(chunks: AsyncIterator[bytes], max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, int]:
+    """
+    Streams `chunks` into the store and returns (sha256, size). If a blob with the same
+    content already exists, the upload is discarded and the existing blob is reused.
+    """
+    tmp_dir = os.path.join(BLOB_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    digest = hashlib.sha256()
+    size = 0
+    loop = asyncio.get_running_loop()
+
+    def write(f, chunk: bytes) -> None:
+        # hashlib releases the GIL on large buffers, so both steps run off the event loop
+        digest.update(chunk)
+        f.write(chunk)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                await loop.run_in_executor(None, write, f, chunk)
+            await loop.run_in_executor(None, os.fsync, f.fileno())
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return sha256, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import ValidationError
+
+import storage
+from models import NewPOARequest
+
+# Longest NDJSON line or CSV record accepted; longer ones are skipped and reported as errors
+MAX_LINE_BYTES = int(os.environ.get("IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))
+
+
+class LineTooLong(ValueError):
+    """Raised for a line or record longer than MAX_LINE_BYTES; the rest of the import continues."""
+
+
+# --- 1. Streaming Input ---
+async def iter_lines(chunks: AsyncIterator[bytes],
+                     max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Union[str, LineTooLong]]]:
+    """
+    Splits a streamed request body into (line number, line) pairs, each line with its ending,
+    without buffering the whole body: each chunk is scanned once, and only the current line is
+    held. A line longer than `max_line_bytes` is dropped as it arrives and yielded as a LineTooLong.
+    """
+    parts: List[bytes] = []
+    size = 0
+    too_long = False
+    line_number = 0
+    async for chunk in chunks:
+        start = 0
+        while start < len(chunk):
+            end = chunk.find(b"\n", start) + 1 or len(chunk)
+            part = chunk[start:end]
+            start = end
+            size += len(part)
+            if size > max_line_bytes:
+                too_long, parts = True, []
+            elif not too_long:
+                parts.append(part)
+            if part.endswith(b"\n"):
+                line_number += 1
+                yield line_number, _line(parts, too_long, max_line_bytes)
+                parts, size, too_long = [], 0, False
+    if size:
+        yield line_number + 1, _line(parts, too_long, max_line_bytes)
+
+def _line(parts: List[bytes], too_long: bool, max_line_bytes: int) -> Union[str, LineTooLong]:
+    """Decodes one line assembled by iter_lines, or the error standing in for it."""
+    if too_long:
+        return LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+    return b"".join(parts).decode("utf-8")
+
+async def iter_ndjson_records(lines: AsyncIterator[Tuple[int, Union[str, LineTooLong]]]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yields (line number, decoded JSON value) for each non-blank NDJSON line; bad JSON is yielded as the error."""
+    async for line_number, line in lines:
+        if isinstance(line, LineTooLong):
+            yield line_number, line
+        elif line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+
+async def iter_csv_records(lines: AsyncIterator[Tuple[int, Union[str, LineTooLong]]],
+                           max_record_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yields (line number, dict) for each CSV record, keyed by the header row; `checklist_items`
+    holds '|'-separated items. The lines of a record go to the csv reader as they arrived, line
+    endings included, so quoted fields may span lines and keep their line breaks.
+    """
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    start_line, size, in_quotes = 0, 0, False
+    async for line_number, line in lines:
+        if not record:
+            start_line = line_number
+        if isinstance(line, LineTooLong) or size + len(line.encode("utf-8")) > max_record_bytes:
+            # Drop the whole record and start over at the next line
+            record, size, in_quotes = [], 0, False
+            yield start_line, LineTooLong(f"Record exceeds {max_record_bytes} bytes")
+            continue
+        record.append(line)
+        size += len(line.encode("utf-8"))
+        # An odd number of quotes leaves a quoted field open into the next line
+        in_quotes ^= line.count('"') % 2 == 1
+        if in_quotes:
+            continue
+        complete, record, size = record, [], 0
+        if not "".join(complete).strip():
+            continue
+        values = next(csv.reader(complete))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row: Dict[str, Any] = {k: (v if v != "" else None) for k, v in zip(header, values)}
+        items = row.get("checklist_items")
+        row["checklist_items"] = [i for i in items.split("|") if i] if items else []
+        yield start_line, row
+    if record:
+        yield start_line, ValueError("Unterminated quoted field")
+
+def _describe(error: Exception) -> str:
+    """Formats a parse or validation error as a single line."""
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+    return str(error)
+
+# --- 2. Bulk Import ---
+async def import_poa_requests(chunks: AsyncIterator[bytes], fmt: str, batch_size: int) -> Dict[str, Any]:
+    """
+    Validates streamed POA requests row by row and inserts them in transactions of `batch_size` rows.
+    Invalid rows are reported by line number without aborting the rest of the import.
+    """
+    lines = iter_lines(chunks)
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+
+    request_ids: List[str] = []
+    errors: List[Dict[str, Any]] = []
+    batch: List[NewPOARequest] = []
+    batch_lines: List[int] = []
+
+    async def flush():
+        results = await storage.engine.create_poa_requests(batch)
+        for line_number, (request_id, error) in zip(batch_lines, results):
+            if error:
+                errors.append({"line": line_number, "error": error})
+            else:
+                request_ids.append(request_id)
+        batch.clear()
+        batch_lines.clear()
+
+    async for line_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append(NewPOARequest.model_validate(record))
+            batch_lines.append(line_number)
+        except (ValueError, ValidationError) as e:
+            errors.append({"line": line_number, "error": _describe(e)})
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    return {
+        "inserted": len(request_ids),
+        "failed": len(errors),
+        "request_ids": request_ids,
+        "errors": errors,
+    }
+
+# --- 3. Streaming Export ---
+async def encode_ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Encodes row batches as NDJSON, one chunk per batch."""
+    async for rows in batches:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+async def encode_csv(batches: AsyncIterator[List[Dict[str, Any]]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encodes row batches as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns))
+    writer.writeheader()
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
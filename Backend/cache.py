@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+# Cache settings; RESPONSE_CACHE_TTL=0 disables caching (ETags are still sent)
+MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+
+# --- 1. Invalidation Tags ---
+POA_LIST_TAG = "poa:list"
+EXTERNAL_DOC_LIST_TAG = "external-doc:list"
+
+def poa_tag(request_id: str) -> str:
+    """Tag for every cached response that contains the given POA request's details."""
+    return f"poa:{request_id}"
+
+def external_doc_tag(request_id: str) -> str:
+    """Tag for every cached response that contains the given external verification's details."""
+    return f"external-doc:{request_id}"
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def version_etag(version: int) -> str:
+    """ETag of a detail response, derived from the row version so PATCH can be conditioned on it."""
+    return f'"v{version}"'
+
+def parse_version_etag(if_match: Optional[str]) -> Optional[int]:
+    """
+    Reads the row version from an If-Match header holding one version ETag (or a bare number).
+    Returns None when the header is absent or '*'; raises ValueError when it is not a version.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    value = value[2:] if value.startswith("W/") else value
+    value = value.strip('"')
+    value = value[1:] if value.startswith("v") else value
+    if not value.isdigit():
+        raise ValueError("If-Match must be a version ETag such as \"v3\"")
+    return int(value)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header (a list of ETags, or '*') against `etag`."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+# --- 2. Response Cache ---
+class CachedResponse:
+    """A serialized response body with its ETag and extra headers."""
+    __slots__ = ("body", "etag", "headers", "tags", "expires_at", "size")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], tags: Iterable[str], expires_at: float,
+                 etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or make_etag(body)
+        self.headers = headers
+        self.tags = tuple(tags)
+        self.expires_at = expires_at
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers.items())
+
+
+class ResponseCache:
+    """
+    Thread-safe in-process LRU cache of serialized responses, bounded by entry count and bytes,
+    with a TTL. Entries carry tags, and the write paths in crud.py invalidate them by tag.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES, ttl: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        # Invalidation clock, used to drop results computed before a concurrent write.
+        # Only the most recent marks are kept; reads older than _floor are never stored.
+        self._clock = 0
+        self._floor = 0
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Returns the live entry for `key`, marking it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self) -> int:
+        """Snapshot to take before reading from the database; pass it to set()."""
+        with self._lock:
+            return self._clock
+
+    def set(self, key: str, body: bytes, tags: Iterable[str], generation: int,
+            headers: Optional[Dict[str, str]] = None, etag: Optional[str] = None) -> CachedResponse:
+        """
+        Caches a response and returns it. The entry is not stored if one of its tags was
+        invalidated after `generation`, since the body may predate that write.
+        The ETag defaults to a hash of the body.
+        """
+        entry = CachedResponse(body, headers or {}, tags, time.monotonic() + self.ttl, etag)
+        if self.ttl <= 0 or entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            if generation < self._floor or any(self._invalidated_at.get(tag, -1) > generation for tag in entry.tags):
+                return entry
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        """Drops every entry carrying one of `tags`."""
+        with self._lock:
+            self._clock += 1
+            for tag in tags:
+                self._mark(tag)
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def prune(self) -> int:
+        """Drops expired entries; returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._bytes = 0
+
+    def record_not_modified(self) -> None:
+        """Counts a conditional request answered with 304 Not Modified."""
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _mark(self, tag: str) -> None:
+        """Records that `tag` was invalidated now; the caller holds the lock."""
+        self._invalidated_at.pop(tag, None)
+        self._invalidated_at[tag] = self._clock
+        if len(self._invalidated_at) > self.max_entries:
+            # Forget the oldest mark and treat every read from before it as stale
+            _, self._floor = self._invalidated_at.popitem(last=False)
+
+    def _remove(self, key: str) -> None:
+        """Removes one entry; the caller holds the lock."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,198 @@
+"""
+Fan-out of the change log to Server-Sent Events subscribers (GET /changes).
+
+One tail loop per process polls change_log for new entries while anyone is subscribed,
+renders each entry once as an SSE frame, and keeps the most recent frames in a bounded
+buffer. Subscribers only track the last seq they sent, and all idle subscribers wait on the
+same future, which the tail loop resolves once per batch (or per heartbeat): an idle
+subscriber costs one suspended coroutine and no database work, however many are connected. A subscriber that
+asks for changes older than the buffer reads them from the database in pages until it
+catches up, and one whose position was pruned from the log is told to reload.
+
+The same tail keeps the in-process response cache coherent with writes made by other
+processes and nodes: start_cache_invalidation() keeps it running without subscribers, and
+every change it reads invalidates the cached lists and details of its request, so another
+node's write is reflected here within one poll interval instead of after the cache TTL.
+"""
+import asyncio
+import bisect
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import serialization
+import storage
+from cache import response_cache, POA_LIST_TAG, EXTERNAL_DOC_LIST_TAG, poa_tag, external_doc_tag
+
+BUFFER_SIZE = int(os.environ.get("CHANGE_BUFFER_SIZE", "10000"))
+POLL_INTERVAL = float(os.environ.get("CHANGE_POLL_INTERVAL", "0.25"))
+HEARTBEAT_SECONDS = float(os.environ.get("CHANGE_HEARTBEAT_SECONDS", "15"))
+PAGE_SIZE = 1000
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+# Change log entity -> (its list tag, its detail tag)
+CACHE_TAGS = {
+    "poa_request": (POA_LIST_TAG, poa_tag),
+    "external_doc_verification": (EXTERNAL_DOC_LIST_TAG, external_doc_tag),
+}
+
+def invalidate_cached(changes: List[Dict[str, Any]]) -> None:
+    """Drops the cached responses that a batch of changes may have made stale."""
+    tags = set()
+    for change in changes:
+        list_tag, detail_tag = CACHE_TAGS[change["entity"]]
+        tags.update((list_tag, detail_tag(change["request_id"])))
+    if tags:
+        response_cache.invalidate(*tags)
+
+def change_frame(change: Dict[str, Any]) -> bytes:
+    """One change as an SSE event; the seq is the event id, so EventSource resumes from it."""
+    return b"id: %d\nevent: change\ndata: %s\n\n" % (change["seq"], serialization.dumps(change))
+
+def reset_frame(head: int) -> bytes:
+    """Tells the client its position is gone from the log, so it must reload its lists."""
+    return b"id: %d\nevent: reset\ndata: %s\n\n" % (head, serialization.dumps({"seq": head}))
+
+
+class ChangeFeed:
+    """Shares one change_log tail loop and one buffer of rendered frames among all subscribers."""
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE, poll_interval: float = POLL_INTERVAL,
+                 heartbeat: float = HEARTBEAT_SECONDS):
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        # Parallel lists, trimmed in chunks so appends stay O(1) and lookups can bisect
+        self._seqs: List[int] = []
+        self._frames: List[bytes] = []
+        self._complete_after = 0  # Every change after this seq and up to _head is buffered
+        self._head = 0
+        self._subscribers = 0
+        self._invalidating = False
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional["asyncio.Future[bool]"] = None
+
+    def _running(self) -> bool:
+        return self._task is not None and self._loop is asyncio.get_running_loop()
+
+    async def _start(self) -> None:
+        """Starts the tail loop from the current head if it is not running."""
+        if self._running():
+            return
+        _, head = await storage.engine.get_change_bounds()
+        if self._running():  # Another subscriber started it meanwhile
+            return
+        # Frames left from an earlier run may have gaps, so start the buffer afresh
+        self._seqs, self._frames = [], []
+        self._head = self._complete_after = head
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = self._loop.create_future()
+        self._task = self._loop.create_task(self._tail())
+
+    def _wake(self, changed: bool) -> None:
+        """Resumes every waiting subscriber; `changed` is False for a heartbeat."""
+        if not self._wakeup.done():
+            self._wakeup.set_result(changed)
+        self._wakeup = self._loop.create_future()
+
+    async def start_cache_invalidation(self) -> None:
+        """Keeps the tail loop running, subscribers or not, invalidating the response cache from it."""
+        self._invalidating = True
+        await self._start()
+
+    async def stop(self) -> None:
+        """Stops cache invalidation and the tail loop; subscribers start it again."""
+        self._invalidating = False
+        task = self._task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _tail(self) -> None:
+        """
+        Polls for new changes while anyone is subscribed or the cache is being invalidated,
+        waking subscribers after each batch.
+        """
+        last_wake = time.monotonic()
+        try:
+            while self._subscribers or self._invalidating:
+                try:
+                    changes = await storage.engine.get_changes(self._head, PAGE_SIZE)
+                except Exception as e:
+                    print(f"Error reading the change log: {e}")
+                    changes = []
+                if changes:
+                    if self._invalidating:
+                        invalidate_cached(changes)
+                    for change in changes:
+                        self._seqs.append(change["seq"])
+                        self._frames.append(change_frame(change))
+                    self._head = changes[-1]["seq"]
+                    self._trim()
+                if changes or time.monotonic() - last_wake >= self.heartbeat:
+                    self._wake(bool(changes))
+                    last_wake = time.monotonic()
+                if len(changes) < PAGE_SIZE:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            self._task = None
+
+    def _trim(self) -> None:
+        """Drops the oldest frames once the buffer is twice its size."""
+        if len(self._seqs) > 2 * self.buffer_size:
+            drop = len(self._seqs) - self.buffer_size
+            self._complete_after = self._seqs[drop - 1]
+            del self._seqs[:drop], self._frames[:drop]
+
+    def _buffered_after(self, seq: int) -> Optional[Tuple[List[bytes], int]]:
+        """Frames after `seq` and the seq they end at, or None if the buffer no longer reaches back to `seq`."""
+        if seq < self._complete_after:
+            return None
+        start = bisect.bisect_right(self._seqs, seq)
+        return self._frames[start:], max(seq, self._head)
+
+    async def stream(self, since: Optional[int]) -> AsyncIterator[bytes]:
+        """
+        Yields SSE frames for every change after seq `since` (from now on if None), then follows
+        new changes until the client disconnects. Sends a keepalive comment when idle.
+        """
+        self._subscribers += 1
+        try:
+            await self._start()
+            oldest, head = await storage.engine.get_change_bounds()
+            if since is None:
+                cursor = head
+            elif since > head or since < oldest - 1:
+                # From another database, or pruned since the client last saw it
+                yield reset_frame(head)
+                cursor = head
+            else:
+                cursor = since
+
+            while True:
+                buffered = self._buffered_after(cursor)
+                if buffered is None:
+                    # Fell behind the buffer: catch up from the database a page at a time
+                    changes = await storage.engine.get_changes(cursor, PAGE_SIZE)
+                    if changes:
+                        yield b"".join(change_frame(change) for change in changes)
+                        cursor = changes[-1]["seq"]
+                    else:
+                        cursor = max(cursor, self._complete_after)
+                    continue
+                frames, cursor = buffered
+                if frames:
+                    yield b"".join(frames)
+                elif not await asyncio.shield(self._wakeup):  # A disconnect must not cancel the shared future
+                    yield KEEPALIVE_FRAME
+        finally:
+            self._subscribers -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Subscriber count and buffer state, for /metrics."""
+        return {"subscribers": self._subscribers, "head_seq": self._head, "buffered": len(self._seqs)}
+
+
+change_feed = ChangeFeed()
@@ -1,49 +1,456 @@
-from typing import List, Dict, Optional
-from db import get_db_connection
+from typing import Any, Callable, Iterator, List, Dict, Optional, Sequence, Tuple
+from cache import response_cache, POA_LIST_TAG, EXTERNAL_DOC_LIST_TAG, poa_tag, external_doc_tag
+from db import connection
 from models import (
     DashboardData, DashboardMetric, MonthlyActivityData,
     POARequest, POAFile, POARequestBase,
     ExternalDocVerification, ExternalDocVerificationDetails, ExternalDocFile,
     NewPOARequest
 )
+import base64
+import calendar
+import json
+import re
+import sqlite3
 import uuid
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, datetime
+
+# --- 1. Dashboard Functions (Rollups) ---
+# Each rollup table holds request counts per (month, category, status) of the table it
+# summarises; the triggers from migrations/0004_dashboard_rollups.sql keep them current.
+ROLLUP_TABLES = {
+    "poa_request_rollups": "poa_requests",
+    "external_doc_rollups": "external_doc_verifications",
+}
+
+def _shift_month(year: int, month: int, delta: int) -> str:
+    """Returns the YYYY-MM key `delta` months away from the given month."""
+    index = year * 12 + (month - 1) + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def _percent_change(current: int, previous: int) -> float:
+    """Percentage change, treating growth from zero as +100%."""
+    if previous == 0:
+        return 0.0 if current == 0 else 100.0
+    return (current - previous) / previous * 100
+
+def _metric(current: int, previous: int) -> DashboardMetric:
+    """Builds a month-over-month dashboard metric."""
+    return DashboardMetric(
+        current_month=current,
+        comparison_percent=f"{_percent_change(current, previous):+.1f}% vs last month"
+    )
+
+DASHBOARD_POA_SQL = "SELECT month, status, SUM(request_count) AS total FROM poa_request_rollups WHERE month >= ? GROUP BY month, status"
+DASHBOARD_DOC_SQL = "SELECT month, status, SUM(request_count) AS total FROM external_doc_rollups WHERE month IN (?, ?) GROUP BY month, status"
+
+def _dashboard_months(today: date) -> Tuple[str, str, str]:
+    """(this month, last month, start of the twelve-month window) as YYYY-MM keys."""
+    # Twelve months back covers both the current year and the two six-month windows
+    return (_shift_month(today.year, today.month, 0), _shift_month(today.year, today.month, -1),
+            _shift_month(today.year, today.month, -11))
+
+def _build_dashboard(today: date, poa_rows: Sequence[Any], doc_rows: Sequence[Any]) -> DashboardData:
+    """Folds the (month, status, total) rows of DASHBOARD_POA_SQL and DASHBOARD_DOC_SQL into the dashboard."""
+    this_month, last_month, _ = _dashboard_months(today)
+    poa_by_month: Dict[str, int] = defaultdict(int)
+    poa_by_status: Dict[Tuple[str, str], int] = defaultdict(int)
+    for row in poa_rows:
+        poa_by_month[row["month"]] += row["total"]
+        poa_by_status[(row["month"], row["status"])] += row["total"]
+    docs_by_status = {(row["month"], row["status"]): row["total"] for row in doc_rows}
+
+    monthly_activity = [
+        MonthlyActivityData(month=calendar.month_abbr[m], count=poa_by_month[f"{today.year:04d}-{m:02d}"])
+        for m in range(1, 13)
+    ]
+    last_6 = sum(poa_by_month[_shift_month(today.year, today.month, -i)] for i in range(0, 6))
+    previous_6 = sum(poa_by_month[_shift_month(today.year, today.month, -i)] for i in range(6, 12))
 
-# --- 1. Dashboard Functions (Mock Data) ---
-def get_mock_dashboard_data() -> DashboardData:
-    """Returns structured mock data for the dashboard."""
     return DashboardData(
-        total_poa_requests=DashboardMetric(current_month=240, comparison_percent='+5.2% vs last month'),
-        pending_approvals=DashboardMetric(current_month=12, comparison_percent='+12.0% vs last month'),
-        verified_agents=DashboardMetric(current_month=12, comparison_percent='+1.5% vs last month'),
-        rejected_kyc_issues=DashboardMetric(current_month=5, comparison_percent='-3.1% vs last month'),
-        monthly_activity=[
-            MonthlyActivityData(month="Jan", count=25),
-            MonthlyActivityData(month="Feb", count=60),
-            MonthlyActivityData(month="Mar", count=10),
-            MonthlyActivityData(month="Apr", count=150),
-            MonthlyActivityData(month="May", count=2000),
-            MonthlyActivityData(month="Jun", count=500),
-            MonthlyActivityData(month="Jul", count=1800),
-            MonthlyActivityData(month="Aug", count=100),
-            MonthlyActivityData(month="Sep", count=50),
-            MonthlyActivityData(month="Oct", count=150),
-            MonthlyActivityData(month="Nov", count=100),
-            MonthlyActivityData(month="Dec", count=10),
-        ],
-        annual_total=1482,
-        last_6_month_increase='+15.8% Last 6 Months'
+        total_poa_requests=_metric(poa_by_month[this_month], poa_by_month[last_month]),
+        pending_approvals=_metric(poa_by_status[(this_month, 'Pending')], poa_by_status[(last_month, 'Pending')]),
+        verified_agents=_metric(docs_by_status.get((this_month, 'Verified'), 0), docs_by_status.get((last_month, 'Verified'), 0)),
+        rejected_kyc_issues=_metric(docs_by_status.get((this_month, 'Rejected'), 0), docs_by_status.get((last_month, 'Rejected'), 0)),
+        monthly_activity=monthly_activity,
+        annual_total=sum(item.count for item in monthly_activity),
+        last_6_month_increase=f"{_percent_change(last_6, previous_6):+.1f}% Last 6 Months"
     )
 
-# --- 2. POA Requests Functions (CRUD) ---
-def get_poa_requests(category: Optional[str], status: Optional[str], sort_by: Optional[str], search: Optional[str]) -> List[POARequestBase]:
-    """Retrieves and filters POA requests from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def get_dashboard_data(today: Optional[date] = None) -> DashboardData:
+    """
+    Builds the dashboard from the rollup counters.
+    Metrics count requests submitted this month against last month: all and pending POA requests,
+    and verified and rejected external documents. Monthly activity covers the current year.
+    """
+    today = today or date.today()
+    this_month, last_month, window_start = _dashboard_months(today)
+    with connection() as conn:
+        poa_rows = conn.execute(DASHBOARD_POA_SQL, (window_start,)).fetchall()
+        doc_rows = conn.execute(DASHBOARD_DOC_SQL, (this_month, last_month)).fetchall()
+    return _build_dashboard(today, poa_rows, doc_rows)
+
+def _rollup_drift_sql(rollup_table: str, source_table: str) -> str:
+    """SQL listing every (month, category, status) whose stored count differs from the real one."""
+    return f"""
+        WITH actual AS (
+            SELECT substr(submitted_date, 1, 7) AS month, category, status, COUNT(*) AS actual
+            FROM {source_table} GROUP BY 1, 2, 3
+        )
+        SELECT r.month, r.category, r.status, r.request_count AS stored, COALESCE(a.actual, 0) AS actual
+        FROM {rollup_table} r LEFT JOIN actual a USING (month, category, status)
+        WHERE r.request_count != COALESCE(a.actual, 0)
+        UNION ALL
+        SELECT a.month, a.category, a.status, 0 AS stored, a.actual
+        FROM actual a LEFT JOIN {rollup_table} r USING (month, category, status)
+        WHERE r.month IS NULL
+    """
+
+def find_rollup_drift() -> List[Dict[str, Any]]:
+    """Compares every rollup counter with a fresh GROUP BY over the table it summarises."""
+    drift = []
+    with connection() as conn:
+        for rollup_table, source_table in ROLLUP_TABLES.items():
+            for row in conn.execute(_rollup_drift_sql(rollup_table, source_table)):
+                drift.append({"table": rollup_table, **dict(row)})
+    return drift
+
+def rebuild_rollups() -> List[Dict[str, Any]]:
+    """Recomputes every rollup table from scratch in one transaction, returning the drift it corrected."""
+    drift = []
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for rollup_table, source_table in ROLLUP_TABLES.items():
+            for row in conn.execute(_rollup_drift_sql(rollup_table, source_table)).fetchall():
+                drift.append({"table": rollup_table, **dict(row)})
+            conn.execute(f"DELETE FROM {rollup_table}")
+            conn.execute(f"""
+                INSERT INTO {rollup_table} (month, category, status, request_count)
+                SELECT substr(submitted_date, 1, 7), category, status, COUNT(*) FROM {source_table} GROUP BY 1, 2, 3
+            """)
+    return drift
+
+ROLLUP_MONTH_SQL = """
+    INSERT INTO {rollup_table} (month, category, status, request_count)
+    SELECT substr(submitted_date, 1, 7), category, status, COUNT(*) FROM {source_table}
+    WHERE submitted_date >= ? AND submitted_date < ? GROUP BY 1, 2, 3
+"""
+
+def _rollup_month_range(month: str) -> Tuple[str, str]:
+    """Bounds on submitted_date covering one YYYY-MM month: [month, next month)."""
+    year, month_number = (int(part) for part in month.split("-"))
+    return month, _shift_month(year, month_number, 1)
+
+def refresh_rollup_month(rollup_table: str, month: str) -> None:
+    """
+    Recomputes one month of a rollup table in its own short transaction. The submitted_date
+    index limits the count to that month's rows, so correcting drift never holds the write
+    lock for a whole-table GROUP BY the way rebuild_rollups does.
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"DELETE FROM {rollup_table} WHERE month = ?", (month,))
+        conn.execute(ROLLUP_MONTH_SQL.format(rollup_table=rollup_table, source_table=ROLLUP_TABLES[rollup_table]),
+                     _rollup_month_range(month))
+
+# --- 2. Query Helpers ---
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BATCH_IDS = 500
+MAX_TRANSITION_IDS = 100_000
+
+POA_LIST_FIELDS = tuple(POARequestBase.model_fields)
+EXTERNAL_DOC_LIST_FIELDS = tuple(ExternalDocVerification.model_fields)
+POA_DETAIL_FIELDS = tuple(f for f in POARequest.model_fields if f not in ("checklist_items", "files"))
+EXTERNAL_DOC_DETAIL_FIELDS = tuple(f for f in ExternalDocVerificationDetails.model_fields if f != "files")
+
+def _encode_cursor(order: str, sort_value: Any, row_id: int) -> str:
+    """Encodes the page order and the (sort key, id) keyset position of the last row into an opaque cursor."""
+    raw = json.dumps([order, sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, Any, int]:
+    """Decodes a cursor produced by _encode_cursor, raising ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(order, str) or not isinstance(sort_value, (str, int, float)) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return order, sort_value, row_id
+
+def _resolve_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Turns a comma-separated `fields` projection into columns, keeping the model's field order.
+    A missing or blank projection (e.g. `fields=,,`) returns every field.
+    """
+    requested = {f.strip() for f in (fields or "").split(",") if f.strip()}
+    if not requested:
+        return list(allowed)
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in allowed if f in requested]
+
+def _select_list(columns: List[str], sort_column: str = "submitted_date") -> str:
+    """Builds the SELECT list for a page, always including the keyset columns."""
+    return ", ".join(["id"] + columns + ([] if sort_column in columns else [sort_column]))
+
+def _keyset_order(sort_by: Optional[str], sort_column: str) -> str:
+    """The order a page is sorted in, recorded in its cursor: 'relevance', 'oldest' or 'newest'."""
+    if sort_column == "rank":
+        return "relevance"
+    return "oldest" if sort_by == 'oldest' else "newest"
+
+def _apply_keyset(sql: str, params: list, sort_by: Optional[str], limit: int, cursor: Optional[str],
+                  sort_column: str = "submitted_date") -> str:
+    """Appends the keyset condition, ORDER BY and LIMIT for paging on (sort_column, id)."""
+    order = _keyset_order(sort_by, sort_column)
+    if order == "newest":
+        direction, op = "DESC", "<"
+    else:
+        # bm25 ranks are negative, with the most relevant match lowest
+        direction, op = "ASC", ">"
+    if cursor:
+        cursor_order, sort_value, row_id = _decode_cursor(cursor)
+        # A cursor only continues the order it came from; in another it would skip or repeat rows
+        if cursor_order != order or isinstance(sort_value, str) == (order == "relevance"):
+            raise ValueError("Invalid cursor: it belongs to a different sort order")
+        sql += f" AND ({sort_column}, id) {op} (?, ?)"
+        params.extend((sort_value, row_id))
+    sql += f" ORDER BY {sort_column} {direction}, id {direction} LIMIT ?"
+    # Fetch one extra row to know whether another page exists
+    params.append(limit + 1)
+    return sql
+
+def _paginate(rows: List[sqlite3.Row], columns: List[str], limit: int, sort_by: Optional[str],
+              sort_column: str = "submitted_date") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Splits a limit + 1 result into the page of projected rows and the cursor for the next page."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(_keyset_order(sort_by, sort_column), rows[-1][sort_column], rows[-1]["id"])
+    return [{c: row[c] for c in columns} for row in rows], next_cursor
+
+FACET_ROLLUP_SQL = "SELECT month, category, status, request_count FROM {rollup_table} WHERE request_count > 0"
+
+def _facet_counts(rows: Sequence[sqlite3.Row], category: Optional[str], status: Optional[str]) -> Dict[str, Any]:
+    """
+    Folds (month, category, status, request_count) rows into RequestFacets. Each facet skips its
+    own filter, so the other values stay selectable; the total and the months apply both.
+    """
+    category = category if category and category != 'All' else None
+    status = status if status and status != 'All' else None
+    by_category: Dict[str, int] = defaultdict(int)
+    by_status: Dict[str, int] = defaultdict(int)
+    by_month: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        category_matches = category is None or row["category"] == category
+        status_matches = status is None or row["status"] == status
+        if status_matches:
+            by_category[row["category"]] += row["request_count"]
+        if category_matches:
+            by_status[row["status"]] += row["request_count"]
+        if category_matches and status_matches:
+            by_month[row["month"]] += row["request_count"]
+
+    def by_count(counts: Dict[str, int]) -> Dict[str, int]:
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+    return {
+        "total": sum(by_month.values()),
+        "category": by_count(by_category),
+        "status": by_count(by_status),
+        "submitted_month": dict(sorted(by_month.items())),
+    }
+
+def _load_details(request_sql: str, child_sqls: Sequence[str],
+                  request_ids: Sequence[str]) -> Tuple[List[sqlite3.Row], List[Dict[str, List[sqlite3.Row]]]]:
+    """
+    Runs a parent query and its child queries (files, checklist items) for a batch of request ids,
+    grouping each child query's rows by request_id in a single pass.
+    """
+    ids_param = json.dumps(list(dict.fromkeys(request_ids)))
+    children: List[Dict[str, List[sqlite3.Row]]] = []
+    with connection() as conn:
+        request_rows = conn.execute(request_sql, (ids_param,)).fetchall()
+        for child_sql in child_sqls:
+            by_request: Dict[str, List[sqlite3.Row]] = defaultdict(list)
+            if request_rows:
+                for row in conn.execute(child_sql, (ids_param,)):
+                    by_request[row["request_id"]].append(row)
+            children.append(by_request)
+    return request_rows, children
+
+# Request table -> entity name in the change log
+CHANGE_ENTITIES = {
+    "poa_requests": "poa_request",
+    "external_doc_verifications": "external_doc_verification",
+}
+CHANGE_LOG_INSERT_SQL = "INSERT INTO change_log (entity, request_id, op, version) VALUES (?, ?, ?, ?)"
+
+def _log_changes(conn: sqlite3.Connection, table: str, op: str, changes: Sequence[Tuple[str, Optional[int]]]) -> None:
+    """Appends (request_id, new version) changes to the change log, inside the caller's transaction."""
+    conn.executemany(CHANGE_LOG_INSERT_SQL, [(CHANGE_ENTITIES[table], request_id, op, version)
+                                             for request_id, version in changes])
+
+def _bulk_transition(table: str, request_ids: Sequence[str], changes: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Applies `changes` (column -> new value) to every request in `request_ids` in one transaction.
+    The ids go into a temp table in a single statement, and one UPDATE joins against it, so the
+    cost does not grow with per-row round trips. Returns the ids by outcome: 'updated',
+    'unchanged' (already in the requested state) and 'not_found'.
+    """
+    if not changes:
+        raise ValueError("Nothing to change")
+    if len(request_ids) > MAX_TRANSITION_IDS:
+        raise ValueError(f"At most {MAX_TRANSITION_IDS} ids per transition")
+    assignments = ", ".join(f"{column} = ?" for column in changes)
+    matches = " AND ".join(f"{column} IS ?" for column in changes)
+    values = list(changes.values())
+
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS transition_ids (request_id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM temp.transition_ids")
+        conn.execute("INSERT OR IGNORE INTO temp.transition_ids SELECT value FROM json_each(?)", (json.dumps(list(request_ids)),))
+        outcomes = conn.execute(f"""
+            SELECT t.request_id,
+                   CASE WHEN r.request_id IS NULL THEN 'not_found'
+                        WHEN {matches} THEN 'unchanged'
+                        ELSE 'updated' END AS outcome
+            FROM temp.transition_ids t LEFT JOIN {table} r ON r.request_id = t.request_id
+        """, values).fetchall()
+        # Logged before the UPDATE, while NOT (matches) still selects the rows it is about to change
+        conn.execute(f"""
+            INSERT INTO change_log (entity, request_id, op, version)
+            SELECT ?, request_id, 'update', version + 1 FROM {table}
+            WHERE request_id IN (SELECT request_id FROM temp.transition_ids) AND NOT ({matches})
+        """, [CHANGE_ENTITIES[table]] + values)
+        conn.execute(f"""
+            UPDATE {table} SET {assignments}, version = version + 1
+            WHERE request_id IN (SELECT request_id FROM temp.transition_ids) AND NOT ({matches})
+        """, values + values)
+        conn.execute("DELETE FROM temp.transition_ids")
 
-    sql = "SELECT request_id, principal, category, submitted_date, assigned_agent, status, contact_info, address FROM poa_requests WHERE 1=1"
+    return _transition_result(request_ids, {row["request_id"]: row["outcome"] for row in outcomes})
+
+def _transition_result(request_ids: Sequence[str], outcomes: Dict[str, str]) -> Dict[str, List[str]]:
+    """Groups the deduplicated `request_ids` by their outcome, keeping the request order."""
+    result: Dict[str, List[str]] = {"updated": [], "unchanged": [], "not_found": []}
+    for request_id in dict.fromkeys(request_ids):
+        result[outcomes[request_id]].append(request_id)
+    return result
+
+class VersionConflict(Exception):
+    """Raised when a conditional update names a version that is no longer current."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Current version is {current_version}")
+        self.current_version = current_version
+
+def _reject_nulls(changes: Dict[str, Any], required: Sequence[str]) -> None:
+    """Raises ValueError if a partial update sets a required field to null."""
+    for field in required:
+        if field in changes and changes[field] is None:
+            raise ValueError(f"{field} cannot be null")
+
+def _patch_row(table: str, request_id: str, values: Dict[str, Any], expected_version: Optional[int],
+               after_update: Optional[Callable[[sqlite3.Connection], None]] = None) -> Optional[int]:
+    """
+    Writes only the columns in `values` and bumps the row version, in one compare-and-set UPDATE
+    when `expected_version` is given. `after_update` writes child rows in the same transaction,
+    and only runs if the update applied. Returns the new version, or None if the row does not exist;
+    raises VersionConflict instead of overwriting a newer version.
+    """
+    with connection() as conn:
+        if values or after_update:
+            assignments = [f"{c} = ?" for c in values] + ["version = version + 1"]
+            sql = f"UPDATE {table} SET {', '.join(assignments)} WHERE request_id = ?"
+            params = [*values.values(), request_id]
+            if expected_version is not None:
+                sql += " AND version = ?"
+                params.append(expected_version)
+            updated = conn.execute(sql, params).rowcount > 0
+            if updated and after_update:
+                after_update(conn)
+        else:
+            updated = False
+        row = conn.execute(f"SELECT version FROM {table} WHERE request_id = ?", (request_id,)).fetchone()
+        if updated:
+            _log_changes(conn, table, "update", [(request_id, row["version"])])
+    if row is None:
+        return None
+    if not updated and expected_version is not None and row["version"] != expected_version:
+        raise VersionConflict(row["version"])
+    return row["version"]
+
+# --- 3. POA Requests Functions (CRUD) ---
+POA_SEARCH_COLUMNS = ("principal", "assigned_agent", "address", "contact_info", "description_of_power")
+
+def _fts_query(search: str) -> Optional[str]:
+    """
+    Turns free-text input into an FTS5 trigram query requiring every word of three or more
+    characters as a substring. Returns None when no word is long enough for the trigram index.
+    """
+    terms = [term for term in search.split() if len(term) >= 3]
+    if not terms:
+        return None
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def _short_words_condition(search: str) -> Tuple[Optional[str], list]:
+    """
+    WHERE condition and parameters requiring every word shorter than three characters as a
+    substring of one of POA_SEARCH_COLUMNS, or None if there are none. The trigram index cannot
+    look these words up, so they only filter the rows it matched on the longer words, or every
+    row when no word is long enough.
+    """
+    terms = [re.sub(r"([\\%_])", r"\\\1", term) for term in search.split() if len(term) < 3]
+    if not terms:
+        return None, []
+    any_column = "(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in POA_SEARCH_COLUMNS) + ")"
+    params = [f'%{term}%' for term in terms for _ in POA_SEARCH_COLUMNS]
+    return " AND ".join([any_column] * len(terms)), params
+
+def _poa_sort_column(sort_by: Optional[str], search: Optional[str]) -> str:
+    """Relevance ordering is only available for searches that go through the full-text index."""
+    if sort_by == 'relevance' and search and _fts_query(search):
+        return "rank"
+    return "submitted_date"
+
+def _poa_search_condition(search: str) -> Tuple[str, list]:
+    """
+    WHERE condition and parameters matching POA requests against free-text `search`: the longer
+    words through the trigram index, then the short ones as a substring filter.
+    """
+    conditions, params = [], []
+    fts_query = _fts_query(search)
+    if fts_query:
+        conditions.append("id IN (SELECT rowid FROM poa_requests_fts WHERE poa_requests_fts MATCH ?)")
+        params.append(fts_query)
+    short_condition, short_params = _short_words_condition(search)
+    if short_condition:
+        conditions.append(short_condition)
+        params.extend(short_params)
+    return " AND ".join(conditions) or "1=1", params
+
+def build_poa_requests_query(category: Optional[str], status: Optional[str], sort_by: Optional[str], search: Optional[str],
+                             limit: int, cursor: Optional[str], columns: List[str]) -> Tuple[str, list]:
+    """Builds the SQL and parameters for one page of POA requests."""
+    sort_column = _poa_sort_column(sort_by, search)
+    fts_query = _fts_query(search) if search else None
     params = []
 
+    if sort_column == "rank":
+        # Join the ranked matches so the page can be ordered and keyed on bm25 relevance
+        sql = (f"SELECT {_select_list(columns, sort_column)} FROM poa_requests"
+               " JOIN (SELECT rowid AS fts_id, rank FROM poa_requests_fts WHERE poa_requests_fts MATCH ?) AS matches"
+               " ON matches.fts_id = poa_requests.id WHERE 1=1")
+        params.append(fts_query)
+    else:
+        sql = f"SELECT {_select_list(columns)} FROM poa_requests WHERE 1=1"
+
     if category and category != 'All':
         sql += " AND category = ?"
         params.append(category)
@@ -52,146 +459,305 @@ def get_poa_requests(category: Optional[str], status: Optional[str], sort_by: Op
         sql += " AND status = ?"
         params.append(status)
 
+    if sort_column == "rank":
+        # The joined index match covers the longer words; the short ones still filter it
+        condition, search_params = _short_words_condition(search)
+    elif search:
+        condition, search_params = _poa_search_condition(search)
+    else:
+        condition, search_params = None, []
+    if condition:
+        sql += " AND " + condition
+        params.extend(search_params)
+
+    sql = _apply_keyset(sql, params, sort_by, limit, cursor, sort_column)
+    return sql, params
+
+def get_poa_requests(category: Optional[str], status: Optional[str], sort_by: Optional[str], search: Optional[str],
+                     limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                     fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Retrieves one page of filtered POA requests, keyed on (submitted_date, id),
+    or on (rank, id) when a search is sorted by relevance.
+    Returns the projected rows and the cursor for the next page (None on the last page).
+    """
+    columns = _resolve_fields(fields, POA_LIST_FIELDS)
+    sql, params = build_poa_requests_query(category, status, sort_by, search, limit, cursor, columns)
+
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    return _paginate(rows, columns, limit, sort_by, _poa_sort_column(sort_by, search))
+
+def get_poa_request_facets(category: Optional[str], status: Optional[str], search: Optional[str]) -> Dict[str, Any]:
+    """
+    Counts POA requests per category, status and submission month for the list filters.
+    Without a search the counts come from the rollup counters, a few hundred rows whatever the
+    table size; with one, the matching requests are grouped in a single pass.
+    """
     if search:
-        # Search by principal name or assigned agent
-        sql += " AND (principal LIKE ? OR assigned_agent LIKE ?)"
-        search_term = f'%{search}%'
-        params.extend([search_term, search_term])
-        
-    if sort_by == 'newest':
-        sql += " ORDER BY submitted_date DESC"
-    elif sort_by == 'oldest':
-        sql += " ORDER BY submitted_date ASC"
-    
-    rows = cursor.execute(sql, params).fetchall()
-    conn.close()
+        condition, params = _poa_search_condition(search)
+        sql = (f"SELECT substr(submitted_date, 1, 7) AS month, category, status, COUNT(*) AS request_count"
+               f" FROM poa_requests WHERE {condition} GROUP BY 1, 2, 3")
+    else:
+        sql, params = FACET_ROLLUP_SQL.format(rollup_table="poa_request_rollups"), []
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return _facet_counts(rows, category, status)
 
-    return [POARequestBase(**dict(row)) for row in rows]
+POA_FILE_FIELDS = tuple(POAFile.model_fields)
 
-def get_poa_request_details(request_id: str) -> Optional[POARequest]:
-    """Retrieves detailed POA request information including files."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Get main request details
-    request_row = cursor.execute(
-        "SELECT * FROM poa_requests WHERE request_id = ?", 
-        (request_id,)
-    ).fetchone()
-    
-    if not request_row:
-        conn.close()
-        return None
+# Both take a JSON array of request ids, so one statement serves any batch size
+POA_REQUEST_DETAIL_SQL = (
+    f"SELECT {', '.join(POA_DETAIL_FIELDS)} FROM poa_requests"
+    " WHERE request_id IN (SELECT value FROM json_each(?))"
+)
+POA_REQUEST_FILES_SQL = (
+    f"SELECT request_id, {', '.join(POA_FILE_FIELDS)} FROM poa_request_files"
+    " WHERE request_id IN (SELECT value FROM json_each(?)) ORDER BY request_id, file_id"
+)
+POA_REQUEST_CHECKLIST_SQL = (
+    "SELECT request_id, item FROM poa_request_checklist_items"
+    " WHERE request_id IN (SELECT value FROM json_each(?)) ORDER BY request_id, position"
+)
 
-    # Get attached files
-    file_rows = cursor.execute(
-        "SELECT file_id, document_type, file_link, submitted_date FROM poa_request_files WHERE request_id = ?", 
-        (request_id,)
-    ).fetchall()
+def get_poa_request_details_batch(request_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Retrieves many POA requests with their files in two queries, however many ids are given.
+    Each result is a trusted row shaped like POARequest, in the order of `request_ids`; unknown ids are skipped.
+    """
+    request_rows, (files_by_request, checklist_by_request) = _load_details(
+        POA_REQUEST_DETAIL_SQL, (POA_REQUEST_FILES_SQL, POA_REQUEST_CHECKLIST_SQL), request_ids
+    )
+    return _poa_details(request_ids, request_rows, files_by_request, checklist_by_request)
 
-    files = [POAFile(**dict(row)) for row in file_rows]
-    
-    conn.close()
-    
-    # Combine and return
-    request_data = dict(request_row)
-    del request_data['id'] 
-    
-    return POARequest(**request_data, files=files)
+def _poa_details(request_ids: Sequence[str], request_rows: Sequence[Any], files_by_request: Dict[str, List[Any]],
+                 checklist_by_request: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Assembles POARequest-shaped rows from the detail, file and checklist rows, in the order of `request_ids`."""
+    details = {}
+    for row in request_rows:
+        detail = {f: row[f] for f in POA_DETAIL_FIELDS}
+        detail["checklist_items"] = [item_row["item"] for item_row in checklist_by_request[row["request_id"]]]
+        detail["files"] = [{f: file_row[f] for f in POA_FILE_FIELDS} for file_row in files_by_request[row["request_id"]]]
+        details[row["request_id"]] = detail
+    return [details[i] for i in dict.fromkeys(request_ids) if i in details]
 
-def create_poa_request(new_request: NewPOARequest) -> str:
-    """Inserts a new POA request into the database and returns the new request_id."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def get_poa_request_details(request_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves detailed POA request information including files."""
+    details = get_poa_request_details_batch([request_id])
+    return details[0] if details else None
+
+POA_INSERT_SQL = """
+    INSERT INTO poa_requests (
+        request_id, principal, contact_info, address, category, 
+        expiration_date, description_of_power, submitted_date, 
+        assigned_agent, status
+    ) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
+def _new_poa_request_row(new_request: NewPOARequest, submitted_date: str) -> tuple:
+    """Builds the POA_INSERT_SQL parameters for a new request, generating its request_id."""
     # Generate a unique request ID
     new_request_id = "POA-" + str(uuid.uuid4())[:8].upper()
-    submitted_date = datetime.now().strftime("%Y-%m-%d")
-    
-    sql = """
-        INSERT INTO poa_requests (
-            request_id, principal, contact_info, address, category, 
-            expiration_date, description_of_power, submitted_date, 
-            assigned_agent, status
-        ) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    
+
     # Using new_request.full_name for the 'principal' field
-    params = (
+    return (
         new_request_id,
         new_request.full_name,
         new_request.contact_info,
         new_request.address,
         new_request.category,
-        new_request.expiration_date,
+        new_request.expiration_date.isoformat() if new_request.expiration_date else None,
         new_request.description_of_power,
         submitted_date,
         "Unassigned", # Default agent for new requests
         "Pending"    # Default status for new requests
     )
+
+POA_CHECKLIST_INSERT_SQL = "INSERT INTO poa_request_checklist_items (request_id, position, item) VALUES (?, ?, ?)"
+
+def _checklist_rows(request_id: str, items: Sequence[str]) -> List[tuple]:
+    """POA_CHECKLIST_INSERT_SQL parameters for a request's checklist, keeping the submitted order."""
+    return [(request_id, position, item) for position, item in enumerate(items)]
+
+def create_poa_request(new_request: NewPOARequest) -> str:
+    """Inserts a new POA request and its checklist items, and returns the new request_id."""
+    params = _new_poa_request_row(new_request, datetime.now().strftime("%Y-%m-%d"))
     
     try:
-        cursor.execute(sql, params)
-        conn.commit()
-        return new_request_id
+        with connection() as conn:
+            conn.execute(POA_INSERT_SQL, params)
+            conn.executemany(POA_CHECKLIST_INSERT_SQL, _checklist_rows(params[0], new_request.checklist_items))
+            _log_changes(conn, "poa_requests", "insert", [(params[0], 1)])
+        response_cache.invalidate(POA_LIST_TAG)
+        return params[0]
     except Exception as e:
         print(f"Error inserting new POA request: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
 
-def update_poa_request(request_id: str, new_data: NewPOARequest) -> bool:
-    """Updates an existing POA request."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Simple update SQL statement
-    sql = """
-        UPDATE poa_requests
-        SET principal = ?, contact_info = ?, address = ?, category = ?, 
-            expiration_date = ?, description_of_power = ?
-        WHERE request_id = ?
-    """
-    params = (
-        new_data.full_name, new_data.contact_info, new_data.address, 
-        new_data.category, new_data.expiration_date, new_data.description_of_power,
-        request_id
-    )
-    
-    cursor.execute(sql, params)
-    conn.commit()
-    rows_affected = cursor.rowcount
-    conn.close()
-    return rows_affected > 0
+def create_poa_requests(new_requests: List[NewPOARequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Inserts a batch of new POA requests in a single transaction with executemany.
+    Returns a (request_id, error) pair per input row; rows rejected by the database
+    are reported with their error while the rest of the batch is still inserted.
+    """
+    submitted_date = datetime.now().strftime("%Y-%m-%d")
+    rows = [_new_poa_request_row(r, submitted_date) for r in new_requests]
+    checklists = [_checklist_rows(row[0], r.checklist_items) for row, r in zip(rows, new_requests)]
+
+    try:
+        with connection() as conn:
+            conn.executemany(POA_INSERT_SQL, rows)
+            conn.executemany(POA_CHECKLIST_INSERT_SQL, [item for checklist in checklists for item in checklist])
+            _log_changes(conn, "poa_requests", "insert", [(row[0], 1) for row in rows])
+        response_cache.invalidate(POA_LIST_TAG)
+        return [(row[0], None) for row in rows]
+    except sqlite3.DatabaseError as e:
+        print(f"Batch insert failed, retrying row by row: {e}")
+
+    # Isolate the failing rows: one transaction, one savepoint per row
+    results = []
+    with connection() as conn:
+        conn.execute("BEGIN")
+        for row, checklist in zip(rows, checklists):
+            conn.execute("SAVEPOINT bulk_row")
+            try:
+                conn.execute(POA_INSERT_SQL, row)
+                conn.executemany(POA_CHECKLIST_INSERT_SQL, checklist)
+                _log_changes(conn, "poa_requests", "insert", [(row[0], 1)])
+                results.append((row[0], None))
+            except sqlite3.DatabaseError as e:
+                conn.execute("ROLLBACK TO bulk_row")
+                results.append((None, str(e)))
+            conn.execute("RELEASE bulk_row")
+    response_cache.invalidate(POA_LIST_TAG)
+    return results
+
+POA_EXPORT_COLUMNS = (
+    "request_id", "principal", "category", "submitted_date", "assigned_agent", "status",
+    "contact_info", "address", "expiration_date", "description_of_power"
+)
+
+def iter_poa_request_batches(category: Optional[str], status: Optional[str],
+                             batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Streams every matching POA request in id order, one batch at a time, so exports never
+    hold more than `batch_size` rows in memory. Each batch is its own keyset query after the
+    last id sent, and the pooled connection is returned before the batch is yielded, so a slow
+    export client never holds a connection or a read transaction. Rows written while an export
+    runs may or may not appear in it, as when paging through the list.
+    """
+    sql = f"SELECT id, {', '.join(POA_EXPORT_COLUMNS)} FROM poa_requests WHERE id > ?"
+    params = []
+
+    if category and category != 'All':
+        sql += " AND category = ?"
+        params.append(category)
+
+    if status and status != 'All':
+        sql += " AND status = ?"
+        params.append(status)
+
+    sql += " ORDER BY id LIMIT ?"
+
+    last_id = 0
+    while True:
+        with connection() as conn:
+            rows = conn.execute(sql, [last_id, *params, batch_size]).fetchall()
+        if rows:
+            last_id = rows[-1]["id"]
+            yield [{column: row[column] for column in POA_EXPORT_COLUMNS} for row in rows]
+        if len(rows) < batch_size:
+            return
+
+# POARequestPatch field -> poa_requests column
+POA_PATCH_COLUMNS = {
+    "full_name": "principal",
+    "contact_info": "contact_info",
+    "address": "address",
+    "category": "category",
+    "expiration_date": "expiration_date",
+    "description_of_power": "description_of_power",
+}
+# PATCH fields the response models declare as required strings, so they cannot be cleared
+POA_NON_NULL_FIELDS = ("full_name", "category", "contact_info", "address", "checklist_items")
+
+def update_poa_request(request_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None) -> Optional[int]:
+    """
+    Updates only the POARequestPatch fields present in `changes`, optionally only if the
+    request is still at `expected_version`. Returns the new version, or None if not found.
+    """
+    _reject_nulls(changes, POA_NON_NULL_FIELDS)
+    values = {POA_PATCH_COLUMNS[field]: value for field, value in changes.items() if field in POA_PATCH_COLUMNS}
+    replace_checklist = None
+    if "checklist_items" in changes:
+        def replace_checklist(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM poa_request_checklist_items WHERE request_id = ?", (request_id,))
+            conn.executemany(POA_CHECKLIST_INSERT_SQL, _checklist_rows(request_id, changes["checklist_items"]))
+    version = _patch_row("poa_requests", request_id, values, expected_version, replace_checklist)
+    if values or replace_checklist:
+        response_cache.invalidate(POA_LIST_TAG, poa_tag(request_id))
+    return version
+
+def transition_poa_requests(request_ids: Sequence[str], status: Optional[str] = None,
+                            assigned_agent: Optional[str] = None) -> Dict[str, List[str]]:
+    """Sets the status and/or assigned agent of many POA requests at once; see _bulk_transition."""
+    changes = {column: value for column, value in (("status", status), ("assigned_agent", assigned_agent)) if value is not None}
+    result = _bulk_transition("poa_requests", request_ids, changes)
+    if result["updated"]:
+        response_cache.invalidate(POA_LIST_TAG, *(poa_tag(i) for i in result["updated"]))
+    return result
+
+# Active requests past their expiration date, oldest first, through idx_poa_requests_status_expiration.
+# The dates compare as text, so rows stored before expiration_date was validated as YYYY-MM-DD
+# (e.g. '01/15/2030') are skipped rather than expired
+EXPIRED_POA_SQL = """
+    SELECT request_id, version FROM poa_requests
+    WHERE status = 'Active' AND expiration_date > '' AND expiration_date < ?
+      AND expiration_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+    ORDER BY expiration_date LIMIT ?
+"""
+
+def expire_poa_requests(limit: int, today: Optional[date] = None) -> List[str]:
+    """
+    Moves up to `limit` Active POA requests whose expiration date is before today to Expired,
+    in one short transaction, and returns their ids. Callers sweep in batches until one comes
+    back short, so API writers get the write lock between batches.
+    """
+    today = today or date.today()
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(EXPIRED_POA_SQL, (today.isoformat(), limit)).fetchall()
+        request_ids = [row["request_id"] for row in rows]
+        conn.execute(
+            "UPDATE poa_requests SET status = 'Expired', version = version + 1"
+            " WHERE request_id IN (SELECT value FROM json_each(?))", (json.dumps(request_ids),)
+        )
+        _log_changes(conn, "poa_requests", "update", [(row["request_id"], row["version"] + 1) for row in rows])
+    if request_ids:
+        response_cache.invalidate(POA_LIST_TAG, *(poa_tag(i) for i in request_ids))
+    return request_ids
 
 def delete_poa_request(request_id: str) -> bool:
-    """Deletes a POA request and its associated files."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    """Deletes a POA request; its files go with it through ON DELETE CASCADE."""
     try:
-        # Delete files first to maintain integrity
-        cursor.execute("DELETE FROM poa_request_files WHERE request_id = ?", (request_id,))
-        cursor.execute("DELETE FROM poa_requests WHERE request_id = ?", (request_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        with connection() as conn:
+            rows_affected = conn.execute("DELETE FROM poa_requests WHERE request_id = ?", (request_id,)).rowcount
+            if rows_affected:
+                _log_changes(conn, "poa_requests", "delete", [(request_id, None)])
+        response_cache.invalidate(POA_LIST_TAG, poa_tag(request_id))
+        return rows_affected > 0
     except Exception as e:
-        conn.rollback()
         print(f"Error deleting POA request: {e}")
         return False
-    finally:
-        conn.close()
-
 
-# --- 3. External Document Verification Functions (CRUD) ---
-def get_external_doc_verifications(category: Optional[str], status: Optional[str], sort_by: Optional[str]) -> List[ExternalDocVerification]:
-    """Retrieves and filters External Document Verification requests."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    sql = "SELECT request_id, applicant, category, submitted_date, status, contact_info, address FROM external_doc_verifications WHERE 1=1"
+# --- 4. External Document Verification Functions (CRUD) ---
+def build_external_doc_verifications_query(category: Optional[str], status: Optional[str], sort_by: Optional[str],
+                                           limit: int, cursor: Optional[str], columns: List[str]) -> Tuple[str, list]:
+    """Builds the SQL and parameters for one page of External Document Verification requests."""
+    sql = f"SELECT {_select_list(columns)} FROM external_doc_verifications WHERE 1=1"
     params = []
 
     if category and category != 'All':
@@ -201,84 +767,200 @@ def get_external_doc_verifications(category: Optional[str], status: Optional[str
     if status and status != 'All':
         sql += " AND status = ?"
         params.append(status)
-        
-    if sort_by == 'newest':
-        sql += " ORDER BY submitted_date DESC"
-    elif sort_by == 'oldest':
-        sql += " ORDER BY submitted_date ASC"
 
-    rows = cursor.execute(sql, params).fetchall()
-    conn.close()
+    sql = _apply_keyset(sql, params, sort_by, limit, cursor)
+    return sql, params
 
-    return [ExternalDocVerification(**dict(row)) for row in rows]
+def get_external_doc_verifications(category: Optional[str], status: Optional[str], sort_by: Optional[str],
+                                   limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                   fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Retrieves one page of filtered External Document Verification requests, keyed on (submitted_date, id).
+    Returns the projected rows and the cursor for the next page (None on the last page).
+    """
+    columns = _resolve_fields(fields, EXTERNAL_DOC_LIST_FIELDS)
+    sql, params = build_external_doc_verifications_query(category, status, sort_by, limit, cursor, columns)
 
-def get_external_doc_verification_details(request_id: str) -> Optional[ExternalDocVerificationDetails]:
-    """Retrieves detailed External Document Verification information including files."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Get main request details
-    request_row = cursor.execute(
-        "SELECT * FROM external_doc_verifications WHERE request_id = ?", 
-        (request_id,)
-    ).fetchone()
-    
-    if not request_row:
-        conn.close()
-        return None
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
 
-    # Get attached files
-    file_rows = cursor.execute(
-        "SELECT file_id, document_type, file_link, submitted_date, rejection_reason, comment FROM external_doc_files WHERE request_id = ?", 
-        (request_id,)
-    ).fetchall()
+    return _paginate(rows, columns, limit, sort_by)
 
-    files = [ExternalDocFile(**dict(row)) for row in file_rows] 
+def get_external_doc_facets(category: Optional[str], status: Optional[str]) -> Dict[str, Any]:
+    """Counts External Document Verification requests per category, status and submission month, from the rollups."""
+    with connection() as conn:
+        rows = conn.execute(FACET_ROLLUP_SQL.format(rollup_table="external_doc_rollups")).fetchall()
+    return _facet_counts(rows, category, status)
 
-    conn.close()
-    
-    request_data = dict(request_row)
-    del request_data['id'] 
-    
-    return ExternalDocVerificationDetails(**request_data, files=files)
+EXTERNAL_DOC_FILE_FIELDS = tuple(ExternalDocFile.model_fields)
 
-def update_external_doc_verification(request_id: str, new_data: ExternalDocVerification) -> bool:
-    """Updates an existing External Document Verification request's main info."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Update main verification table fields
-    sql = """
-        UPDATE external_doc_verifications
-        SET status = ?, category = ?, applicant = ?, contact_info = ?, address = ?
-        WHERE request_id = ?
-    """
-    params = (
-        new_data.status, new_data.category, new_data.applicant, 
-        new_data.contact_info, new_data.address, request_id
-    )
-    
-    cursor.execute(sql, params)
-    conn.commit()
-    rows_affected = cursor.rowcount
-    conn.close()
-    return rows_affected > 0
+# Both take a JSON array of request ids, so one statement serves any batch size
+EXTERNAL_DOC_DETAIL_SQL = (
+    f"SELECT {', '.join(EXTERNAL_DOC_DETAIL_FIELDS)} FROM external_doc_verifications"
+    " WHERE request_id IN (SELECT value FROM json_each(?))"
+)
+EXTERNAL_DOC_FILES_SQL = (
+    f"SELECT request_id, {', '.join(EXTERNAL_DOC_FILE_FIELDS)} FROM external_doc_files"
+    " WHERE request_id IN (SELECT value FROM json_each(?)) ORDER BY request_id, file_id"
+)
+
+def get_external_doc_verification_details_batch(request_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Retrieves many External Document Verification requests with their files in two queries.
+    Each result is a trusted row shaped like ExternalDocVerificationDetails, in the order of
+    `request_ids`; unknown ids are skipped.
+    """
+    request_rows, (files_by_request,) = _load_details(EXTERNAL_DOC_DETAIL_SQL, (EXTERNAL_DOC_FILES_SQL,), request_ids)
+    return _external_doc_details(request_ids, request_rows, files_by_request)
+
+def _external_doc_details(request_ids: Sequence[str], request_rows: Sequence[Any],
+                          files_by_request: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Assembles ExternalDocVerificationDetails-shaped rows from the detail and file rows, in the order of `request_ids`."""
+    details = {}
+    for row in request_rows:
+        detail = {f: row[f] for f in EXTERNAL_DOC_DETAIL_FIELDS}
+        detail["files"] = [{f: file_row[f] for f in EXTERNAL_DOC_FILE_FIELDS} for file_row in files_by_request[row["request_id"]]]
+        details[row["request_id"]] = detail
+    return [details[i] for i in dict.fromkeys(request_ids) if i in details]
+
+def get_external_doc_verification_details(request_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves detailed External Document Verification information including files."""
+    details = get_external_doc_verification_details_batch([request_id])
+    return details[0] if details else None
+
+EXTERNAL_DOC_PATCH_COLUMNS = ("applicant", "category", "status", "contact_info", "address")
+# Every patchable field is required in ExternalDocVerification
+EXTERNAL_DOC_NON_NULL_FIELDS = EXTERNAL_DOC_PATCH_COLUMNS
+
+def update_external_doc_verification(request_id: str, changes: Dict[str, Any],
+                                     expected_version: Optional[int] = None) -> Optional[int]:
+    """
+    Updates only the ExternalDocVerificationPatch fields present in `changes`, optionally only if
+    the request is still at `expected_version`. Returns the new version, or None if not found.
+    """
+    _reject_nulls(changes, EXTERNAL_DOC_NON_NULL_FIELDS)
+    values = {field: value for field, value in changes.items() if field in EXTERNAL_DOC_PATCH_COLUMNS}
+    version = _patch_row("external_doc_verifications", request_id, values, expected_version)
+    if values:
+        response_cache.invalidate(EXTERNAL_DOC_LIST_TAG, external_doc_tag(request_id))
+    return version
+
+def transition_external_doc_verifications(request_ids: Sequence[str], status: str) -> Dict[str, List[str]]:
+    """Sets the status of many External Document Verification requests at once; see _bulk_transition."""
+    result = _bulk_transition("external_doc_verifications", request_ids, {"status": status})
+    if result["updated"]:
+        response_cache.invalidate(EXTERNAL_DOC_LIST_TAG, *(external_doc_tag(i) for i in result["updated"]))
+    return result
 
 def delete_external_doc_verification(request_id: str) -> bool:
-    """Deletes an external doc verification request and its associated files."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    """Deletes an external doc verification request; its files go with it through ON DELETE CASCADE."""
     try:
-        # Delete files first
-        cursor.execute("DELETE FROM external_doc_files WHERE request_id = ?", (request_id,))
-        # Delete main request
-        cursor.execute("DELETE FROM external_doc_verifications WHERE request_id = ?", (request_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        with connection() as conn:
+            rows_affected = conn.execute("DELETE FROM external_doc_verifications WHERE request_id = ?", (request_id,)).rowcount
+            if rows_affected:
+                _log_changes(conn, "external_doc_verifications", "delete", [(request_id, None)])
+        response_cache.invalidate(EXTERNAL_DOC_LIST_TAG, external_doc_tag(request_id))
+        return rows_affected > 0
     except Exception as e:
-        conn.rollback()
         print(f"Error deleting external doc verification: {e}")
         return False
-    finally:
-        conn.close()
\ No newline at end of file
+
+# --- 5. Uploaded Files ---
+# Parent table -> (files table, file fields, download URL prefix, cache tags of the parent)
+FILE_TABLES = {
+    "poa_requests": ("poa_request_files", POA_FILE_FIELDS, "/poa-requests", lambda i: (POA_LIST_TAG, poa_tag(i))),
+    "external_doc_verifications": ("external_doc_files", EXTERNAL_DOC_FILE_FIELDS, "/external-doc-verification",
+                                   lambda i: (EXTERNAL_DOC_LIST_TAG, external_doc_tag(i))),
+}
+
+def _add_file(table: str, request_id: str, document_type: str, sha256: str, size_bytes: int,
+              content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Records a stored blob as a new file of a request and bumps the request's version, in one
+    transaction. The file_link points at the file's download route. Returns the file row,
+    or None if the request does not exist.
+    """
+    files_table, fields, prefix, tags = FILE_TABLES[table]
+    with connection() as conn:
+        if conn.execute(f"UPDATE {table} SET version = version + 1 WHERE request_id = ?", (request_id,)).rowcount == 0:
+            return None
+        file_id = conn.execute(
+            f"INSERT INTO {files_table} (request_id, document_type, file_link, submitted_date, sha256, size_bytes, content_type)"
+            " VALUES (?, ?, '', ?, ?, ?, ?)",
+            (request_id, document_type, datetime.now().strftime("%Y-%m-%d"), sha256, size_bytes, content_type)
+        ).lastrowid
+        conn.execute(f"UPDATE {files_table} SET file_link = ? WHERE file_id = ?",
+                     (f"{prefix}/{request_id}/files/{file_id}", file_id))
+        row = conn.execute(f"SELECT {', '.join(fields)} FROM {files_table} WHERE file_id = ?", (file_id,)).fetchone()
+        version = conn.execute(f"SELECT version FROM {table} WHERE request_id = ?", (request_id,)).fetchone()[0]
+        _log_changes(conn, table, "update", [(request_id, version)])
+    response_cache.invalidate(*tags(request_id))
+    return {f: row[f] for f in fields}
+
+def _request_exists(table: str, request_id: str) -> bool:
+    """Whether a request exists; uploads check it before storing their body."""
+    with connection() as conn:
+        return conn.execute(f"SELECT 1 FROM {table} WHERE request_id = ?", (request_id,)).fetchone() is not None
+
+def _get_file(table: str, request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of a request; None if either does not exist."""
+    files_table, fields, _, _ = FILE_TABLES[table]
+    with connection() as conn:
+        row = conn.execute(f"SELECT {', '.join(fields)} FROM {files_table} WHERE request_id = ? AND file_id = ?",
+                           (request_id, file_id)).fetchone()
+    return {f: row[f] for f in fields} if row else None
+
+def poa_request_exists(request_id: str) -> bool:
+    """Whether a POA request exists."""
+    return _request_exists("poa_requests", request_id)
+
+def add_poa_request_file(request_id: str, document_type: str, sha256: str, size_bytes: int,
+                         content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Attaches an uploaded blob to a POA request; see _add_file."""
+    return _add_file("poa_requests", request_id, document_type, sha256, size_bytes, content_type)
+
+def get_poa_request_file(request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of a POA request."""
+    return _get_file("poa_requests", request_id, file_id)
+
+def external_doc_exists(request_id: str) -> bool:
+    """Whether an External Document Verification request exists."""
+    return _request_exists("external_doc_verifications", request_id)
+
+def add_external_doc_file(request_id: str, document_type: str, sha256: str, size_bytes: int,
+                          content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Attaches an uploaded blob to an External Document Verification request; see _add_file."""
+    return _add_file("external_doc_verifications", request_id, document_type, sha256, size_bytes, content_type)
+
+def get_external_doc_file(request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of an External Document Verification request."""
+    return _get_file("external_doc_verifications", request_id, file_id)
+
+
+# --- 6. Change Log ---
+CHANGE_FIELDS = ("seq", "entity", "request_id", "op", "version", "changed_at")
+CHANGES_SQL = f"SELECT {', '.join(CHANGE_FIELDS)} FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?"
+
+def get_changes(since: int, limit: int) -> List[Dict[str, Any]]:
+    """Up to `limit` change log entries after seq `since`, oldest first."""
+    with connection() as conn:
+        rows = conn.execute(CHANGES_SQL, (since, limit)).fetchall()
+    return [{f: row[f] for f in CHANGE_FIELDS} for row in rows]
+
+def get_change_bounds() -> Tuple[int, int]:
+    """
+    Returns (oldest, head): the first seq still in the log and the last seq ever assigned.
+    head counts pruned entries too, so oldest is head + 1 when the log is empty.
+    """
+    with connection() as conn:
+        head = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+        oldest = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+    head = head[0] if head else 0
+    return (oldest if oldest is not None else head + 1), head
+
+def prune_change_log(keep: int) -> int:
+    """Deletes all but the newest `keep` change log entries; returns the number deleted."""
+    with connection() as conn:
+        return conn.execute(
+            "DELETE FROM change_log WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM change_log) - ?", (keep,)
+        ).rowcount
@@ -1,60 +1,5 @@
--- Disable foreign key constraints during setup for smooth insertion
-PRAGMA foreign_keys = OFF;
-
--- Drop existing tables to allow fresh setup
-DROP TABLE IF EXISTS poa_requests;
-DROP TABLE IF EXISTS poa_request_files;
-DROP TABLE IF EXISTS external_doc_verifications;
-DROP TABLE IF EXISTS external_doc_files;
-
--- 1. POA Requests Table
-CREATE TABLE poa_requests (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    request_id TEXT NOT NULL UNIQUE,
-    principal TEXT NOT NULL,
-    category TEXT NOT NULL,
-    submitted_date TEXT NOT NULL, -- YYYY-MM-DD for simple sorting
-    assigned_agent TEXT,
-    status TEXT NOT NULL,
-    contact_info TEXT,
-    address TEXT,
-    expiration_date TEXT,
-    description_of_power TEXT
-);
-
--- 2. POA Request Files Table
-CREATE TABLE poa_request_files (
-    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    request_id TEXT NOT NULL,
-    document_type TEXT NOT NULL,
-    file_link TEXT NOT NULL,
-    submitted_date TEXT NOT NULL,
-    FOREIGN KEY (request_id) REFERENCES poa_requests(request_id)
-);
-
--- 3. External Document Verifications Table
-CREATE TABLE external_doc_verifications (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    request_id TEXT NOT NULL UNIQUE,
-    applicant TEXT NOT NULL,
-    category TEXT NOT NULL,
-    submitted_date TEXT NOT NULL, -- YYYY-MM-DD
-    status TEXT NOT NULL,
-    contact_info TEXT,
-    address TEXT
-);
-
--- 4. External Document Files Table (with rejection info)
-CREATE TABLE external_doc_files (
-    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    request_id TEXT NOT NULL,
-    document_type TEXT NOT NULL,
-    file_link TEXT NOT NULL,
-    submitted_date TEXT NOT NULL,
-    rejection_reason TEXT,
-    comment TEXT,
-    FOREIGN KEY (request_id) REFERENCES external_doc_verifications(request_id)
-);
+-- Mock data loaded into a database without any requests by db.seed_mock_data().
+-- The schema itself is created and upgraded by the versioned scripts in migrations/.
 
 -- ******************************************************
 -- Mock Data Insertion
@@ -102,6 +47,3 @@ INSERT INTO external_doc_files (file_id, request_id, document_type, file_link, s
 
 -- POA-84613 (Verified - Medical)
 (106, 'POA-84613', 'Consent Form', '/files/poa-84613/consent.pdf', '2023-10-21', NULL, NULL);
-
--- Re-enable foreign key constraints
-PRAGMA foreign_keys = ON;
\ No newline at end of file
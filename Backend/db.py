@@ -1,36 +1,269 @@
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+import profiling
 
 # Use absolute paths so Render knows where to create files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_URL = os.path.join(BASE_DIR, "data.db")
+DATABASE_URL = os.environ.get("DATABASE_PATH", os.path.join(BASE_DIR, "data.db"))
 SQL_SCRIPT_FILE = os.path.join(BASE_DIR, "data.sql")
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+
+# Startup bootstrap (see init_db). Production can turn both off and run `manage.py migrate` on deploy
+AUTO_MIGRATE = os.environ.get("DB_AUTO_MIGRATE", "1") == "1"
+SEED_MOCK_DATA = os.environ.get("DB_SEED_MOCK_DATA", "1") == "1"
+
+# Pool settings; DB_POOL_SIZE=0 disables pooling and opens a connection per call
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new connection
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.environ.get("DB_CACHE_SIZE", "-65536")),  # negative means KiB
+    "busy_timeout": int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",  # File rows are removed with their request (ON DELETE CASCADE)
+}
 
 def get_db_connection():
-    """Establishes and returns a database connection."""
-    # check_same_thread=False allows FastAPI multiple requests safely
-    conn = sqlite3.connect(DATABASE_URL, check_same_thread=False)
+    """Establishes and returns a new, unpooled database connection."""
+    # check_same_thread=False lets pooled connections move between FastAPI worker threads
+    factory = profiling.ProfilingConnection if profiling.SQL_PROFILING else sqlite3.Connection
+    conn = sqlite3.connect(DATABASE_URL, check_same_thread=False, factory=factory)
     conn.row_factory = sqlite3.Row  # Access columns by name
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
     return conn
 
-def execute_sql_file():
-    """Executes the SQL script to set up the database if not exists."""
+
+class ConnectionPool:
+    """
+    A bounded pool of long-lived SQLite connections.
+    Connections are created lazily up to `size`; callers block for up to `timeout`
+    seconds when all of them are in use. A size of 0 opens and closes a connection per call.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Takes an idle connection, opening a new one while the pool is below its size."""
+        if self.size <= 0:
+            return get_db_connection()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return get_db_connection()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection available after {self.timeout}s") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Returns a connection to the pool, discarding any transaction left open."""
+        if self.size <= 0:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        """Closes all idle connections; connections still checked out are closed on release."""
+        self.size = 0
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def configure_pool(size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT) -> ConnectionPool:
+    """Replaces the process-wide pool, closing the idle connections of the previous one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(size, timeout)
+    return _pool
+
+def close_pool() -> None:
+    """Closes the process-wide pool; the next connection() opens a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """
+    Borrows a pooled connection for the duration of the block.
+    Commits if the block succeeds and rolls back if it raises.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
+
+def _migration_files(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str]]:
+    """Lists (version, path) for every NNNN_name.sql script in `directory`, in version order."""
+    migrations = []
+    for name in os.listdir(directory):
+        if name.endswith(".sql"):
+            migrations.append((int(name.split("_", 1)[0]), os.path.join(directory, name)))
+    return sorted(migrations)
+
+def _split_statements(script: str) -> List[str]:
+    """Splits a SQL script into complete statements (trigger bodies stay whole)."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    leftover = "\n".join(l for l in current.splitlines() if not l.strip().startswith("--")).strip()
+    if leftover:
+        raise ValueError(f"Incomplete SQL statement: {leftover[:80]}")
+    return statements
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Returns the last migration version applied to the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _count_foreign_key_violations(conn: sqlite3.Connection) -> int:
+    """Number of rows whose foreign key has no parent row."""
+    return conn.execute("SELECT COUNT(*) FROM pragma_foreign_key_check").fetchone()[0]
+
+def migrate() -> int:
+    """
+    Upgrades the database in place by applying every migration newer than its user_version.
+    Each migration runs in its own IMMEDIATE transaction together with the version bump,
+    so a failed or concurrent upgrade never leaves a half-applied version behind.
+    Foreign keys are checked once per migration instead of per statement, so tables can be rebuilt.
+    Returns the resulting schema version.
+    """
+    conn = get_db_connection()
+    conn.isolation_level = None  # Transactions are managed explicitly below
+    conn.execute("PRAGMA foreign_keys = OFF")  # Can only be changed outside a transaction
+    try:
+        version = get_schema_version(conn)
+        for target, path in _migration_files():
+            if target <= version:
+                continue
+            with open(path, 'r') as f:
+                statements = _split_statements(f.read())
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the lock
+                if get_schema_version(conn) < target:
+                    violations = _count_foreign_key_violations(conn)
+                    for statement in statements:
+                        conn.execute(statement)
+                    if _count_foreign_key_violations(conn) > violations:
+                        raise sqlite3.IntegrityError(f"{os.path.basename(path)} leaves rows violating a foreign key")
+                    conn.execute(f"PRAGMA user_version = {target}")
+                    print(f"Applied migration {os.path.basename(path)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            version = get_schema_version(conn)
+        return version
+    finally:
+        conn.close()
+
+def _has_requests(conn: sqlite3.Connection) -> bool:
+    """Whether either request table holds any row."""
+    return bool(conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM poa_requests) OR EXISTS (SELECT 1 FROM external_doc_verifications)"
+    ).fetchone()[0])
+
+def seed_mock_data() -> bool:
+    """
+    Inserts the mock data from data.sql into a database without any requests, in one transaction.
+    Databases that already hold requests are left alone, and a failed attempt leaves nothing
+    behind, so it is retried on the next start. Returns True if the data was inserted.
+    """
     if not os.path.exists(SQL_SCRIPT_FILE):
         print(f"Error: SQL script file '{SQL_SCRIPT_FILE}' not found.")
-        return
+        return False
 
     conn = get_db_connection()
+    conn.isolation_level = None  # Transactions are managed explicitly below
     try:
+        if _has_requests(conn):
+            return False
         with open(SQL_SCRIPT_FILE, 'r') as f:
-            sql_script = f.read()
-        conn.executescript(sql_script)
-        conn.commit()
-        print("Database created and mock data inserted successfully.")
+            statements = _split_statements(f.read())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have seeded it while we waited for the lock
+            if _has_requests(conn):
+                conn.execute("ROLLBACK")
+                return False
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print("Mock data inserted successfully.")
+        return True
     except Exception as e:
         print(f"Error during database initialization: {e}")
+        return False
     finally:
         conn.close()
 
-# Automatically create the database if it doesn't exist
-if not os.path.exists(DATABASE_URL):
-    execute_sql_file()
+def init_db(migrate_schema: bool = AUTO_MIGRATE, seed: bool = SEED_MOCK_DATA) -> None:
+    """
+    Startup bootstrap, run from the app's lifespan rather than at import: brings the schema up
+    to date and seeds mock data into a database without requests. Both steps are idempotent
+    and safe to run from several workers at once.
+    """
+    if migrate_schema:
+        migrate()
+    if seed:
+        seed_mock_data()
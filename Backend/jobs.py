@@ -0,0 +1,134 @@
+"""
+Background jobs run by the app process on fixed intervals.
+
+  expire_poa_requests    moves Active POA requests whose expiration_date has passed to Expired,
+                         EXPIRY_BATCH_SIZE at a time, each batch its own short write transaction
+  reconcile_rollups      checks the dashboard rollup counters against their tables and recounts
+                         the months that drifted, one month per transaction
+  prune_response_cache   drops expired response cache entries
+
+The scheduler starts and stops with the app's lifespan; SCHEDULER_ENABLED=0 turns it off,
+e.g. when only one of several workers should run the jobs. The jobs are idempotent, so runs
+overlapping across workers only repeat work. Every run's duration is recorded by profiling
+as background_job_duration_seconds, and each job's last run is published on /metrics.
+"""
+import asyncio
+import os
+import time
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import profiling
+import storage
+from cache import response_cache
+
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "1") == "1"
+
+# Interval between the end of one run and the start of the next, in seconds
+EXPIRY_SWEEP_INTERVAL = float(os.environ.get("EXPIRY_SWEEP_INTERVAL", "300"))
+ROLLUP_RECONCILE_INTERVAL = float(os.environ.get("ROLLUP_RECONCILE_INTERVAL", "3600"))
+CACHE_PRUNE_INTERVAL = float(os.environ.get("CACHE_PRUNE_INTERVAL", "60"))
+
+# Requests expired per transaction. Bounds how long the sweep holds the SQLite write lock;
+# the pause between batches lets the API writes queued behind one batch run before the next
+EXPIRY_BATCH_SIZE = int(os.environ.get("EXPIRY_BATCH_SIZE", "500"))
+EXPIRY_BATCH_PAUSE = float(os.environ.get("EXPIRY_BATCH_PAUSE", "0.01"))
+
+# --- 1. Jobs ---
+# Each job returns the number of items it handled, published as its last result
+async def expire_poa_requests(today: Optional[date] = None) -> int:
+    """Expires every Active POA request past its expiration date, one bounded batch at a time."""
+    today = today or date.today()
+    expired = 0
+    while True:
+        request_ids = await storage.engine.expire_poa_requests(EXPIRY_BATCH_SIZE, today)
+        expired += len(request_ids)
+        if len(request_ids) < EXPIRY_BATCH_SIZE:
+            return expired
+        await asyncio.sleep(EXPIRY_BATCH_PAUSE)
+
+async def reconcile_rollups() -> int:
+    """Corrects drifted dashboard rollup counters, returning how many were off."""
+    return len(await storage.engine.reconcile_rollups())
+
+async def prune_response_cache() -> int:
+    """Drops expired response cache entries, returning how many."""
+    return response_cache.prune()
+
+# --- 2. Scheduler ---
+class Job:
+    """A coroutine function run every `interval` seconds, with the state of its last run."""
+    __slots__ = ("name", "run", "interval", "last_duration", "last_result", "last_finished")
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[int]], interval: float):
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.last_duration = 0.0
+        self.last_result = 0
+        self.last_finished = 0.0
+
+
+class Scheduler:
+    """Runs each job in its own task, so a slow job never delays the others."""
+
+    def __init__(self, jobs: List[Job]):
+        self.jobs = {job.name: job for job in jobs}
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    def start(self) -> None:
+        """Starts every job with a positive interval; each first runs right away."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.ensure_future(self._loop(job)) for job in self.jobs.values() if job.interval > 0]
+
+    async def stop(self) -> None:
+        """Cancels the job loops, interrupting any run in progress at its next await."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_job(self, name: str) -> int:
+        """Runs one job now, recording its duration and outcome. Errors propagate to the caller."""
+        job = self.jobs[name]
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            job.last_result = await job.run()
+            outcome = "ok"
+            return job.last_result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            job.last_duration = time.perf_counter() - started
+            job.last_finished = time.time()
+            profiling.record_job(name, outcome, job.last_duration)
+
+    async def _loop(self, job: Job) -> None:
+        """Runs a job forever, `interval` seconds apart; a failed run is logged and retried next time."""
+        while True:
+            try:
+                await self.run_job(job.name)
+            except Exception as e:
+                print(f"Error running background job {job.name}: {e}")
+            await asyncio.sleep(job.interval)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Each job's last run as /metrics gauges, keyed by metric prefix; run counts are in the histogram."""
+        return {
+            f"background_job_{job.name}": {
+                "last_duration_seconds": round(job.last_duration, 6),
+                "last_result": job.last_result,
+                "last_finished_timestamp_seconds": round(job.last_finished, 3),
+            }
+            for job in self.jobs.values()
+        }
+
+
+scheduler = Scheduler([
+    Job("expire_poa_requests", expire_poa_requests, EXPIRY_SWEEP_INTERVAL),
+    Job("reconcile_rollups", reconcile_rollups, ROLLUP_RECONCILE_INTERVAL),
+    Job("prune_response_cache", prune_response_cache, CACHE_PRUNE_INTERVAL),
+])
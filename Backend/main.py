@@ -1,15 +1,51 @@
-from fastapi import FastAPI, HTTPException, Query, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware  # <-- import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlencode
+import os
+import blobstore
+import bulk
 import crud
+import changes
+import jobs
+import profiling
+import serialization
+import storage
+from cache import (
+    CachedResponse, response_cache, etag_matches, version_etag, parse_version_etag,
+    POA_LIST_TAG, EXTERNAL_DOC_LIST_TAG, poa_tag, external_doc_tag
+)
 from models import (
-    DashboardData, POARequestBase, POARequest, NewPOARequest, 
-    ExternalDocVerification, ExternalDocVerificationDetails
+    DashboardData, POARequestBase, POARequest, POARequestBatch, NewPOARequest, 
+    ExternalDocVerification, ExternalDocVerificationDetails, ExternalDocVerificationBatch,
+    POARequestTransition, ExternalDocTransition, TransitionResult,
+    POARequestPatch, ExternalDocVerificationPatch, POAFile, ExternalDocFile, RequestFacets
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepares the storage engine before the first request, starts the background jobs and,
+    with the response cache on, invalidates it from the change log so writes made by other
+    processes or nodes are seen. On shutdown stops both, then releases the engine's threads
+    and connections.
+    """
+    await storage.startup()
+    if response_cache.ttl > 0:
+        await changes.change_feed.start_cache_invalidation()
+    if jobs.SCHEDULER_ENABLED:
+        jobs.scheduler.start()
+    yield
+    await jobs.scheduler.stop()
+    await changes.change_feed.stop()
+    await storage.shutdown()
+
 app = FastAPI(
     title="LEGATORA Admin API Mock",
-    description="Mock API for the LEGATORA Admin Portal using FastAPI and SQLite."
+    description="Mock API for the LEGATORA Admin Portal using FastAPI, with SQLite or PostgreSQL storage.",
+    lifespan=lifespan
 )
 
 
@@ -19,45 +55,215 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  
     allow_headers=["*"], 
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(profiling.TimingMiddleware)
 # ------------------------------------------------
 
+def _cache_key(request: Request) -> str:
+    """Cache key made of the path and the sorted query parameters."""
+    return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+def _page_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    """Headers carrying the cursor for the next page, if there is one."""
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+def _batch_ids(ids: List[str]) -> List[str]:
+    """Flattens repeated and comma-separated `ids` parameters, keeping order and dropping duplicates."""
+    request_ids = list(dict.fromkeys(i.strip() for value in ids for i in value.split(",") if i.strip()))
+    if len(request_ids) > crud.MAX_BATCH_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {crud.MAX_BATCH_IDS} ids per batch.")
+    return request_ids
+
+def _expected_version(if_match: Optional[str]) -> Optional[int]:
+    """The row version a conditional PATCH is based on, from its If-Match header."""
+    try:
+        return parse_version_etag(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _version_conflict(request_id: str, e: crud.VersionConflict) -> HTTPException:
+    """409 telling the client to reload the request before editing it again."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{request_id} was modified by someone else (now at version {e.current_version}). Reload and retry.",
+        headers={"ETag": version_etag(e.current_version)},
+    )
+
+def _cached_response(request: Request, entry: CachedResponse) -> Response:
+    """Answers from a cache entry, with 304 Not Modified when the client's ETag still matches."""
+    headers = {**entry.headers, "ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.record_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+async def _upload_file(request: Request, request_id: str, document_type: str,
+                       exists: Callable[[str], Awaitable[bool]],
+                       add_file: Callable[..., Awaitable[Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """Streams the raw request body into the blob store and attaches it to the request as a new file."""
+    # Checked before the body is read, so uploads to unknown requests leave no unreferenced blob
+    if not await exists(request_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Request {request_id} not found.")
+    try:
+        sha256, size = await blobstore.store(request.stream())
+    except blobstore.UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    content_type = blobstore.safe_content_type(request.headers.get("content-type"))
+    file = await add_file(request_id, document_type, sha256, size, content_type)
+    if file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Request {request_id} not found.")
+    return file
+
+def _download_file(request: Request, file: Optional[Dict[str, Any]]) -> Response:
+    """
+    Serves a stored file body. Blobs never change, so the hash is a strong ETag; FileResponse
+    answers Range requests and hands the file to the server for zero-copy sending when it can.
+    Bodies are always sent as attachments with nosniff, and the stored type is re-checked
+    against the allowlist, so files uploaded before it existed cannot render inline either.
+    """
+    if file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    path = blobstore.blob_path(file["sha256"]) if file["sha256"] else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No stored body for this file")
+    etag = f'"{file["sha256"]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return FileResponse(path, media_type=blobstore.safe_content_type(file["content_type"]), headers={
+        "ETag": etag, "Cache-Control": "private, max-age=31536000, immutable",
+        "Content-Disposition": "attachment", "X-Content-Type-Options": "nosniff",
+    })
+
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the LEGATORA Admin Mock API. Check out /docs for endpoints."}
 
 
 @app.get("/dashboard", response_model=DashboardData, tags=["Dashboard"])
-def get_dashboard_summary():
+async def get_dashboard_summary():
     """Returns key metrics and activity data for the admin dashboard."""
-    return crud.get_mock_dashboard_data()
+    return await storage.engine.get_dashboard_data()
 
 
 @app.get("/poa-requests", response_model=List[POARequestBase], tags=["POA Requests"])
-def list_poa_requests(
+async def list_poa_requests(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter by POA category (e.g., Property, Medical)"),
+    status: Optional[str] = Query(None, description="Filter by status (e.g., Active, Pending, Rejected)"),
+    sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest|relevance)$",
+                                   description="Sort by submission date: 'newest' or 'oldest', or by search match: 'relevance' (newest without a search)"),
+    search: Optional[str] = Query(None, description="Search Principal, Assigned Agent, address, contact info and description of power"),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE, description="Maximum number of requests per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return (e.g., request_id,principal,status)")
+):
+    """
+    Lists POA requests with filtering, sorting, and search capabilities.
+    Results are paged; the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        try:
+            rows, next_cursor = await storage.engine.get_poa_requests(category, status, sort_by, search, limit, cursor, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entry = response_cache.set(key, serialization.dumps(rows), [POA_LIST_TAG], generation, _page_headers(next_cursor))
+    return _cached_response(request, entry)
+
+@app.get("/poa-requests/facets", response_model=RequestFacets, tags=["POA Requests"])
+async def get_poa_request_facets(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by POA category (e.g., Property, Medical)"),
     status: Optional[str] = Query(None, description="Filter by status (e.g., Active, Pending, Rejected)"),
-    sort_by: Optional[str] = Query("newest", description="Sort by submission date: 'newest' or 'oldest'"),
-    search: Optional[str] = Query(None, description="Search by Principal or Assigned Agent name")
+    search: Optional[str] = Query(None, description="Search Principal, Assigned Agent, address, contact info and description of power")
+):
+    """
+    Counts POA requests per category, status and submission month for the same filters and search
+    as the list, so the filter controls can show their counts without downloading the list.
+    """
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        facets = await storage.engine.get_poa_request_facets(category, status, search)
+        entry = response_cache.set(key, serialization.dumps(facets), [POA_LIST_TAG], generation)
+    return _cached_response(request, entry)
+
+@app.post("/poa-requests/import", tags=["POA Requests"])
+async def import_poa_requests(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows inserted per transaction")
 ):
-    """Lists POA requests with filtering, sorting, and search capabilities."""
-    return crud.get_poa_requests(category, status, sort_by, search)
+    """
+    Bulk-creates POA requests from a streamed body: NDJSON by default, or CSV with Content-Type text/csv.
+    Each row has the NewPOARequest fields. Rows are validated as they arrive, and rows that fail
+    are reported by line number without aborting the import.
+    """
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    try:
+        return await bulk.import_poa_requests(request.stream(), fmt, batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request body must be UTF-8 encoded.")
+
+@app.get("/poa-requests/export", tags=["POA Requests"])
+async def export_poa_requests(
+    category: Optional[str] = Query(None, description="Filter by POA category (e.g., Property, Medical)"),
+    status: Optional[str] = Query(None, description="Filter by status (e.g., Active, Pending, Rejected)"),
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="'ndjson' or 'csv'")
+):
+    """Streams every matching POA request as NDJSON or CSV, reading the next batch of rows as each one is sent."""
+    batches = storage.engine.iter_poa_request_batches(category, status)
+    if fmt == "csv":
+        return StreamingResponse(
+            bulk.encode_csv(batches, crud.POA_EXPORT_COLUMNS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="poa-requests.csv"'}
+        )
+    return StreamingResponse(bulk.encode_ndjson(batches), media_type="application/x-ndjson")
+
+@app.get("/poa-requests:batch", response_model=POARequestBatch, tags=["POA Requests"])
+async def get_poa_request_details_batch(
+    request: Request,
+    ids: List[str] = Query(..., description="Request ids, comma-separated and/or repeated")
+):
+    """Gets full details, including attached documents, for many POA requests in one call."""
+    request_ids = _batch_ids(ids)
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        items = await storage.engine.get_poa_request_details_batch(request_ids)
+        found = {item["request_id"] for item in items}
+        batch = {"items": items, "missing": [i for i in request_ids if i not in found]}
+        # Creates only invalidate the list tag, so a batch with missing ids also goes when one is created
+        tags = [poa_tag(i) for i in request_ids] + ([POA_LIST_TAG] if batch["missing"] else [])
+        entry = response_cache.set(key, serialization.dumps(batch), tags, generation)
+    return _cached_response(request, entry)
 
 @app.get("/poa-requests/{request_id}", response_model=POARequest, tags=["POA Requests"])
-def get_poa_request_details(request_id: str):
+async def get_poa_request_details(request_id: str, request: Request):
     """Gets full details for a specific POA request, including attached documents."""
-    details = crud.get_poa_request_details(request_id)
-    if not details:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="POA Request not found")
-    return details
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        details = await storage.engine.get_poa_request_details(request_id)
+        if not details:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="POA Request not found")
+        entry = response_cache.set(key, serialization.dumps(details), [poa_tag(request_id)], generation,
+                                   etag=version_etag(details["version"]))
+    return _cached_response(request, entry)
 
 @app.post("/poa-requests", status_code=status.HTTP_201_CREATED, tags=["POA Requests"])
-def create_new_poa_request(new_request: NewPOARequest):
+async def create_new_poa_request(new_request: NewPOARequest):
     """
     Creates a new POA request and inserts it into the database, returning the new request ID.
     """
     try:
-        request_id = crud.create_poa_request(new_request)
+        request_id = await storage.engine.create_poa_request(new_request)
         return {
             "message": "POA Request submitted successfully",
             "request_id": request_id,
@@ -71,53 +277,241 @@ def create_new_poa_request(new_request: NewPOARequest):
         )
 
 @app.patch("/poa-requests/{request_id}", tags=["POA Requests"])
-def update_poa_request_endpoint(request_id: str, new_data: NewPOARequest):
-    """Updates an existing POA request."""
-    success = crud.update_poa_request(request_id, new_data)
-    if not success:
+async def update_poa_request_endpoint(
+    request_id: str,
+    changes: POARequestPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag of the version being edited (e.g., \"v3\"); 409 if it is stale")
+):
+    """Updates only the fields that are sent. With If-Match, the update applies only to that version."""
+    expected_version = _expected_version(if_match)
+    try:
+        # mode="json" writes expiration_date as YYYY-MM-DD, the form the expiry sweep compares
+        version = await storage.engine.update_poa_request(request_id, changes.model_dump(mode="json", exclude_unset=True), expected_version)
+    except crud.VersionConflict as e:
+        raise _version_conflict(request_id, e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"POA Request {request_id} not found.")
-    return {"message": f"POA Request {request_id} updated successfully."}
+    response.headers["ETag"] = version_etag(version)
+    return {"message": f"POA Request {request_id} updated successfully.", "version": version}
+
+@app.post("/poa-requests:transition", response_model=TransitionResult, tags=["POA Requests"])
+async def transition_poa_requests(transition: POARequestTransition):
+    """
+    Sets the status and/or assigned agent of up to 100,000 POA requests in one transaction,
+    reporting which ids were updated, already in that state, or not found.
+    """
+    try:
+        return await storage.engine.transition_poa_requests(transition.request_ids, transition.status, transition.assigned_agent)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@app.post("/poa-requests/{request_id}/files", response_model=POAFile, status_code=status.HTTP_201_CREATED, tags=["POA Requests"])
+async def upload_poa_request_file(
+    request_id: str,
+    request: Request,
+    document_type: str = Query(..., description="Kind of document (e.g., ID Front, Proof of Address)")
+):
+    """
+    Uploads a document for a POA request. The body is the raw file, sent with its own Content-Type
+    (PDF or a raster image; anything else is stored as application/octet-stream); it is streamed
+    to disk and stored once per distinct content (sha256).
+    """
+    return await _upload_file(request, request_id, document_type,
+                              storage.engine.poa_request_exists, storage.engine.add_poa_request_file)
+
+@app.get("/poa-requests/{request_id}/files/{file_id}", tags=["POA Requests"])
+async def download_poa_request_file(request_id: str, file_id: int, request: Request):
+    """Downloads an uploaded POA request document; supports Range and If-None-Match."""
+    return _download_file(request, await storage.engine.get_poa_request_file(request_id, file_id))
 
 @app.delete("/poa-requests/{request_id}", tags=["POA Requests"])
-def delete_poa_request_endpoint(request_id: str):
-    """Deletes a POA request and all associated files."""
-    success = crud.delete_poa_request(request_id)
+async def delete_poa_request_endpoint(request_id: str):
+    """Deletes a POA request; its files are removed in the same statement (ON DELETE CASCADE)."""
+    success = await storage.engine.delete_poa_request(request_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"POA Request {request_id} not found.")
     return {"message": f"POA Request {request_id} deleted successfully."}
 
 
 @app.get("/external-doc-verification", response_model=List[ExternalDocVerification], tags=["External Document Verification"])
-def list_external_doc_verifications(
+async def list_external_doc_verifications(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by document category"),
     status: Optional[str] = Query(None, description="Filter by verification status (e.g., Verified, Pending, Rejected)"),
-    sort_by: Optional[str] = Query("newest", description="Sort by submission date: 'newest' or 'oldest'")
+    sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest)$", description="Sort by submission date: 'newest' or 'oldest'"),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE, description="Maximum number of requests per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return (e.g., request_id,applicant,status)")
 ):
-    """Lists external document verification requests with filtering and sorting."""
-    return crud.get_external_doc_verifications(category, status, sort_by)
+    """
+    Lists external document verification requests with filtering and sorting.
+    Results are paged; the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        try:
+            rows, next_cursor = await storage.engine.get_external_doc_verifications(category, status, sort_by, limit, cursor, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entry = response_cache.set(key, serialization.dumps(rows), [EXTERNAL_DOC_LIST_TAG], generation, _page_headers(next_cursor))
+    return _cached_response(request, entry)
+
+@app.get("/external-doc-verification/facets", response_model=RequestFacets, tags=["External Document Verification"])
+async def get_external_doc_facets(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter by document category"),
+    status: Optional[str] = Query(None, description="Filter by verification status (e.g., Verified, Pending, Rejected)")
+):
+    """Counts external verification requests per category, status and submission month for the same filters as the list."""
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        facets = await storage.engine.get_external_doc_facets(category, status)
+        entry = response_cache.set(key, serialization.dumps(facets), [EXTERNAL_DOC_LIST_TAG], generation)
+    return _cached_response(request, entry)
+
+@app.get("/external-doc-verification:batch", response_model=ExternalDocVerificationBatch, tags=["External Document Verification"])
+async def get_external_doc_verification_details_batch(
+    request: Request,
+    ids: List[str] = Query(..., description="Request ids, comma-separated and/or repeated")
+):
+    """Gets full details, including document rejection details, for many external verification requests in one call."""
+    request_ids = _batch_ids(ids)
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        items = await storage.engine.get_external_doc_verification_details_batch(request_ids)
+        found = {item["request_id"] for item in items}
+        batch = {"items": items, "missing": [i for i in request_ids if i not in found]}
+        tags = [external_doc_tag(i) for i in request_ids] + ([EXTERNAL_DOC_LIST_TAG] if batch["missing"] else [])
+        entry = response_cache.set(key, serialization.dumps(batch), tags, generation)
+    return _cached_response(request, entry)
 
 @app.get("/external-doc-verification/{request_id}", response_model=ExternalDocVerificationDetails, tags=["External Document Verification"])
-def get_external_doc_verification_details(request_id: str):
+async def get_external_doc_verification_details(request_id: str, request: Request):
     """Gets full details for a specific external verification request, including document rejection details."""
-    details = crud.get_external_doc_verification_details(request_id)
-    if not details:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="External Document Verification Request not found")
-    return details
+    key = _cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        details = await storage.engine.get_external_doc_verification_details(request_id)
+        if not details:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="External Document Verification Request not found")
+        entry = response_cache.set(key, serialization.dumps(details), [external_doc_tag(request_id)], generation,
+                                   etag=version_etag(details["version"]))
+    return _cached_response(request, entry)
 
 @app.patch("/external-doc-verification/{request_id}", tags=["External Document Verification"])
-def update_external_doc_verification_endpoint(request_id: str, new_data: ExternalDocVerification):
-    """Updates an existing External Document Verification request's main fields."""
-    success = crud.update_external_doc_verification(request_id, new_data)
-    if not success:
+async def update_external_doc_verification_endpoint(
+    request_id: str,
+    changes: ExternalDocVerificationPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag of the version being edited (e.g., \"v3\"); 409 if it is stale")
+):
+    """Updates only the main fields that are sent. With If-Match, the update applies only to that version."""
+    expected_version = _expected_version(if_match)
+    try:
+        version = await storage.engine.update_external_doc_verification(
+            request_id, changes.model_dump(exclude_unset=True), expected_version
+        )
+    except crud.VersionConflict as e:
+        raise _version_conflict(request_id, e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"External Doc Verification {request_id} not found.")
-    return {"message": f"External Doc Verification {request_id} updated successfully."}
+    response.headers["ETag"] = version_etag(version)
+    return {"message": f"External Doc Verification {request_id} updated successfully.", "version": version}
+
+@app.post("/external-doc-verification:transition", response_model=TransitionResult, tags=["External Document Verification"])
+async def transition_external_doc_verifications(transition: ExternalDocTransition):
+    """
+    Sets the status (e.g., Verified or Rejected) of up to 100,000 verification requests in one
+    transaction, reporting which ids were updated, already in that state, or not found.
+    """
+    try:
+        return await storage.engine.transition_external_doc_verifications(transition.request_ids, transition.status)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@app.post("/external-doc-verification/{request_id}/files", response_model=ExternalDocFile,
+          status_code=status.HTTP_201_CREATED, tags=["External Document Verification"])
+async def upload_external_doc_file(
+    request_id: str,
+    request: Request,
+    document_type: str = Query(..., description="Kind of document (e.g., Title Deed, Business License)")
+):
+    """
+    Uploads a document for an external verification request. The body is the raw file, sent with
+    its own Content-Type (PDF or a raster image; anything else is stored as application/octet-stream);
+    it is streamed to disk and stored once per distinct content (sha256).
+    """
+    return await _upload_file(request, request_id, document_type,
+                              storage.engine.external_doc_exists, storage.engine.add_external_doc_file)
+
+@app.get("/external-doc-verification/{request_id}/files/{file_id}", tags=["External Document Verification"])
+async def download_external_doc_file(request_id: str, file_id: int, request: Request):
+    """Downloads an uploaded external verification document; supports Range and If-None-Match."""
+    return _download_file(request, await storage.engine.get_external_doc_file(request_id, file_id))
 
 @app.delete("/external-doc-verification/{request_id}", tags=["External Document Verification"])
-def delete_external_doc_verification_endpoint(request_id: str):
+async def delete_external_doc_verification_endpoint(request_id: str):
     """Deletes an external doc verification request and all associated files."""
-    success = crud.delete_external_doc_verification(request_id)
+    success = await storage.engine.delete_external_doc_verification(request_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"External Doc Verification {request_id} not found.")
     return {"message": f"External Doc Verification {request_id} deleted successfully."}
 
 
+@app.get("/changes", tags=["Changes"])
+async def stream_changes(
+    since: Optional[int] = Query(None, ge=0, description="Last change seq already seen; omit to receive only new changes"),
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource on reconnect; takes precedence over since")
+):
+    """
+    Streams inserts, updates and deletes of POA and external verification requests as Server-Sent Events.
+    Each `change` event carries the seq, entity, request_id, op and new version; fetch changed rows with
+    the :batch endpoints. A `reset` event means the requested position is no longer in the log and
+    lists should be reloaded.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        changes.change_feed.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/cache/stats", tags=["Cache"])
+def get_cache_stats():
+    """Returns hit/miss counters and the current size of the response cache."""
+    return response_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Monitoring"])
+def get_metrics():
+    """
+    Request and background job latency histograms, SQL statement totals, cache counters, change
+    feed state and each job's last run in the Prometheus text format.
+    """
+    gauges = {"response_cache": response_cache.stats(), "change_feed": changes.change_feed.stats(), **jobs.scheduler.stats()}
+    return PlainTextResponse(
+        profiling.render_metrics(gauges),
+        media_type="text/plain; version=0.0.4",
+    )
+
+@app.get("/debug/slow-queries", tags=["Monitoring"])
+def get_slow_queries(limit: int = Query(20, ge=1, le=200)):
+    """Recent statements slower than SLOW_QUERY_MS with their query plans, and the statements with the most total time."""
+    return {
+        "profiling_enabled": profiling.SQL_PROFILING,
+        "threshold_ms": profiling.SLOW_QUERY_MS,
+        "slow_queries": profiling.slow_queries()[:limit],
+        "top_queries": profiling.top_queries(limit),
+    }
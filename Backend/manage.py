@@ -0,0 +1,125 @@
+"""
+Maintenance commands for the Backend database, run against the STORAGE_ENGINE engine.
+
+    python manage.py migrate    # apply pending migrations in place
+    python manage.py explain    # print EXPLAIN QUERY PLAN for every crud query shape (sqlite only)
+    python manage.py rebuild-rollups [--dry-run]
+                                # recompute the dashboard rollups, reporting any drift
+    python manage.py prune-changes [--keep N]
+                                # trim the change log behind GET /changes to its newest N entries
+    python manage.py run-job NAME
+                                # run one background job from jobs.py now
+
+Commands an engine does not support exit with status 2.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable, List, Tuple
+
+# Starting the engine must not migrate or seed behind a command's back; `migrate` does it explicitly
+os.environ["DB_AUTO_MIGRATE"] = "0"
+os.environ["DB_SEED_MOCK_DATA"] = "0"
+
+import crud
+import db
+import jobs
+import storage
+
+
+def _query_shapes() -> List[Tuple[str, str, list]]:
+    """Returns (name, sql, params) for each query shape crud.py issues."""
+    poa_columns = list(crud.POA_LIST_FIELDS)
+    doc_columns = list(crud.EXTERNAL_DOC_LIST_FIELDS)
+    cursor = crud._encode_cursor("newest", "2023-10-26", 1)
+    limit = crud.DEFAULT_PAGE_SIZE
+
+    shapes = [
+        ("poa list", *crud.build_poa_requests_query(None, None, "newest", None, limit, None, poa_columns)),
+        ("poa list, next page", *crud.build_poa_requests_query(None, None, "newest", None, limit, cursor, poa_columns)),
+        ("poa list, oldest first", *crud.build_poa_requests_query(None, None, "oldest", None, limit, None, poa_columns)),
+        ("poa list by category", *crud.build_poa_requests_query("Property", None, "newest", None, limit, None, poa_columns)),
+        ("poa list by status", *crud.build_poa_requests_query(None, "Active", "newest", None, limit, None, poa_columns)),
+        ("poa list by category and status", *crud.build_poa_requests_query("Property", "Active", "newest", None, limit, cursor, poa_columns)),
+        ("poa list search", *crud.build_poa_requests_query(None, None, "newest", "Abebe", limit, None, poa_columns)),
+        ("poa list search by relevance", *crud.build_poa_requests_query("Property", None, "relevance", "Abebe", limit, None, poa_columns)),
+        ("poa list short search", *crud.build_poa_requests_query(None, None, "newest", "Ab", limit, None, poa_columns)),
+        ("poa list search with a short word", *crud.build_poa_requests_query(None, None, "newest", "Abebe Ad", limit, None, poa_columns)),
+        ("poa list search with a short word by relevance", *crud.build_poa_requests_query(None, None, "relevance", "Abebe Ad", limit, None, poa_columns)),
+        ("poa facets", crud.FACET_ROLLUP_SQL.format(rollup_table="poa_request_rollups"), []),
+        ("poa detail", crud.POA_REQUEST_DETAIL_SQL, ['["POA-84622", "POA-84621"]']),
+        ("poa detail files", crud.POA_REQUEST_FILES_SQL, ['["POA-84622", "POA-84621"]']),
+        ("poa detail checklist items", crud.POA_REQUEST_CHECKLIST_SQL, ['["POA-84622", "POA-84621"]']),
+        ("change feed tail", crud.CHANGES_SQL, [0, 1000]),
+        ("external doc list", *crud.build_external_doc_verifications_query(None, None, "newest", limit, None, doc_columns)),
+        ("external doc list, next page", *crud.build_external_doc_verifications_query(None, None, "newest", limit, cursor, doc_columns)),
+        ("external doc list by category", *crud.build_external_doc_verifications_query("Medical", None, "newest", limit, None, doc_columns)),
+        ("external doc list by status", *crud.build_external_doc_verifications_query(None, "Verified", "oldest", limit, None, doc_columns)),
+        ("external doc list by category and status", *crud.build_external_doc_verifications_query("Medical", "Verified", "newest", limit, cursor, doc_columns)),
+        ("external doc detail", crud.EXTERNAL_DOC_DETAIL_SQL, ['["POA-84621", "POA-84620"]']),
+        ("external doc detail files", crud.EXTERNAL_DOC_FILES_SQL, ['["POA-84621", "POA-84620"]']),
+    ]
+    return shapes
+
+
+def explain() -> int:
+    """Prints the query plan of every crud query shape. Returns the exit code."""
+    if storage.ENGINE != "sqlite":
+        print(f"explain is not supported by the {storage.ENGINE} engine")
+        return 2
+    with db.connection() as conn:
+        for name, sql, params in _query_shapes():
+            print(f"== {name}")
+            print(f"   {sql}")
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+                print(f"   -> {row['detail']}")
+            print()
+    return 0
+
+
+async def _with_engine(command: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Runs a storage engine coroutine function with the engine started."""
+    await storage.startup()
+    try:
+        return await command(*args)
+    finally:
+        await storage.shutdown()
+
+
+async def rebuild_rollups(dry_run: bool) -> int:
+    """Reports rollup drift and, unless dry_run, recomputes the rollups. Returns the exit code."""
+    drift = await (storage.engine.find_rollup_drift() if dry_run else storage.engine.rebuild_rollups())
+    for row in drift:
+        print(f"{row['table']}: {row['month']} {row['category']}/{row['status']} stored={row['stored']} actual={row['actual']}")
+    print(f"{len(drift)} drifted counter(s) {'found' if dry_run else 'corrected'}")
+    return 1 if dry_run and drift else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Apply pending schema migrations")
+    commands.add_parser("explain", help="Print EXPLAIN QUERY PLAN for each crud query")
+    rollups = commands.add_parser("rebuild-rollups", help="Recompute the dashboard rollup tables from scratch")
+    rollups.add_argument("--dry-run", action="store_true", help="Only report drift; exit with status 1 if any is found")
+    prune = commands.add_parser("prune-changes", help="Delete old change log entries")
+    prune.add_argument("--keep", type=int, default=100000, help="Number of most recent entries to keep")
+    job = commands.add_parser("run-job", help="Run one background job now (e.g. from cron with SCHEDULER_ENABLED=0)")
+    job.add_argument("name", choices=sorted(jobs.scheduler.jobs), help="Job to run")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(f"Database is at schema version {asyncio.run(_with_engine(storage.engine.migrate))}")
+    elif args.command == "explain":
+        sys.exit(explain())
+    elif args.command == "rebuild-rollups":
+        sys.exit(asyncio.run(_with_engine(rebuild_rollups, args.dry_run)))
+    elif args.command == "prune-changes":
+        print(f"Deleted {asyncio.run(_with_engine(storage.engine.prune_change_log, args.keep))} change log entries")
+    elif args.command == "run-job":
+        print(f"{args.name}: {asyncio.run(_with_engine(jobs.scheduler.run_job, args.name))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+-- Baseline schema, matching databases created by the original data.sql.
+-- IF NOT EXISTS lets it adopt those databases in place.
+
+-- 1. POA Requests Table
+CREATE TABLE IF NOT EXISTS poa_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL UNIQUE,
+    principal TEXT NOT NULL,
+    category TEXT NOT NULL,
+    submitted_date TEXT NOT NULL, -- YYYY-MM-DD for simple sorting
+    assigned_agent TEXT,
+    status TEXT NOT NULL,
+    contact_info TEXT,
+    address TEXT,
+    expiration_date TEXT,
+    description_of_power TEXT
+);
+
+-- 2. POA Request Files Table
+CREATE TABLE IF NOT EXISTS poa_request_files (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    FOREIGN KEY (request_id) REFERENCES poa_requests(request_id)
+);
+
+-- 3. External Document Verifications Table
+CREATE TABLE IF NOT EXISTS external_doc_verifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL UNIQUE,
+    applicant TEXT NOT NULL,
+    category TEXT NOT NULL,
+    submitted_date TEXT NOT NULL, -- YYYY-MM-DD
+    status TEXT NOT NULL,
+    contact_info TEXT,
+    address TEXT
+);
+
+-- 4. External Document Files Table (with rejection info)
+CREATE TABLE IF NOT EXISTS external_doc_files (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    rejection_reason TEXT,
+    comment TEXT,
+    FOREIGN KEY (request_id) REFERENCES external_doc_verifications(request_id)
+);
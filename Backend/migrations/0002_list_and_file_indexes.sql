@@ -0,0 +1,16 @@
+-- Indexes for the list queries in crud.py, which filter on category and/or status
+-- and page on (submitted_date, id). The rowid (id) is implicitly the last column of
+-- every index, so each one also serves the keyset ORDER BY.
+CREATE INDEX IF NOT EXISTS idx_poa_requests_submitted ON poa_requests (submitted_date);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_category_submitted ON poa_requests (category, submitted_date);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_status_submitted ON poa_requests (status, submitted_date);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_category_status_submitted ON poa_requests (category, status, submitted_date);
+
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_submitted ON external_doc_verifications (submitted_date);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_category_submitted ON external_doc_verifications (category, submitted_date);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_status_submitted ON external_doc_verifications (status, submitted_date);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_category_status_submitted ON external_doc_verifications (category, status, submitted_date);
+
+-- File lookups by parent request in the detail queries
+CREATE INDEX IF NOT EXISTS idx_poa_request_files_request ON poa_request_files (request_id);
+CREATE INDEX IF NOT EXISTS idx_external_doc_files_request ON external_doc_files (request_id);
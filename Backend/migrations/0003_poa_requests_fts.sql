@@ -0,0 +1,35 @@
+-- Full-text index over the searchable POA request columns. The trigram tokenizer
+-- matches any substring of three or more characters (prefixes included) and is
+-- case-insensitive, so it keeps the semantics of the old LIKE '%term%' search.
+CREATE VIRTUAL TABLE IF NOT EXISTS poa_requests_fts USING fts5(
+    principal,
+    assigned_agent,
+    address,
+    contact_info,
+    description_of_power,
+    content='poa_requests',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+-- Index the rows that already exist
+INSERT INTO poa_requests_fts(poa_requests_fts) VALUES ('rebuild');
+
+-- Keep the index in sync with poa_requests
+CREATE TRIGGER IF NOT EXISTS poa_requests_fts_insert AFTER INSERT ON poa_requests BEGIN
+    INSERT INTO poa_requests_fts (rowid, principal, assigned_agent, address, contact_info, description_of_power)
+    VALUES (new.id, new.principal, new.assigned_agent, new.address, new.contact_info, new.description_of_power);
+END;
+
+CREATE TRIGGER IF NOT EXISTS poa_requests_fts_delete AFTER DELETE ON poa_requests BEGIN
+    INSERT INTO poa_requests_fts (poa_requests_fts, rowid, principal, assigned_agent, address, contact_info, description_of_power)
+    VALUES ('delete', old.id, old.principal, old.assigned_agent, old.address, old.contact_info, old.description_of_power);
+END;
+
+CREATE TRIGGER IF NOT EXISTS poa_requests_fts_update
+AFTER UPDATE OF principal, assigned_agent, address, contact_info, description_of_power ON poa_requests BEGIN
+    INSERT INTO poa_requests_fts (poa_requests_fts, rowid, principal, assigned_agent, address, contact_info, description_of_power)
+    VALUES ('delete', old.id, old.principal, old.assigned_agent, old.address, old.contact_info, old.description_of_power);
+    INSERT INTO poa_requests_fts (rowid, principal, assigned_agent, address, contact_info, description_of_power)
+    VALUES (new.id, new.principal, new.assigned_agent, new.address, new.contact_info, new.description_of_power);
+END;
@@ -0,0 +1,69 @@
+-- Request counts per submission month (YYYY-MM), category and status, read by the
+-- dashboard instead of grouping the request tables on every hit. The triggers below
+-- keep them current inside the same transaction as every insert, update and delete.
+CREATE TABLE IF NOT EXISTS poa_request_rollups (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS external_doc_rollups (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, status)
+) WITHOUT ROWID;
+
+-- Count the rows that already exist
+DELETE FROM poa_request_rollups;
+INSERT INTO poa_request_rollups (month, category, status, request_count)
+SELECT substr(submitted_date, 1, 7), category, status, COUNT(*) FROM poa_requests GROUP BY 1, 2, 3;
+
+DELETE FROM external_doc_rollups;
+INSERT INTO external_doc_rollups (month, category, status, request_count)
+SELECT substr(submitted_date, 1, 7), category, status, COUNT(*) FROM external_doc_verifications GROUP BY 1, 2, 3;
+
+-- POA request counters
+CREATE TRIGGER IF NOT EXISTS poa_request_rollups_insert AFTER INSERT ON poa_requests BEGIN
+    INSERT INTO poa_request_rollups (month, category, status, request_count)
+    VALUES (substr(new.submitted_date, 1, 7), new.category, new.status, 1)
+    ON CONFLICT (month, category, status) DO UPDATE SET request_count = request_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS poa_request_rollups_delete AFTER DELETE ON poa_requests BEGIN
+    UPDATE poa_request_rollups SET request_count = request_count - 1
+    WHERE month = substr(old.submitted_date, 1, 7) AND category = old.category AND status = old.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS poa_request_rollups_update
+AFTER UPDATE OF submitted_date, category, status ON poa_requests BEGIN
+    UPDATE poa_request_rollups SET request_count = request_count - 1
+    WHERE month = substr(old.submitted_date, 1, 7) AND category = old.category AND status = old.status;
+    INSERT INTO poa_request_rollups (month, category, status, request_count)
+    VALUES (substr(new.submitted_date, 1, 7), new.category, new.status, 1)
+    ON CONFLICT (month, category, status) DO UPDATE SET request_count = request_count + 1;
+END;
+
+-- External document verification counters
+CREATE TRIGGER IF NOT EXISTS external_doc_rollups_insert AFTER INSERT ON external_doc_verifications BEGIN
+    INSERT INTO external_doc_rollups (month, category, status, request_count)
+    VALUES (substr(new.submitted_date, 1, 7), new.category, new.status, 1)
+    ON CONFLICT (month, category, status) DO UPDATE SET request_count = request_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS external_doc_rollups_delete AFTER DELETE ON external_doc_verifications BEGIN
+    UPDATE external_doc_rollups SET request_count = request_count - 1
+    WHERE month = substr(old.submitted_date, 1, 7) AND category = old.category AND status = old.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS external_doc_rollups_update
+AFTER UPDATE OF submitted_date, category, status ON external_doc_verifications BEGIN
+    UPDATE external_doc_rollups SET request_count = request_count - 1
+    WHERE month = substr(old.submitted_date, 1, 7) AND category = old.category AND status = old.status;
+    INSERT INTO external_doc_rollups (month, category, status, request_count)
+    VALUES (substr(new.submitted_date, 1, 7), new.category, new.status, 1)
+    ON CONFLICT (month, category, status) DO UPDATE SET request_count = request_count + 1;
+END;
@@ -0,0 +1,52 @@
+-- Rebuilds both file tables so their foreign keys cascade deletes from the parent request,
+-- using SQLite's create-copy-drop-rename procedure (a foreign key cannot be altered in place).
+-- Orphaned file rows, whose request no longer exists, cannot satisfy the new constraint
+-- and are not copied; they were unreachable through the API already.
+
+-- 1. POA Request Files
+CREATE TABLE poa_request_files_new (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    FOREIGN KEY (request_id) REFERENCES poa_requests(request_id) ON DELETE CASCADE
+);
+
+INSERT INTO poa_request_files_new (file_id, request_id, document_type, file_link, submitted_date)
+SELECT file_id, request_id, document_type, file_link, submitted_date
+FROM poa_request_files
+WHERE request_id IN (SELECT request_id FROM poa_requests);
+
+-- Keep the AUTOINCREMENT high-water mark so file ids are never reused
+DELETE FROM sqlite_sequence WHERE name = 'poa_request_files_new';
+INSERT INTO sqlite_sequence (name, seq) SELECT 'poa_request_files_new', seq FROM sqlite_sequence WHERE name = 'poa_request_files';
+
+DROP TABLE poa_request_files;
+ALTER TABLE poa_request_files_new RENAME TO poa_request_files;
+CREATE INDEX idx_poa_request_files_request ON poa_request_files (request_id);
+
+-- 2. External Document Files
+CREATE TABLE external_doc_files_new (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    rejection_reason TEXT,
+    comment TEXT,
+    FOREIGN KEY (request_id) REFERENCES external_doc_verifications(request_id) ON DELETE CASCADE
+);
+
+INSERT INTO external_doc_files_new (file_id, request_id, document_type, file_link, submitted_date, rejection_reason, comment)
+SELECT file_id, request_id, document_type, file_link, submitted_date, rejection_reason, comment
+FROM external_doc_files
+WHERE request_id IN (SELECT request_id FROM external_doc_verifications);
+
+-- Keep the AUTOINCREMENT high-water mark so file ids are never reused
+DELETE FROM sqlite_sequence WHERE name = 'external_doc_files_new';
+INSERT INTO sqlite_sequence (name, seq) SELECT 'external_doc_files_new', seq FROM sqlite_sequence WHERE name = 'external_doc_files';
+
+DROP TABLE external_doc_files;
+ALTER TABLE external_doc_files_new RENAME TO external_doc_files;
+CREATE INDEX idx_external_doc_files_request ON external_doc_files (request_id);
@@ -0,0 +1,4 @@
+-- Row version for optimistic concurrency: every write bumps it, and PATCH with If-Match
+-- only applies when the client's version is still the current one.
+ALTER TABLE poa_requests ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE external_doc_verifications ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
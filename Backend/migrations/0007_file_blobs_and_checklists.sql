@@ -0,0 +1,19 @@
+-- Uploaded document bodies live in the content-addressed blob store (blobstore.py);
+-- file rows record the blob's sha256, its size and the uploaded Content-Type.
+-- Rows created before uploads existed keep NULLs here and have no stored body.
+ALTER TABLE poa_request_files ADD COLUMN sha256 TEXT;
+ALTER TABLE poa_request_files ADD COLUMN size_bytes INTEGER;
+ALTER TABLE poa_request_files ADD COLUMN content_type TEXT;
+ALTER TABLE external_doc_files ADD COLUMN sha256 TEXT;
+ALTER TABLE external_doc_files ADD COLUMN size_bytes INTEGER;
+ALTER TABLE external_doc_files ADD COLUMN content_type TEXT;
+
+-- Checklist items of a POA request, in the order they were submitted. The primary key
+-- doubles as the per-request index, and the items are removed with their request.
+CREATE TABLE IF NOT EXISTS poa_request_checklist_items (
+    request_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (request_id, position),
+    FOREIGN KEY (request_id) REFERENCES poa_requests(request_id) ON DELETE CASCADE
+) WITHOUT ROWID;
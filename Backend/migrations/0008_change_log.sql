@@ -0,0 +1,11 @@
+-- Append-only log of every write to the request tables, tailed by GET /changes.
+-- seq orders the changes; AUTOINCREMENT keeps it from reusing the seqs of pruned rows,
+-- so a client's last seen seq stays meaningful. version is NULL for deletes.
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    request_id TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    version INTEGER,
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
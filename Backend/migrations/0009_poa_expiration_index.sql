@@ -0,0 +1,3 @@
+-- Expiration sweep (jobs.py): finds Active requests past their expiration_date with one
+-- range scan, oldest first, instead of scanning every Active request.
+CREATE INDEX IF NOT EXISTS idx_poa_requests_status_expiration ON poa_requests (status, expiration_date);
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import datetime
 
 # --- 1. Dashboard Models ---
@@ -30,6 +30,10 @@ class POAFile(BaseModel):
     document_type: str
     file_link: str
     submitted_date: str 
+    # Set for uploaded files; file_link then downloads the stored body
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    content_type: Optional[str] = None
 
 class POARequestBase(BaseModel):
     """Base model for POA requests."""
@@ -44,15 +48,54 @@ class POARequestBase(BaseModel):
 
 class POARequest(POARequestBase):
     """Full model for a POA Request, including files."""
+    version: int  # Send back in If-Match to update only this version
+    checklist_items: List[str]
     files: List[POAFile]
 
+class POARequestBatch(BaseModel):
+    """Full details for a batch of POA Requests, plus the requested ids that were not found."""
+    items: List[POARequest]
+    missing: List[str]
+
+class POARequestPatch(BaseModel):
+    """Partial update of a POA request; only the fields that are sent are written."""
+    full_name: Optional[str] = None
+    contact_info: Optional[str] = None
+    address: Optional[str] = None
+    category: Optional[str] = None
+    expiration_date: Optional[datetime.date] = None  # YYYY-MM-DD
+    description_of_power: Optional[str] = None
+    checklist_items: Optional[List[str]] = None  # Replaces the whole list
+
+class POARequestTransition(BaseModel):
+    """Bulk change of status and/or assigned agent for many POA requests."""
+    request_ids: List[str]
+    status: Optional[str] = None
+    assigned_agent: Optional[str] = None
+
+class TransitionResult(BaseModel):
+    """Per-id outcome of a bulk transition."""
+    updated: List[str]
+    unchanged: List[str]
+    not_found: List[str]
+
+class RequestFacets(BaseModel):
+    """
+    Request counts for the list filters. Each facet ignores its own filter, so the category counts
+    show what choosing another category would return; total and submitted_month apply every filter.
+    """
+    total: int
+    category: Dict[str, int]
+    status: Dict[str, int]
+    submitted_month: Dict[str, int]  # YYYY-MM -> count, oldest first
+
 class NewPOARequest(BaseModel):
     """Model for creating/updating a new POA request."""
     full_name: str
     contact_info: str
     address: str
     category: str
-    expiration_date: Optional[str] = None
+    expiration_date: Optional[datetime.date] = None  # YYYY-MM-DD
     description_of_power: str
     checklist_items: List[str]
 
@@ -74,4 +117,23 @@ class ExternalDocFile(POAFile):
 
 class ExternalDocVerificationDetails(ExternalDocVerification):
     """Details view for an External Document Verification."""
-    files: List[ExternalDocFile]
\ No newline at end of file
+    version: int  # Send back in If-Match to update only this version
+    files: List[ExternalDocFile]
+
+class ExternalDocVerificationBatch(BaseModel):
+    """Details for a batch of External Document Verifications, plus the requested ids that were not found."""
+    items: List[ExternalDocVerificationDetails]
+    missing: List[str]
+
+class ExternalDocVerificationPatch(BaseModel):
+    """Partial update of an External Document Verification; only the fields that are sent are written."""
+    applicant: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[str] = None
+    contact_info: Optional[str] = None
+    address: Optional[str] = None
+
+class ExternalDocTransition(BaseModel):
+    """Bulk status change (e.g., approve or reject) for many External Document Verifications."""
+    request_ids: List[str]
+    status: str
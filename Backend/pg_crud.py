@@ -0,0 +1,674 @@
+"""
+PostgreSQL storage engine (STORAGE_ENGINE=postgres): the async_crud.py coroutine functions
+over an asyncpg connection pool.
+
+asyncpg prepares every parameterised statement and keeps it in a per-connection statement
+cache, so the list, detail and write statements are parsed and planned once per connection
+rather than once per request. Exports page through the table by id, one keyset query per
+batch, as crud.py does. A server-side cursor would need one connection and one transaction
+for the whole export, so a slow client could pin a pooled connection and hold back vacuum.
+Cursors, field projection, validation and the response shapes come from crud.py, so clients
+cannot tell the two engines apart.
+"""
+import itertools
+import os
+import re
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import asyncpg
+except ImportError:  # Only needed with STORAGE_ENGINE=postgres
+    asyncpg = None
+
+import crud
+import db
+from cache import response_cache, POA_LIST_TAG, EXTERNAL_DOC_LIST_TAG, poa_tag, external_doc_tag
+from models import DashboardData, NewPOARequest
+
+POSTGRES_DSN = os.environ.get("POSTGRES_DSN", "postgresql://localhost/legatora")
+MIGRATIONS_DIR = os.path.join(db.BASE_DIR, "pg_migrations")
+
+# Pool settings
+POOL_MIN_SIZE = int(os.environ.get("PG_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.environ.get("PG_POOL_MAX_SIZE", "16"))
+# Prepared statements kept per connection; set 0 behind PgBouncer in transaction pooling mode
+STATEMENT_CACHE_SIZE = int(os.environ.get("PG_STATEMENT_CACHE_SIZE", "256"))
+COMMAND_TIMEOUT = float(os.environ.get("PG_COMMAND_TIMEOUT", "30"))
+
+# Advisory lock keys
+MIGRATION_LOCK = 7_301_001
+SEED_LOCK = 7_301_002
+CHANGE_SEQUENCER_LOCK = 7_301_003
+
+_pool: Optional["asyncpg.Pool"] = None
+
+def _numbered(sql: str) -> str:
+    """Rewrites the ? placeholders of SQL shared with crud.py into asyncpg's $1, $2, ..."""
+    counter = itertools.count(1)
+    return re.sub(r"\?", lambda _: f"${next(counter)}", sql)
+
+def _acquire():
+    """Borrows a pooled connection: `async with _acquire() as conn`."""
+    if _pool is None:
+        raise RuntimeError("The postgres storage engine is not started; call storage.startup() first")
+    return _pool.acquire()
+
+# --- 1. Lifecycle ---
+async def startup() -> None:
+    """Opens the connection pool, then migrates and seeds as configured by DB_AUTO_MIGRATE and DB_SEED_MOCK_DATA."""
+    global _pool
+    if asyncpg is None:
+        raise RuntimeError("STORAGE_ENGINE=postgres needs the asyncpg package (pip install asyncpg)")
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            POSTGRES_DSN, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+            statement_cache_size=STATEMENT_CACHE_SIZE, command_timeout=COMMAND_TIMEOUT,
+        )
+    if db.AUTO_MIGRATE:
+        await migrate()
+    if db.SEED_MOCK_DATA:
+        await seed_mock_data()
+
+async def close() -> None:
+    """Closes the pool once the connections in use are returned."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+
+async def migrate() -> int:
+    """
+    Applies every pg_migrations/ script not yet recorded in schema_migrations. Each runs in its
+    own transaction with its version row, under an advisory lock so concurrent workers apply it once.
+    Returns the resulting schema version.
+    """
+    async with _acquire() as conn:
+        for target, path in db._migration_files(MIGRATIONS_DIR):
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK)
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    " version INTEGER PRIMARY KEY, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+                )
+                if await conn.fetchval("SELECT 1 FROM schema_migrations WHERE version = $1", target):
+                    continue
+                with open(path, 'r') as f:
+                    await conn.execute(f.read())
+                await conn.execute("INSERT INTO schema_migrations (version) VALUES ($1)", target)
+                print(f"Applied migration {os.path.basename(path)}")
+        return await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+
+async def seed_mock_data() -> bool:
+    """Inserts data.sql into a database without any requests, in one transaction; see db.seed_mock_data."""
+    try:
+        with open(db.SQL_SCRIPT_FILE, 'r') as f:
+            script = f.read()
+        async with _acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", SEED_LOCK)
+                if await conn.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM poa_requests) OR EXISTS (SELECT 1 FROM external_doc_verifications)"
+                ):
+                    return False
+                await conn.execute(script)
+                # data.sql sets some file ids explicitly, which identity columns do not count
+                for files_table in ("poa_request_files", "external_doc_files"):
+                    await conn.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{files_table}', 'file_id'),"
+                        f" COALESCE(MAX(file_id), 0) + 1, false) FROM {files_table}"
+                    )
+        print("Mock data inserted successfully.")
+        return True
+    except Exception as e:
+        print(f"Error during database initialization: {e}")
+        return False
+
+# --- 2. Query Helpers ---
+CHANGE_LOG_INSERT_SQL = _numbered(crud.CHANGE_LOG_INSERT_SQL)
+
+async def _log_changes(conn: "asyncpg.Connection", table: str, op: str,
+                       changes: Sequence[Tuple[str, Optional[int]]]) -> None:
+    """
+    Appends (request_id, new version) changes to the change log, inside the caller's transaction.
+    The rows get no seq yet; _sequence_changes numbers them once the transaction has committed.
+    """
+    if not changes:
+        return
+    await conn.executemany(CHANGE_LOG_INSERT_SQL, [(crud.CHANGE_ENTITIES[table], request_id, op, version)
+                                                   for request_id, version in changes])
+
+def _filters(category: Optional[str], status: Optional[str], params: list) -> str:
+    """AND conditions for the list filters, as in crud.py."""
+    sql = ""
+    if category and category != 'All':
+        sql += " AND category = ?"
+        params.append(category)
+    if status and status != 'All':
+        sql += " AND status = ?"
+        params.append(status)
+    return sql
+
+async def _page(sql: str, params: list, columns: List[str], limit: int, sort_by: Optional[str],
+                sort_column: str = "submitted_date") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Runs a keyset page query and splits the result like crud._paginate."""
+    async with _acquire() as conn:
+        rows = await conn.fetch(_numbered(sql), *params)
+    return crud._paginate(rows, columns, limit, sort_by, sort_column)
+
+async def _bulk_transition(table: str, request_ids: Sequence[str], changes: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Applies `changes` to every request in `request_ids` with one UPDATE over an id array, in one
+    transaction; see crud._bulk_transition for the outcomes.
+    """
+    if not changes:
+        raise ValueError("Nothing to change")
+    if len(request_ids) > crud.MAX_TRANSITION_IDS:
+        raise ValueError(f"At most {crud.MAX_TRANSITION_IDS} ids per transition")
+    ids = list(dict.fromkeys(request_ids))
+    assignments = ", ".join(f"{column} = ${n}" for n, column in enumerate(changes, 2))
+    matches = " AND ".join(f"{column} IS NOT DISTINCT FROM ${n}" for n, column in enumerate(changes, 2))
+
+    async with _acquire() as conn:
+        async with conn.transaction():
+            updated = await conn.fetch(
+                f"UPDATE {table} SET {assignments}, version = version + 1"
+                f" WHERE request_id = ANY($1::text[]) AND NOT ({matches}) RETURNING request_id, version",
+                ids, *changes.values()
+            )
+            existing = await conn.fetch(f"SELECT request_id FROM {table} WHERE request_id = ANY($1::text[])", ids)
+            await _log_changes(conn, table, "update", [(row["request_id"], row["version"]) for row in updated])
+
+    outcomes = dict.fromkeys(ids, "not_found")
+    outcomes.update(dict.fromkeys((row["request_id"] for row in existing), "unchanged"))
+    outcomes.update(dict.fromkeys((row["request_id"] for row in updated), "updated"))
+    return crud._transition_result(ids, outcomes)
+
+async def _patch_row(table: str, request_id: str, values: Dict[str, Any], expected_version: Optional[int],
+                     after_update: Optional[Callable[["asyncpg.Connection"], Awaitable[None]]] = None) -> Optional[int]:
+    """Compare-and-set partial update; see crud._patch_row."""
+    async with _acquire() as conn:
+        async with conn.transaction():
+            version = None
+            if values or after_update:
+                assignments = [f"{c} = ${n}" for n, c in enumerate(values, 1)] + ["version = version + 1"]
+                sql = f"UPDATE {table} SET {', '.join(assignments)} WHERE request_id = ${len(values) + 1}"
+                params = [*values.values(), request_id]
+                if expected_version is not None:
+                    sql += f" AND version = ${len(values) + 2}"
+                    params.append(expected_version)
+                version = await conn.fetchval(sql + " RETURNING version", *params)
+            if version is not None:
+                if after_update:
+                    await after_update(conn)
+                await _log_changes(conn, table, "update", [(request_id, version)])
+                return version
+            current = await conn.fetchval(f"SELECT version FROM {table} WHERE request_id = $1", request_id)
+    if current is None:
+        return None
+    if expected_version is not None and current != expected_version:
+        raise crud.VersionConflict(current)
+    return current
+
+async def _delete(table: str, request_id: str, tags: Sequence[str]) -> bool:
+    """Deletes a request, its files and checklist items going with it through ON DELETE CASCADE."""
+    try:
+        async with _acquire() as conn:
+            async with conn.transaction():
+                deleted = await conn.fetchval(f"DELETE FROM {table} WHERE request_id = $1 RETURNING id", request_id)
+                if deleted is not None:
+                    await _log_changes(conn, table, "delete", [(request_id, None)])
+        response_cache.invalidate(*tags)
+        return deleted is not None
+    except Exception as e:
+        print(f"Error deleting from {table}: {e}")
+        return False
+
+# --- 3. Dashboard ---
+DASHBOARD_POA_SQL = _numbered(crud.DASHBOARD_POA_SQL)
+DASHBOARD_DOC_SQL = _numbered(crud.DASHBOARD_DOC_SQL)
+
+async def get_dashboard_data(today: Optional[date] = None) -> DashboardData:
+    """Builds the dashboard from the rollup counters; see crud.get_dashboard_data."""
+    today = today or date.today()
+    this_month, last_month, window_start = crud._dashboard_months(today)
+    async with _acquire() as conn:
+        poa_rows = await conn.fetch(DASHBOARD_POA_SQL, window_start)
+        doc_rows = await conn.fetch(DASHBOARD_DOC_SQL, this_month, last_month)
+    return crud._build_dashboard(today, poa_rows, doc_rows)
+
+async def find_rollup_drift() -> List[Dict[str, Any]]:
+    """Compares every rollup counter with a fresh GROUP BY over the table it summarises."""
+    drift = []
+    async with _acquire() as conn:
+        for rollup_table, source_table in crud.ROLLUP_TABLES.items():
+            for row in await conn.fetch(crud._rollup_drift_sql(rollup_table, source_table)):
+                drift.append({"table": rollup_table, **dict(row)})
+    return drift
+
+async def rebuild_rollups() -> List[Dict[str, Any]]:
+    """
+    Recomputes every rollup table from scratch in one transaction, returning the drift it
+    corrected. The source tables are locked against writes meanwhile, as in reconcile_rollups.
+    """
+    drift = []
+    async with _acquire() as conn:
+        async with conn.transaction():
+            for rollup_table, source_table in crud.ROLLUP_TABLES.items():
+                await conn.execute(f"LOCK TABLE {source_table} IN SHARE MODE")
+                for row in await conn.fetch(crud._rollup_drift_sql(rollup_table, source_table)):
+                    drift.append({"table": rollup_table, **dict(row)})
+                await conn.execute(f"DELETE FROM {rollup_table}")
+                await conn.execute(
+                    f"INSERT INTO {rollup_table} (month, category, status, request_count)"
+                    f" SELECT substr(submitted_date, 1, 7), category, status, COUNT(*) FROM {source_table} GROUP BY 1, 2, 3"
+                )
+    return drift
+
+async def reconcile_rollups() -> List[Dict[str, Any]]:
+    """
+    Finds rollup drift, then recomputes each drifted month in its own short transaction; see
+    async_crud.reconcile_rollups. The source table is locked against writes while its month is
+    recounted, so no trigger update lands between the DELETE and the INSERT.
+    """
+    drift = await find_rollup_drift()
+    async with _acquire() as conn:
+        for rollup_table, month in sorted({(row["table"], row["month"]) for row in drift}):
+            source_table = crud.ROLLUP_TABLES[rollup_table]
+            async with conn.transaction():
+                await conn.execute(f"LOCK TABLE {source_table} IN SHARE MODE")
+                await conn.execute(f"DELETE FROM {rollup_table} WHERE month = $1", month)
+                await conn.execute(_numbered(crud.ROLLUP_MONTH_SQL.format(rollup_table=rollup_table, source_table=source_table)),
+                                   *crud._rollup_month_range(month))
+    return drift
+
+# --- 4. POA Requests ---
+# Relevance: text search rank of the words as prefixes, negated so the best match sorts
+# first in the ascending order crud._apply_keyset uses for "rank", as bm25 does in SQLite
+POA_RANK_SQL = "-ts_rank(to_tsvector('simple', search_text), to_tsquery('simple', ?))::float8"
+
+def _tsquery(search: str) -> str:
+    """Every word of `search` as a quoted prefix lexeme, ANDed."""
+    return " & ".join("'" + term.lower().replace("'", "''") + "':*" for term in search.split())
+
+def _poa_search_condition(search: str) -> Tuple[str, list]:
+    """
+    WHERE condition and parameters requiring every word of `search` as a substring of one of
+    crud.POA_SEARCH_COLUMNS, through the lowercased search_text column (trigram-indexed with pg_trgm).
+    """
+    terms = [re.sub(r"([\\%_])", r"\\\1", term.lower()) for term in search.split()]
+    if not terms:
+        return "TRUE", []
+    return " AND ".join("search_text LIKE ?" for _ in terms), [f"%{term}%" for term in terms]
+
+def build_poa_requests_query(category: Optional[str], status: Optional[str], sort_by: Optional[str], search: Optional[str],
+                             limit: int, cursor: Optional[str], columns: List[str]) -> Tuple[str, list]:
+    """Builds the SQL (with ? placeholders) and parameters for one page of POA requests."""
+    sort_column = crud._poa_sort_column(sort_by, search)
+    params = [_tsquery(search)] if sort_column == "rank" else []
+    where = _filters(category, status, params)
+    if search:
+        condition, search_params = _poa_search_condition(search)
+        where += " AND " + condition
+        params.extend(search_params)
+
+    if sort_column == "rank":
+        sql = (f"SELECT * FROM (SELECT {crud._select_list(columns)}, {POA_RANK_SQL} AS rank"
+               f" FROM poa_requests WHERE TRUE{where}) AS matches WHERE TRUE")
+    else:
+        sql = f"SELECT {crud._select_list(columns)} FROM poa_requests WHERE TRUE{where}"
+    return crud._apply_keyset(sql, params, sort_by, limit, cursor, sort_column), params
+
+async def get_poa_requests(category: Optional[str], status: Optional[str], sort_by: Optional[str], search: Optional[str],
+                           limit: int = crud.DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                           fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One keyset page of filtered POA requests; see crud.get_poa_requests."""
+    columns = crud._resolve_fields(fields, crud.POA_LIST_FIELDS)
+    sql, params = build_poa_requests_query(category, status, sort_by, search, limit, cursor, columns)
+    return await _page(sql, params, columns, limit, sort_by, crud._poa_sort_column(sort_by, search))
+
+async def get_poa_request_facets(category: Optional[str], status: Optional[str], search: Optional[str]) -> Dict[str, Any]:
+    """Counts per category, status and month, from the rollups unless searching; see crud.get_poa_request_facets."""
+    if search:
+        condition, params = _poa_search_condition(search)
+        sql = (f"SELECT substr(submitted_date, 1, 7) AS month, category, status, COUNT(*) AS request_count"
+               f" FROM poa_requests WHERE {_numbered(condition)} GROUP BY 1, 2, 3")
+    else:
+        sql, params = crud.FACET_ROLLUP_SQL.format(rollup_table="poa_request_rollups"), []
+    async with _acquire() as conn:
+        rows = await conn.fetch(sql, *params)
+    return crud._facet_counts(rows, category, status)
+
+POA_REQUEST_DETAIL_SQL = (
+    f"SELECT {', '.join(crud.POA_DETAIL_FIELDS)} FROM poa_requests WHERE request_id = ANY($1::text[])"
+)
+POA_REQUEST_FILES_SQL = (
+    f"SELECT request_id, {', '.join(crud.POA_FILE_FIELDS)} FROM poa_request_files"
+    " WHERE request_id = ANY($1::text[]) ORDER BY request_id, file_id"
+)
+POA_REQUEST_CHECKLIST_SQL = (
+    "SELECT request_id, item FROM poa_request_checklist_items"
+    " WHERE request_id = ANY($1::text[]) ORDER BY request_id, position"
+)
+
+async def _load_details(request_sql: str, child_sqls: Sequence[str],
+                        request_ids: Sequence[str]) -> Tuple[List[Any], List[Dict[str, List[Any]]]]:
+    """Runs a parent query and its child queries for a batch of ids; see crud._load_details."""
+    ids = list(dict.fromkeys(request_ids))
+    children: List[Dict[str, List[Any]]] = []
+    async with _acquire() as conn:
+        request_rows = await conn.fetch(request_sql, ids)
+        for child_sql in child_sqls:
+            by_request: Dict[str, List[Any]] = {request_id: [] for request_id in ids}
+            if request_rows:
+                for row in await conn.fetch(child_sql, ids):
+                    by_request[row["request_id"]].append(row)
+            children.append(by_request)
+    return request_rows, children
+
+async def get_poa_request_details_batch(request_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Many POA requests with their files and checklist items in three queries; see crud.get_poa_request_details_batch."""
+    request_rows, (files_by_request, checklist_by_request) = await _load_details(
+        POA_REQUEST_DETAIL_SQL, (POA_REQUEST_FILES_SQL, POA_REQUEST_CHECKLIST_SQL), request_ids
+    )
+    return crud._poa_details(request_ids, request_rows, files_by_request, checklist_by_request)
+
+async def get_poa_request_details(request_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves detailed POA request information including files."""
+    details = await get_poa_request_details_batch([request_id])
+    return details[0] if details else None
+
+POA_INSERT_SQL = _numbered(crud.POA_INSERT_SQL)
+POA_CHECKLIST_INSERT_SQL = _numbered(crud.POA_CHECKLIST_INSERT_SQL)
+
+async def create_poa_request(new_request: NewPOARequest) -> str:
+    """Inserts a new POA request and its checklist items, and returns the new request_id."""
+    params = crud._new_poa_request_row(new_request, datetime.now().strftime("%Y-%m-%d"))
+    try:
+        async with _acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(POA_INSERT_SQL, *params)
+                await conn.executemany(POA_CHECKLIST_INSERT_SQL, crud._checklist_rows(params[0], new_request.checklist_items))
+                await _log_changes(conn, "poa_requests", "insert", [(params[0], 1)])
+        response_cache.invalidate(POA_LIST_TAG)
+        return params[0]
+    except Exception as e:
+        print(f"Error inserting new POA request: {e}")
+        raise
+
+async def create_poa_requests(new_requests: List[NewPOARequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Inserts a batch of new POA requests in one transaction with executemany, falling back to
+    one savepoint per row to report the rows the database rejects; see crud.create_poa_requests.
+    """
+    submitted_date = datetime.now().strftime("%Y-%m-%d")
+    rows = [crud._new_poa_request_row(r, submitted_date) for r in new_requests]
+    checklists = [crud._checklist_rows(row[0], r.checklist_items) for row, r in zip(rows, new_requests)]
+
+    async with _acquire() as conn:
+        try:
+            async with conn.transaction():
+                await conn.executemany(POA_INSERT_SQL, rows)
+                await conn.executemany(POA_CHECKLIST_INSERT_SQL, [item for checklist in checklists for item in checklist])
+                await _log_changes(conn, "poa_requests", "insert", [(row[0], 1) for row in rows])
+            response_cache.invalidate(POA_LIST_TAG)
+            return [(row[0], None) for row in rows]
+        except asyncpg.PostgresError as e:
+            print(f"Batch insert failed, retrying row by row: {e}")
+
+        results = []
+        async with conn.transaction():
+            for row, checklist in zip(rows, checklists):
+                try:
+                    async with conn.transaction():  # Nested: a savepoint per row
+                        await conn.execute(POA_INSERT_SQL, *row)
+                        await conn.executemany(POA_CHECKLIST_INSERT_SQL, checklist)
+                        await _log_changes(conn, "poa_requests", "insert", [(row[0], 1)])
+                    results.append((row[0], None))
+                except asyncpg.PostgresError as e:
+                    results.append((None, str(e)))
+    response_cache.invalidate(POA_LIST_TAG)
+    return results
+
+async def iter_poa_request_batches(category: Optional[str], status: Optional[str],
+                                   batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Streams every matching POA request in id order, one keyset query per batch, releasing
+    the connection between batches; see crud.iter_poa_request_batches.
+    """
+    params: list = []
+    sql = _numbered(f"SELECT id, {', '.join(crud.POA_EXPORT_COLUMNS)} FROM poa_requests WHERE id > ?"
+                    f"{_filters(category, status, params)} ORDER BY id LIMIT ?")
+    last_id = 0
+    while True:
+        async with _acquire() as conn:
+            rows = await conn.fetch(sql, last_id, *params, batch_size)
+        if rows:
+            last_id = rows[-1]["id"]
+            yield [{column: row[column] for column in crud.POA_EXPORT_COLUMNS} for row in rows]
+        if len(rows) < batch_size:
+            return
+
+async def update_poa_request(request_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None) -> Optional[int]:
+    """Partial update of a POA request; see crud.update_poa_request."""
+    crud._reject_nulls(changes, crud.POA_NON_NULL_FIELDS)
+    values = {crud.POA_PATCH_COLUMNS[field]: value for field, value in changes.items() if field in crud.POA_PATCH_COLUMNS}
+    replace_checklist = None
+    if "checklist_items" in changes:
+        async def replace_checklist(conn: "asyncpg.Connection") -> None:
+            await conn.execute("DELETE FROM poa_request_checklist_items WHERE request_id = $1", request_id)
+            await conn.executemany(POA_CHECKLIST_INSERT_SQL, crud._checklist_rows(request_id, changes["checklist_items"]))
+    version = await _patch_row("poa_requests", request_id, values, expected_version, replace_checklist)
+    if values or replace_checklist:
+        response_cache.invalidate(POA_LIST_TAG, poa_tag(request_id))
+    return version
+
+async def transition_poa_requests(request_ids: Sequence[str], status: Optional[str] = None,
+                                  assigned_agent: Optional[str] = None) -> Dict[str, List[str]]:
+    """Sets the status and/or assigned agent of many POA requests at once; see _bulk_transition."""
+    changes = {column: value for column, value in (("status", status), ("assigned_agent", assigned_agent)) if value is not None}
+    result = await _bulk_transition("poa_requests", request_ids, changes)
+    if result["updated"]:
+        response_cache.invalidate(POA_LIST_TAG, *(poa_tag(i) for i in result["updated"]))
+    return result
+
+# Locks the batch it selects, skipping rows another transaction holds; see crud.EXPIRED_POA_SQL
+EXPIRE_POA_SQL = """
+    UPDATE poa_requests SET status = 'Expired', version = version + 1
+    WHERE id IN (
+        SELECT id FROM poa_requests
+        WHERE status = 'Active' AND expiration_date > '' AND expiration_date < $1
+          AND expiration_date ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}$'
+        ORDER BY expiration_date LIMIT $2 FOR UPDATE SKIP LOCKED
+    )
+    RETURNING request_id, version
+"""
+
+async def expire_poa_requests(limit: int, today: Optional[date] = None) -> List[str]:
+    """Moves up to `limit` expired Active POA requests to Expired in one transaction; see crud.expire_poa_requests."""
+    today = today or date.today()
+    async with _acquire() as conn:
+        async with conn.transaction():
+            rows = await conn.fetch(EXPIRE_POA_SQL, today.isoformat(), limit)
+            await _log_changes(conn, "poa_requests", "update", [(row["request_id"], row["version"]) for row in rows])
+    request_ids = [row["request_id"] for row in rows]
+    if request_ids:
+        response_cache.invalidate(POA_LIST_TAG, *(poa_tag(i) for i in request_ids))
+    return request_ids
+
+async def delete_poa_request(request_id: str) -> bool:
+    """Deletes a POA request with its files and checklist items."""
+    return await _delete("poa_requests", request_id, (POA_LIST_TAG, poa_tag(request_id)))
+
+# --- 5. External Document Verification ---
+async def get_external_doc_verifications(category: Optional[str], status: Optional[str], sort_by: Optional[str],
+                                         limit: int = crud.DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                         fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One keyset page of filtered External Document Verification requests; see crud.get_external_doc_verifications."""
+    columns = crud._resolve_fields(fields, crud.EXTERNAL_DOC_LIST_FIELDS)
+    params: list = []
+    sql = f"SELECT {crud._select_list(columns)} FROM external_doc_verifications WHERE TRUE{_filters(category, status, params)}"
+    sql = crud._apply_keyset(sql, params, sort_by, limit, cursor)
+    return await _page(sql, params, columns, limit, sort_by)
+
+async def get_external_doc_facets(category: Optional[str], status: Optional[str]) -> Dict[str, Any]:
+    """Counts External Document Verification requests per category, status and month, from the rollups."""
+    async with _acquire() as conn:
+        rows = await conn.fetch(crud.FACET_ROLLUP_SQL.format(rollup_table="external_doc_rollups"))
+    return crud._facet_counts(rows, category, status)
+
+EXTERNAL_DOC_DETAIL_SQL = (
+    f"SELECT {', '.join(crud.EXTERNAL_DOC_DETAIL_FIELDS)} FROM external_doc_verifications"
+    " WHERE request_id = ANY($1::text[])"
+)
+EXTERNAL_DOC_FILES_SQL = (
+    f"SELECT request_id, {', '.join(crud.EXTERNAL_DOC_FILE_FIELDS)} FROM external_doc_files"
+    " WHERE request_id = ANY($1::text[]) ORDER BY request_id, file_id"
+)
+
+async def get_external_doc_verification_details_batch(request_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Many External Document Verification requests with their files in two queries."""
+    request_rows, (files_by_request,) = await _load_details(EXTERNAL_DOC_DETAIL_SQL, (EXTERNAL_DOC_FILES_SQL,), request_ids)
+    return crud._external_doc_details(request_ids, request_rows, files_by_request)
+
+async def get_external_doc_verification_details(request_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves detailed External Document Verification information including files."""
+    details = await get_external_doc_verification_details_batch([request_id])
+    return details[0] if details else None
+
+async def update_external_doc_verification(request_id: str, changes: Dict[str, Any],
+                                           expected_version: Optional[int] = None) -> Optional[int]:
+    """Partial update of an External Document Verification request; see crud.update_external_doc_verification."""
+    crud._reject_nulls(changes, crud.EXTERNAL_DOC_NON_NULL_FIELDS)
+    values = {field: value for field, value in changes.items() if field in crud.EXTERNAL_DOC_PATCH_COLUMNS}
+    version = await _patch_row("external_doc_verifications", request_id, values, expected_version)
+    if values:
+        response_cache.invalidate(EXTERNAL_DOC_LIST_TAG, external_doc_tag(request_id))
+    return version
+
+async def transition_external_doc_verifications(request_ids: Sequence[str], status: str) -> Dict[str, List[str]]:
+    """Sets the status of many External Document Verification requests at once; see _bulk_transition."""
+    result = await _bulk_transition("external_doc_verifications", request_ids, {"status": status})
+    if result["updated"]:
+        response_cache.invalidate(EXTERNAL_DOC_LIST_TAG, *(external_doc_tag(i) for i in result["updated"]))
+    return result
+
+async def delete_external_doc_verification(request_id: str) -> bool:
+    """Deletes an external doc verification request with its files."""
+    return await _delete("external_doc_verifications", request_id, (EXTERNAL_DOC_LIST_TAG, external_doc_tag(request_id)))
+
+# --- 6. Uploaded Files ---
+async def _add_file(table: str, request_id: str, document_type: str, sha256: str, size_bytes: int,
+                    content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Records a stored blob as a new file of a request and bumps its version; see crud._add_file."""
+    files_table, fields, prefix, tags = crud.FILE_TABLES[table]
+    async with _acquire() as conn:
+        async with conn.transaction():
+            version = await conn.fetchval(
+                f"UPDATE {table} SET version = version + 1 WHERE request_id = $1 RETURNING version", request_id
+            )
+            if version is None:
+                return None
+            file_id = await conn.fetchval(
+                f"INSERT INTO {files_table} (request_id, document_type, file_link, submitted_date, sha256, size_bytes, content_type)"
+                " VALUES ($1, $2, '', $3, $4, $5, $6) RETURNING file_id",
+                request_id, document_type, datetime.now().strftime("%Y-%m-%d"), sha256, size_bytes, content_type
+            )
+            row = await conn.fetchrow(
+                f"UPDATE {files_table} SET file_link = $1 WHERE file_id = $2 RETURNING {', '.join(fields)}",
+                f"{prefix}/{request_id}/files/{file_id}", file_id
+            )
+            await _log_changes(conn, table, "update", [(request_id, version)])
+    response_cache.invalidate(*tags(request_id))
+    return {f: row[f] for f in fields}
+
+async def _request_exists(table: str, request_id: str) -> bool:
+    """Whether a request exists; see crud._request_exists."""
+    async with _acquire() as conn:
+        return await conn.fetchval(f"SELECT 1 FROM {table} WHERE request_id = $1", request_id) is not None
+
+async def _get_file(table: str, request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of a request; None if either does not exist."""
+    files_table, fields, _, _ = crud.FILE_TABLES[table]
+    async with _acquire() as conn:
+        row = await conn.fetchrow(f"SELECT {', '.join(fields)} FROM {files_table} WHERE request_id = $1 AND file_id = $2",
+                                  request_id, file_id)
+    return {f: row[f] for f in fields} if row else None
+
+async def poa_request_exists(request_id: str) -> bool:
+    """Whether a POA request exists."""
+    return await _request_exists("poa_requests", request_id)
+
+async def add_poa_request_file(request_id: str, document_type: str, sha256: str, size_bytes: int,
+                               content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Attaches an uploaded blob to a POA request; see _add_file."""
+    return await _add_file("poa_requests", request_id, document_type, sha256, size_bytes, content_type)
+
+async def get_poa_request_file(request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of a POA request."""
+    return await _get_file("poa_requests", request_id, file_id)
+
+async def external_doc_exists(request_id: str) -> bool:
+    """Whether an External Document Verification request exists."""
+    return await _request_exists("external_doc_verifications", request_id)
+
+async def add_external_doc_file(request_id: str, document_type: str, sha256: str, size_bytes: int,
+                                content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Attaches an uploaded blob to an External Document Verification request; see _add_file."""
+    return await _add_file("external_doc_verifications", request_id, document_type, sha256, size_bytes, content_type)
+
+async def get_external_doc_file(request_id: str, file_id: int) -> Optional[Dict[str, Any]]:
+    """Looks up one file of an External Document Verification request."""
+    return await _get_file("external_doc_verifications", request_id, file_id)
+
+# --- 7. Change Log ---
+CHANGES_SQL = _numbered(crud.CHANGES_SQL)
+
+# Numbers, in (txid, id) order, the unsequenced rows of every transaction older than the oldest
+# one still running: those have all committed (or rolled back, leaving no rows), and no later
+# transaction can insert a row that sorts before them
+SEQUENCE_CHANGES_SQL = """
+    WITH ready AS (
+        SELECT id, row_number() OVER (ORDER BY txid, id) AS n FROM change_log
+        WHERE seq IS NULL AND txid < pg_snapshot_xmin(pg_current_snapshot())
+    ), numbered AS (
+        UPDATE change_log c SET seq = head.seq + ready.n
+        FROM ready, change_log_head head WHERE c.id = ready.id
+        RETURNING c.seq
+    )
+    UPDATE change_log_head SET seq = (SELECT MAX(seq) FROM numbered) WHERE EXISTS (SELECT 1 FROM numbered)
+"""
+
+async def _sequence_changes(conn: "asyncpg.Connection") -> None:
+    """
+    Hands out seqs to committed change log rows; runs before the log is read. Writers never
+    wait for it: only sequencers share the lock, and the statement after it sees the seqs
+    committed by the previous holder. A long-running transaction anywhere in the database
+    holds back the horizon, delaying (never reordering) the changes committed after it began.
+    """
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", CHANGE_SEQUENCER_LOCK)
+        await conn.execute(SEQUENCE_CHANGES_SQL)
+
+async def get_changes(since: int, limit: int) -> List[Dict[str, Any]]:
+    """Up to `limit` change log entries after seq `since`, oldest first."""
+    async with _acquire() as conn:
+        await _sequence_changes(conn)
+        rows = await conn.fetch(CHANGES_SQL, since, limit)
+    return [{f: row[f] for f in crud.CHANGE_FIELDS} for row in rows]
+
+async def get_change_bounds() -> Tuple[int, int]:
+    """Returns (oldest, head) like crud.get_change_bounds, after sequencing the committed changes."""
+    async with _acquire() as conn:
+        await _sequence_changes(conn)
+        row = await conn.fetchrow(
+            "SELECT (SELECT MIN(seq) FROM change_log) AS oldest, (SELECT seq FROM change_log_head) AS head"
+        )
+    oldest, head = row["oldest"], row["head"]
+    return (oldest if oldest is not None else head + 1), head
+
+async def prune_change_log(keep: int) -> int:
+    """Deletes all but the newest `keep` sequenced change log entries; returns the number deleted."""
+    async with _acquire() as conn:
+        status = await conn.execute("DELETE FROM change_log WHERE seq <= (SELECT seq FROM change_log_head) - $1", keep)
+    return int(status.split()[-1])
@@ -0,0 +1,149 @@
+-- PostgreSQL schema for the postgres storage engine (pg_crud.py), equivalent to
+-- migrations/0001-0008 of the SQLite engine. Dates stay 'YYYY-MM-DD' text so both engines
+-- sort, filter and serialize them identically.
+
+CREATE TABLE IF NOT EXISTS poa_requests (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    request_id TEXT NOT NULL UNIQUE,
+    principal TEXT NOT NULL,
+    category TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    assigned_agent TEXT,
+    status TEXT NOT NULL,
+    contact_info TEXT,
+    address TEXT,
+    expiration_date TEXT,
+    description_of_power TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    -- Every searchable column in one lowercased string, matched with LIKE '%term%'
+    search_text TEXT GENERATED ALWAYS AS (lower(
+        coalesce(principal, '') || ' ' || coalesce(assigned_agent, '') || ' ' || coalesce(address, '') || ' ' ||
+        coalesce(contact_info, '') || ' ' || coalesce(description_of_power, '')
+    )) STORED
+);
+
+CREATE TABLE IF NOT EXISTS poa_request_files (
+    file_id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    request_id TEXT NOT NULL REFERENCES poa_requests (request_id) ON DELETE CASCADE,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    sha256 TEXT,
+    size_bytes BIGINT,
+    content_type TEXT
+);
+
+CREATE TABLE IF NOT EXISTS poa_request_checklist_items (
+    request_id TEXT NOT NULL REFERENCES poa_requests (request_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (request_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS external_doc_verifications (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    request_id TEXT NOT NULL UNIQUE,
+    applicant TEXT NOT NULL,
+    category TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    contact_info TEXT,
+    address TEXT,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS external_doc_files (
+    file_id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    request_id TEXT NOT NULL REFERENCES external_doc_verifications (request_id) ON DELETE CASCADE,
+    document_type TEXT NOT NULL,
+    file_link TEXT NOT NULL,
+    submitted_date TEXT NOT NULL,
+    rejection_reason TEXT,
+    comment TEXT,
+    sha256 TEXT,
+    size_bytes BIGINT,
+    content_type TEXT
+);
+
+-- List filters and keyset pagination, as in migrations/0002_list_and_file_indexes.sql
+CREATE INDEX IF NOT EXISTS idx_poa_requests_submitted ON poa_requests (submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_category_submitted ON poa_requests (category, submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_status_submitted ON poa_requests (status, submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_poa_requests_category_status_submitted ON poa_requests (category, status, submitted_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_submitted ON external_doc_verifications (submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_category_submitted ON external_doc_verifications (category, submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_status_submitted ON external_doc_verifications (status, submitted_date, id);
+CREATE INDEX IF NOT EXISTS idx_external_doc_verifications_category_status_submitted ON external_doc_verifications (category, status, submitted_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_poa_request_files_request ON poa_request_files (request_id);
+CREATE INDEX IF NOT EXISTS idx_external_doc_files_request ON external_doc_files (request_id);
+
+-- Substring search: a trigram index makes LIKE '%term%' an index lookup where pg_trgm is
+-- available; without it the search scans search_text, which is still correct
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_poa_requests_search ON poa_requests USING gin (search_text gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm is not available; POA request search will scan the table';
+    END IF;
+END $$;
+
+-- Dashboard and facet counters per (month, category, status), as in migrations/0004_dashboard_rollups.sql
+CREATE TABLE IF NOT EXISTS poa_request_rollups (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, status)
+);
+
+CREATE TABLE IF NOT EXISTS external_doc_rollups (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, status)
+);
+
+-- Moves one request between rollup rows; the rollup table is the trigger's argument
+CREATE OR REPLACE FUNCTION maintain_request_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        EXECUTE format('UPDATE %I SET request_count = request_count - 1'
+                       ' WHERE month = $1 AND category = $2 AND status = $3', TG_ARGV[0])
+        USING substr(OLD.submitted_date, 1, 7), OLD.category, OLD.status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE format('INSERT INTO %I AS r (month, category, status, request_count) VALUES ($1, $2, $3, 1)'
+                       ' ON CONFLICT (month, category, status) DO UPDATE SET request_count = r.request_count + 1',
+                       TG_ARGV[0])
+        USING substr(NEW.submitted_date, 1, 7), NEW.category, NEW.status;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS poa_request_rollups_maintain ON poa_requests;
+CREATE TRIGGER poa_request_rollups_maintain
+AFTER INSERT OR DELETE OR UPDATE OF submitted_date, category, status ON poa_requests
+FOR EACH ROW EXECUTE FUNCTION maintain_request_rollup('poa_request_rollups');
+
+DROP TRIGGER IF EXISTS external_doc_rollups_maintain ON external_doc_verifications;
+CREATE TRIGGER external_doc_rollups_maintain
+AFTER INSERT OR DELETE OR UPDATE OF submitted_date, category, status ON external_doc_verifications
+FOR EACH ROW EXECUTE FUNCTION maintain_request_rollup('external_doc_rollups');
+
+-- Append-only change log tailed by GET /changes, as in migrations/0008_change_log.sql.
+-- 0003_post_commit_change_seqs.sql moves seq assignment after commit, so seqs become visible
+-- in order and a tail reading seq > n never skips one.
+CREATE TABLE IF NOT EXISTS change_log (
+    seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    entity TEXT NOT NULL,
+    request_id TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    version INTEGER,
+    changed_at TEXT NOT NULL DEFAULT (to_char(clock_timestamp() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.MS"Z"'))
+);
@@ -0,0 +1,2 @@
+-- Expiration sweep (jobs.py), as in migrations/0009_poa_expiration_index.sql
+CREATE INDEX IF NOT EXISTS idx_poa_requests_status_expiration ON poa_requests (status, expiration_date);
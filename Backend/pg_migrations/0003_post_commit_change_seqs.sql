@@ -0,0 +1,21 @@
+-- Change log seqs are assigned after commit instead of at insert time. Writers used to take
+-- one advisory lock until commit so seqs became visible in order, which serialized every
+-- writer on every node. Now writers insert with seq NULL and their transaction id, and
+-- pg_crud._sequence_changes numbers the rows of transactions older than every running one
+-- (txid < pg_snapshot_xmin), so a seq is only handed out once nothing can commit before it.
+-- Needs PostgreSQL 13+ (xid8, pg_current_xact_id).
+ALTER TABLE change_log DROP CONSTRAINT change_log_pkey;
+ALTER TABLE change_log ALTER COLUMN seq DROP IDENTITY;
+ALTER TABLE change_log ALTER COLUMN seq DROP NOT NULL;
+ALTER TABLE change_log ADD COLUMN id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY;
+ALTER TABLE change_log ADD COLUMN txid xid8 NOT NULL DEFAULT '0';
+ALTER TABLE change_log ALTER COLUMN txid SET DEFAULT pg_current_xact_id();
+CREATE UNIQUE INDEX IF NOT EXISTS change_log_seq_key ON change_log (seq);
+CREATE INDEX IF NOT EXISTS idx_change_log_unsequenced ON change_log (txid, id) WHERE seq IS NULL;
+
+-- Last seq handed out, like SQLite's sqlite_sequence row: pruning never makes seqs go back
+CREATE TABLE IF NOT EXISTS change_log_head (
+    single BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (single),
+    seq BIGINT NOT NULL
+);
+INSERT INTO change_log_head (seq) SELECT COALESCE(MAX(seq), 0) FROM change_log ON CONFLICT DO NOTHING;
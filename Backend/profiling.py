@@ -0,0 +1,330 @@
+"""
+Request and background job timing, and SQL profiling.
+
+Request latencies are always recorded per route by TimingMiddleware (a few microseconds
+per request), and jobs.py records the duration of every background job run. SQL profiling
+is opt-in with SQL_PROFILING=1: db.py then opens connections with ProfilingConnection,
+whose cursors record each statement's duration and row count under its normalized text,
+and keep the slowest ones with their EXPLAIN QUERY PLAN.
+With profiling off, connections are plain sqlite3.Connection objects and nothing is wrapped.
+"""
+import bisect
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SQL_PROFILING = os.environ.get("SQL_PROFILING", "0") == "1"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", "100"))
+
+# Histogram bucket upper bounds in seconds (the Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# --- 1. Metric Types ---
+class Histogram:
+    """Cumulative latency histogram with fixed buckets."""
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Counts one observation in the first bucket whose bound it does not exceed."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs as Prometheus expects them, +Inf last."""
+        pairs, running = [], 0
+        for bound, n in zip(list(LATENCY_BUCKETS) + ["+Inf"], self.counts):
+            running += n
+            pairs.append((str(bound), running))
+        return pairs
+
+
+class QueryStats:
+    """Totals for one normalized SQL statement."""
+    __slots__ = ("sql", "calls", "seconds", "max_seconds", "rows")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Totals as served by /debug/slow-queries."""
+        return {
+            "query_id": query_id(self.sql),
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+# --- 2. Registry ---
+_lock = threading.Lock()
+_requests: Dict[Tuple[str, str, str], Histogram] = {}
+_jobs: Dict[Tuple[str, str], Histogram] = {}
+_queries: Dict[str, QueryStats] = {}
+_slow_queries: "deque[Dict[str, Any]]" = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    """Drops comments, collapses whitespace and replaces literals with '?', so one statement shape gets one entry."""
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def query_id(normalized_sql: str) -> str:
+    """Short stable id for a normalized statement, used as the metrics label."""
+    return hashlib.blake2b(normalized_sql.encode("utf-8"), digest_size=6).hexdigest()
+
+def record_request(method: str, route: str, status_code: int, seconds: float) -> None:
+    """Adds one request to its route's latency histogram."""
+    key = (method, route, str(status_code))
+    with _lock:
+        histogram = _requests.get(key)
+        if histogram is None:
+            histogram = _requests[key] = Histogram()
+        histogram.observe(seconds)
+
+def record_job(job: str, outcome: str, seconds: float) -> None:
+    """Adds one background job run (outcome 'ok', 'error' or 'cancelled') to its duration histogram."""
+    key = (job, outcome)
+    with _lock:
+        histogram = _jobs.get(key)
+        if histogram is None:
+            histogram = _jobs[key] = Histogram()
+        histogram.observe(seconds)
+
+def _record_query(sql: str, seconds: float, rows: int, new_call: bool, elapsed: float) -> None:
+    """Adds time and rows to a statement's totals; `elapsed` is the current execution's duration so far."""
+    with _lock:
+        stats = _queries.get(sql)
+        if stats is None:
+            stats = _queries[sql] = QueryStats(sql)
+        if new_call:
+            stats.calls += 1
+        stats.seconds += seconds
+        stats.rows += rows
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+
+def slow_queries() -> List[Dict[str, Any]]:
+    """The most recent statements slower than SLOW_QUERY_MS, newest first."""
+    with _lock:
+        return [dict(entry) for entry in reversed(_slow_queries)]
+
+def top_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """Statements with the most total time."""
+    with _lock:
+        ranked = sorted(_queries.values(), key=lambda s: s.seconds, reverse=True)[:limit]
+        return [stats.as_dict() for stats in ranked]
+
+def reset() -> None:
+    """Clears every recorded request, job run and statement."""
+    with _lock:
+        _requests.clear()
+        _jobs.clear()
+        _queries.clear()
+        _slow_queries.clear()
+
+# --- 3. SQL Profiling ---
+def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+    """EXPLAIN QUERY PLAN for a statement, using a plain cursor so it is not profiled itself."""
+    try:
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return [row[3] for row in rows]
+    except sqlite3.Error as e:
+        return [f"unavailable: {e}"]
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    Cursor that times execute and fetch calls. A statement's duration is the time spent
+    executing it plus fetching its rows, since SQLite does most of the work while stepping.
+    """
+
+    _sql: Optional[str] = None
+
+    def _begin(self, sql: str, params: Any) -> None:
+        self._sql = normalize_sql(sql)
+        self._sql_text = sql
+        self._params = params
+        self._elapsed = 0.0
+        self._slow_entry: Optional[Dict[str, Any]] = None
+
+    def _add(self, seconds: float, rows: int, new_call: bool = False) -> None:
+        if self._sql is None:
+            return
+        self._elapsed += seconds
+        _record_query(self._sql, seconds, rows, new_call, self._elapsed)
+        if self._slow_entry is not None:
+            self._slow_entry["duration_ms"] = round(self._elapsed * 1000, 3)
+            self._slow_entry["rows"] += rows
+        elif self._elapsed * 1000 >= SLOW_QUERY_MS:
+            self._slow_entry = {
+                "query_id": query_id(self._sql),
+                "sql": self._sql,
+                "duration_ms": round(self._elapsed * 1000, 3),
+                "rows": rows,
+                "plan": _explain(self.connection, self._sql_text, self._params),
+                "at": time.time(),
+            }
+            with _lock:
+                _slow_queries.append(self._slow_entry)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        self._begin(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._add(time.perf_counter() - start, max(self.rowcount, 0), new_call=True)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]):
+        # The first parameter set stands in for the whole batch when explaining it
+        batch = iter(seq_of_parameters)
+        first = next(batch, None)
+        self._begin(sql, () if first is None else first)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, batch if first is None else itertools.chain([first], batch))
+        finally:
+            self._add(time.perf_counter() - start, max(self.rowcount, 0), new_call=True)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - start, int(row is not None))
+        return row
+
+    def fetchmany(self, size: int = -1):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size == -1 else size)
+        self._add(time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - start, len(rows))
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose statements all run on ProfilingCursors; passed to sqlite3.connect as `factory`."""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# --- 4. Request Timing ---
+class TimingMiddleware:
+    """ASGI middleware recording each HTTP request's latency, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Templates like /poa-requests/{request_id} keep the label set small
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            record_request(scope["method"], route, status_code, time.perf_counter() - start)
+
+# --- 5. Exposition ---
+def _labels(**labels: str) -> str:
+    """Formats a Prometheus label set, escaping backslashes, quotes and newlines."""
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(str(v))}"' for k, v in labels.items()) + "}"
+
+def render_metrics(gauges: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """
+    Renders everything recorded in the Prometheus text format. `gauges` maps a metric
+    prefix to extra values to publish, e.g. {"response_cache": response_cache.stats()}.
+    """
+    lines = [
+        "# HELP http_request_duration_seconds HTTP request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with _lock:
+        requests = [(key, Histogram.cumulative(h), h.total, h.count) for key, h in sorted(_requests.items())]
+        jobs = [(key, Histogram.cumulative(h), h.total, h.count) for key, h in sorted(_jobs.items())]
+        queries = [(query_id(s.sql), s.calls, s.seconds, s.rows) for s in _queries.values()]
+    for (method, route, status_code), buckets, total, count in requests:
+        for le, n in buckets:
+            lines.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, status=status_code, le=le)} {n}")
+        labels = _labels(method=method, route=route, status=status_code)
+        lines.append(f"http_request_duration_seconds_sum{labels} {total}")
+        lines.append(f"http_request_duration_seconds_count{labels} {count}")
+
+    lines.append("# HELP background_job_duration_seconds Duration of each background job run (see jobs.py).")
+    lines.append("# TYPE background_job_duration_seconds histogram")
+    for (job, outcome), buckets, total, count in jobs:
+        for le, n in buckets:
+            lines.append(f"background_job_duration_seconds_bucket{_labels(job=job, outcome=outcome, le=le)} {n}")
+        labels = _labels(job=job, outcome=outcome)
+        lines.append(f"background_job_duration_seconds_sum{labels} {total}")
+        lines.append(f"background_job_duration_seconds_count{labels} {count}")
+
+    if SQL_PROFILING:
+        for name, kind, help_text, index in (
+            ("sqlite_query_calls_total", "counter", "Executions per normalized statement (see /debug/slow-queries).", 1),
+            ("sqlite_query_seconds_total", "counter", "Time spent executing and fetching per normalized statement.", 2),
+            ("sqlite_query_rows_total", "counter", "Rows returned or changed per normalized statement.", 3),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for row in queries:
+                lines.append(f"{name}{_labels(query_id=row[0])} {row[index]}")
+
+    for prefix, values in (gauges or {}).items():
+        for name, value in values.items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
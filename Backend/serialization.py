@@ -0,0 +1,14 @@
+from typing import Any
+
+import orjson
+
+def dumps(content: Any) -> bytes:
+    """
+    Encodes trusted database rows straight to JSON bytes.
+
+    `content` must already have the shape of the endpoint's response_model: dicts in model
+    field order holding only str, int, float, None, lists and dicts, as crud.py returns them.
+    The output is byte-identical to FastAPI's JSONResponse rendering of the validated models
+    (see benchmarks/bench_serialization.py) but skips building and re-validating Pydantic objects.
+    """
+    return orjson.dumps(content)
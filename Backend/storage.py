@@ -0,0 +1,60 @@
+"""
+Pluggable storage for the POA request and external document verification repositories.
+
+The endpoints, bulk import and the change feed call `storage.engine`, a module exposing the
+coroutine functions named in STORAGE_API with the same arguments and return shapes:
+
+  sqlite    async_crud.py over crud.py (default): pooled SQLite connections on reader and
+            writer threads, migrations/ and data.sql.
+  postgres  pg_crud.py: asyncpg connection pool, pg_migrations/ and prepared statements;
+            exports page by id, as on SQLite. Needs POSTGRES_DSN and the asyncpg package.
+
+STORAGE_ENGINE picks the engine at import time; startup() and shutdown() run from the app's lifespan.
+"""
+import importlib
+import os
+from types import ModuleType
+
+ENGINES = {"sqlite": "async_crud", "postgres": "pg_crud"}
+ENGINE = os.environ.get("STORAGE_ENGINE", "sqlite")
+
+STORAGE_API = (
+    # Lifecycle
+    "startup", "close",
+    # Dashboard
+    "get_dashboard_data",
+    # POA Requests
+    "get_poa_requests", "get_poa_request_facets", "get_poa_request_details", "get_poa_request_details_batch",
+    "create_poa_request", "create_poa_requests", "iter_poa_request_batches", "update_poa_request",
+    "transition_poa_requests", "expire_poa_requests", "delete_poa_request", "poa_request_exists",
+    "add_poa_request_file", "get_poa_request_file",
+    # External Document Verification
+    "get_external_doc_verifications", "get_external_doc_facets", "get_external_doc_verification_details",
+    "get_external_doc_verification_details_batch", "update_external_doc_verification",
+    "transition_external_doc_verifications", "delete_external_doc_verification",
+    "external_doc_exists", "add_external_doc_file", "get_external_doc_file",
+    # Change Log
+    "get_changes", "get_change_bounds",
+    # Maintenance (manage.py and jobs.py)
+    "migrate", "prune_change_log", "find_rollup_drift", "rebuild_rollups", "reconcile_rollups",
+)
+
+def load_engine(name: str) -> ModuleType:
+    """Imports the engine module for `name`, checking that it implements every STORAGE_API function."""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown STORAGE_ENGINE {name!r}; expected one of {', '.join(ENGINES)}")
+    module = importlib.import_module(ENGINES[name])
+    missing = [f for f in STORAGE_API if not callable(getattr(module, f, None))]
+    if missing:
+        raise TypeError(f"Storage engine {name!r} does not implement {', '.join(missing)}")
+    return module
+
+engine = load_engine(ENGINE)
+
+async def startup() -> None:
+    """Connects the engine and prepares its schema before the first request."""
+    await engine.startup()
+
+async def shutdown() -> None:
+    """Releases the engine's threads and connections."""
+    await engine.close()
@@ -9,6 +9,7 @@ import { Card } from '@/components/ui/card'
 import { StatusBadge } from '@/components/status-badge'
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from '@/components/ui/dropdown-menu'
 import { Search, MoreVertical, ArrowLeft, FileText, Loader2 } from 'lucide-react'
+import { fetchAllPages } from '@/lib/api'
 
 interface VerificationItem {
   request_id: string
@@ -39,9 +40,7 @@ export default function DocumentVerificationPage() {
   const fetchData = async () => {
     try {
       setLoading(true)
-      const res = await fetch('https://legatora-backend.onrender.com/external-doc-verification?sort_by=newest')
-      if (!res.ok) throw new Error('Failed to fetch')
-      const data: VerificationItem[] = await res.json()
+      const data = await fetchAllPages<VerificationItem>('https://legatora-backend.onrender.com/external-doc-verification?sort_by=newest&limit=500')
       setItems(data)
     } catch (err) {
       console.error(err)
@@ -6,6 +6,7 @@ import { Header } from '@/components/header'
 import { POARequestList } from '@/components/poa/request-list'
 import { Loader2, AlertCircle } from 'lucide-react'
 import { useRouter } from 'next/navigation'
+import { fetchAllPages } from '@/lib/api'
 
 interface POARequest {
   id: string
@@ -27,10 +28,7 @@ export default function POARequestsPage() {
       setLoading(true)
       setError(null)
 
-      const res = await fetch('http://127.0.0.1:8000/poa-requests')
-      if (!res.ok) throw new Error('Failed to fetch')
-
-      const data = await res.json()
+      const data = await fetchAllPages<any>('http://127.0.0.1:8000/poa-requests?limit=500')
 
       const mapped: POARequest[] = data.map((item: any) => ({
         id: item.request_id,
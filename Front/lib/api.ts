@@ -0,0 +1,14 @@
+// Fetches every page of a cursor-paged list endpoint, following the X-Next-Cursor header
+export async function fetchAllPages<T>(url: string, init?: RequestInit): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | null = null
+  do {
+    const pageUrl = new URL(url)
+    if (cursor) pageUrl.searchParams.set('cursor', cursor)
+    const res = await fetch(pageUrl.toString(), init)
+    if (!res.ok) throw new Error('Failed to fetch')
+    items.push(...(await res.json()))
+    cursor = res.headers.get('X-Next-Cursor')
+  } while (cursor)
+  return items
+}